@@ -1,10 +1,77 @@
 """FastAPI router exposing the economics learning prototype."""
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+import csv
+import json
+import os
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time, timedelta
+from typing import Any, AsyncIterator, Callable, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from .bookings import BookingStoreUnavailable
+from .cache import CachedBody, ResponseCache, etag_matches
+from .experts import normalize_concept_id
+from .idempotency import IdempotencyCache, IdempotencyKeyReused
+from .metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware
+from .paging import InvalidQuery, parse_fields
+from .schemas import (
+    AvailabilityResponse,
+    BatchBookingRequest,
+    BatchBookingResponse,
+    BookingRequest,
+    BookingResponse,
+    BookingUpdate,
+    ConceptResponse,
+    ExpertsResponse,
+    MatchResponse,
+    QuoteRequest,
+    QuoteResponse,
+    RecurringBookingRequest,
+    SearchResponse,
+    SeriesResponse,
+    to_dict,
+    trusted,
+)
+from .services import (
+    CATALOG,
+    COMPACTION,
+    CONCEPT_FIELDS,
+    EXPERT_FIELDS,
+    EXPORT_FIELDS,
+    REJECT_CONFLICT,
+    REJECT_NOT_FOUND,
+    cancel_booking,
+    concepts_page,
+    create_booking,
+    create_bookings,
+    create_series,
+    expert_calendar,
+    experts_page,
+    export_bookings,
+    find_open_slots,
+    get_concept,
+    match_experts,
+    quote_sessions,
+    reschedule_booking,
+    search_catalog,
+    subscribe_experts,
+    utc_naive,
+)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # Archive finished sessions in the background while serving.
+    if COMPACTION.interval > 0:
+        COMPACTION.start()
+    try:
+        yield
+    finally:
+        COMPACTION.stop()
 
-from .schemas import BookingRequest, BookingResponse, ConceptResponse, ExpertsResponse
-from .services import create_booking, get_concept, list_concepts, list_experts
 
 app = FastAPI(
     title="Economics Learning Prototype",
@@ -12,32 +79,238 @@ app = FastAPI(
         "Explore foundational economic concepts, practice with guided modules, "
         "and book time with industry experts."
     ),
+    lifespan=lifespan,
+)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(BookingStoreUnavailable)
+def booking_store_unavailable(_: Request, exc: BookingStoreUnavailable) -> Response:
+    return Response(content=_encode({"detail": str(exc)}), status_code=503, media_type="application/json")
+
+# Catalog and expert payloads are encoded once per route/query and reused
+# until the underlying data is reloaded.
+RESPONSE_CACHE = ResponseCache(max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "10000")))
+CATALOG.subscribe(lambda: RESPONSE_CACHE.invalidate("concepts", "concept"))
+subscribe_experts(lambda: RESPONSE_CACHE.invalidate("experts"))
+
+# Confirmations for ``Idempotency-Key`` retries of ``POST /bookings``.
+IDEMPOTENCY = IdempotencyCache(
+    max_entries=int(os.environ.get("IDEMPOTENCY_MAX_KEYS", "10000")),
+    ttl=float(os.environ.get("IDEMPOTENCY_TTL", "86400")),
 )
 
 
+# Largest page a client may request with ``limit``.
+MAX_PAGE_SIZE = 500
+
+
+def _cached_response(request: Request, route: str, key: Hashable, render: Callable[[], bytes]) -> Response:
+    return _conditional_response(request, RESPONSE_CACHE.get_or_render(route, key, render), "application/json")
+
+
+def _conditional_response(request: Request, entry: CachedBody, media_type: str) -> Response:
+    headers = {"ETag": entry.etag}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type=media_type, headers=headers)
+
+
+def _model_response(model: Any) -> Response:
+    # Returning a Response skips FastAPI's response_model pass, which would
+    # re-validate models built from already validated data.
+    return Response(content=model.json(), media_type="application/json")
+
+
+def _encode_default(value: Any) -> str:
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, default=_encode_default).encode()
+
+
+def _fields(text: str | None, allowed: tuple) -> tuple | None:
+    try:
+        return parse_fields(text, allowed)
+    except InvalidQuery as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
 @app.get("/concepts", response_model=ConceptResponse)
-def read_concepts() -> ConceptResponse:
-    return ConceptResponse(concepts=list_concepts())
+def read_concepts(
+    request: Request,
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
+) -> Response:
+    projection = _fields(fields, CONCEPT_FIELDS)
+
+    def render() -> bytes:
+        try:
+            page = concepts_page(cursor, limit, projection)
+        except InvalidQuery as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        if projection is None:
+            return trusted(ConceptResponse, concepts=page.items, next_cursor=page.next_cursor).json().encode()
+        return _encode({"concepts": page.items, "next_cursor": page.next_cursor})
+
+    return _cached_response(request, "concepts", (cursor, limit, projection), render)
 
 
 @app.get("/concepts/{concept_id}", response_model=ConceptResponse)
-def read_concept(concept_id: str) -> ConceptResponse:
+def read_concept(concept_id: str, request: Request) -> Response:
     concept = get_concept(concept_id)
     if not concept:
         raise HTTPException(status_code=404, detail="Concept not found")
-    return ConceptResponse(concepts=[concept])
+    return _cached_response(
+        request, "concept", concept_id, lambda: trusted(ConceptResponse, concepts=[concept]).json().encode()
+    )
 
 
 @app.get("/experts", response_model=ExpertsResponse)
-def read_experts(concept_id: str | None = None) -> ExpertsResponse:
-    experts = list_experts(concept_id)
-    if concept_id and not experts:
-        raise HTTPException(status_code=404, detail="No experts cover this concept yet")
-    return ExpertsResponse(experts=experts)
+def read_experts(
+    request: Request,
+    concept_id: str | None = None,
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
+) -> Response:
+    projection = _fields(fields, EXPERT_FIELDS)
+
+    def render() -> bytes:
+        try:
+            page = experts_page(concept_id, cursor, limit, projection)
+        except InvalidQuery as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        if concept_id and not page.items and not cursor:
+            raise HTTPException(status_code=404, detail="No experts cover this concept yet")
+        if projection is None:
+            return trusted(ExpertsResponse, experts=page.items, next_cursor=page.next_cursor).json().encode()
+        return _encode({"experts": page.items, "next_cursor": page.next_cursor})
+
+    # Key on the concept id as the directory looks it up, so case and
+    # whitespace variants share one entry.
+    concept_key = normalize_concept_id(concept_id) if concept_id else None
+    return _cached_response(request, "experts", (concept_key, cursor, limit, projection), render)
+
+
+@app.get("/search", response_model=SearchResponse)
+def read_search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    prefix: bool = False,
+) -> Response:
+    payload = {
+        "results": [
+            {"type": hit.kind, "id": hit.id, "concept_id": hit.concept_id, "title": hit.title, "score": hit.score}
+            for hit in search_catalog(q, limit, prefix)
+        ]
+    }
+    return Response(content=json.dumps(payload), media_type="application/json")
+
+
+# Longest date range a single availability search may cover.
+MAX_AVAILABILITY_RANGE = timedelta(days=366)
+
+
+@app.get("/experts/availability", response_model=AvailabilityResponse)
+def read_expert_availability(
+    concept_id: str, start: datetime, end: datetime, duration_minutes: int = 60
+) -> Response:
+    # Compared in UTC, so one bound with an offset and one without work together.
+    start, end = utc_naive(start), utc_naive(end)
+    if duration_minutes <= 0 or end <= start or end - start > MAX_AVAILABILITY_RANGE:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide a positive duration and a date range of at most 366 days.",
+        )
+    if not get_concept(concept_id):
+        raise HTTPException(status_code=404, detail="Concept not found")
+
+    # Encoded directly: large ranges yield thousands of slots, and building
+    # a model per slot would dominate the request.
+    payload = {
+        "experts": [
+            {
+                "expert_id": expert.id,
+                "name": expert.name,
+                "slots": [
+                    {"start": slot_start.isoformat(), "end": slot_end.isoformat()}
+                    for slot_start, slot_end in slots
+                ],
+            }
+            for expert, slots in find_open_slots(concept_id, start, end, duration_minutes)
+        ]
+    }
+    return Response(content=json.dumps(payload), media_type="application/json")
+
+
+@app.get("/experts/match", response_model=MatchResponse)
+def read_expert_matches(
+    concepts: str,
+    start: datetime,
+    end: datetime,
+    group_size: int = Query(1, ge=1),
+    duration_minutes: int = Query(60, ge=1),
+    k: int = Query(10, ge=1, le=100),
+) -> Response:
+    concept_ids = [concept_id.strip() for concept_id in concepts.split(",") if concept_id.strip()]
+    start, end = utc_naive(start), utc_naive(end)
+    if end <= start or end - start > MAX_AVAILABILITY_RANGE:
+        raise HTTPException(status_code=400, detail="Provide a date range of at most 366 days.")
+    if not concept_ids or not all(get_concept(concept_id) for concept_id in concept_ids):
+        raise HTTPException(status_code=404, detail="Concept not found")
+
+    # Only the k returned experts are serialized.
+    payload = {
+        "matches": [
+            {
+                "expert": to_dict(match.expert),
+                "score": match.score,
+                "coverage": match.coverage,
+                "price": match.price,
+                "open_minutes": match.open_minutes,
+            }
+            for match in match_experts(concept_ids, start, end, group_size, duration_minutes, k)
+        ]
+    }
+    return Response(content=_encode(payload), media_type="application/json")
+
+
+@app.get("/experts/{expert_id}/calendar.ics")
+def read_expert_calendar(expert_id: str, request: Request) -> Response:
+    # Calendar apps poll; unchanged feeds are served from cache or as 304s.
+    entry = expert_calendar(expert_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Expert not found")
+    return _conditional_response(request, entry, "text/calendar; charset=utf-8")
+
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics() -> Response:
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
 
 
 @app.post("/bookings", response_model=BookingResponse)
-def create_booking_endpoint(request: BookingRequest) -> BookingResponse:
+def create_booking_endpoint(
+    request: BookingRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
+) -> Response:
+    if idempotency_key is None:
+        return Response(content=_book(request), media_type="application/json")
+    try:
+        # Retries and concurrent duplicates share one booking attempt.
+        body, replayed = IDEMPOTENCY.run(idempotency_key, _encode(to_dict(request)), lambda: _book(request))
+    except IdempotencyKeyReused as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _book(request: BookingRequest) -> bytes:
     confirmation = create_booking(request)
     if not confirmation:
         raise HTTPException(
@@ -47,4 +320,116 @@ def create_booking_endpoint(request: BookingRequest) -> BookingResponse:
                 "availability, and requested time."
             ),
         )
-    return BookingResponse(confirmation=confirmation)
+    return trusted(BookingResponse, confirmation=confirmation).json().encode()
+
+
+@app.post("/bookings/recurring", response_model=SeriesResponse)
+def create_series_endpoint(request: RecurringBookingRequest) -> Response:
+    series, reason, conflicts = create_series(request)
+    if reason == REJECT_CONFLICT:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Some weeks overlap existing bookings", "conflicting_weeks": conflicts},
+        )
+    if not series:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unable to schedule series ({reason}). Check concept alignment, availability, and weeks.",
+        )
+    return _model_response(trusted(SeriesResponse, series=series))
+
+
+@app.delete("/bookings/{booking_id}", status_code=204)
+def cancel_booking_endpoint(booking_id: str) -> Response:
+    if not cancel_booking(booking_id):
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return Response(status_code=204)
+
+
+@app.patch("/bookings/{booking_id}", response_model=BookingResponse)
+def reschedule_booking_endpoint(booking_id: str, update: BookingUpdate) -> Response:
+    confirmation, reason = reschedule_booking(booking_id, update)
+    if reason == REJECT_NOT_FOUND:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    if reason == REJECT_CONFLICT:
+        raise HTTPException(status_code=409, detail="The new time overlaps another booking")
+    if not confirmation:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unable to reschedule session ({reason}). Check availability and requested time.",
+        )
+    return _model_response(trusted(BookingResponse, confirmation=confirmation))
+
+
+@app.post("/bookings/batch", response_model=BatchBookingResponse)
+def create_bookings_endpoint(batch: BatchBookingRequest) -> Response:
+    results = create_bookings(batch.bookings, atomic=batch.atomic)
+    booked = sum(result.confirmation is not None for result in results)
+    return _model_response(trusted(BatchBookingResponse, results=results, booked=booked))
+
+
+# Rows encoded per chunk of a streamed export.
+EXPORT_CHUNK_ROWS = 1000
+
+
+def _export_chunks(rows: Iterable[Tuple], as_csv: bool) -> Iterator[bytes]:
+    # Encoded lines are collected per chunk and flushed, so memory stays flat
+    # however many rows the export holds.
+    lines: List[str] = []
+    writer = csv.writer(_LineSink(lines)) if as_csv else None
+    if writer is not None:
+        writer.writerow(EXPORT_FIELDS)
+    for number, row in enumerate(rows, 1):
+        if writer is not None:
+            writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row])
+        else:
+            lines.append(json.dumps(dict(zip(EXPORT_FIELDS, row)), default=_encode_default) + "\n")
+        if number % EXPORT_CHUNK_ROWS == 0:
+            yield "".join(lines).encode()
+            lines.clear()
+    if lines:
+        yield "".join(lines).encode()
+
+
+class _LineSink:
+    """File-like target for :func:`csv.writer` that appends to a list."""
+
+    def __init__(self, lines: List[str]) -> None:
+        self.write = lines.append
+
+
+@app.get("/bookings/export")
+def export_bookings_endpoint(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    expert_id: Optional[str] = None,
+    concept_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    archived: bool = False,
+) -> Response:
+    # Offset-aware bounds become naive UTC, like stored bookings, before
+    # they are compared with each other or with anything in the stream.
+    start = utc_naive(start) if start is not None else None
+    end = utc_naive(end) if end is not None else None
+    if start is not None and end is not None and end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    rows = export_bookings(expert_id, concept_id, start, end, archived)
+    if format == "csv":
+        return StreamingResponse(
+            _export_chunks(rows, as_csv=True),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="bookings.csv"'},
+        )
+    return StreamingResponse(_export_chunks(rows, as_csv=False), media_type="application/x-ndjson")
+
+
+@app.post("/quotes", response_model=QuoteResponse)
+def create_quotes_endpoint(batch: QuoteRequest) -> Response:
+    # Encoded directly: a page of quotes can hold hundreds of entries.
+    payload = {
+        "quotes": [
+            {"index": index, "expert_id": item.expert_id, "price": price, "error": error}
+            for index, (item, (price, error)) in enumerate(zip(batch.quotes, quote_sessions(batch.quotes)))
+        ]
+    }
+    return Response(content=json.dumps(payload), media_type="application/json")
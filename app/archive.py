@@ -0,0 +1,100 @@
+"""Archive for finished sessions and the background task that fills it.
+
+Compaction moves bookings that have ended out of the live store, so memory
+and conflict checks scale with upcoming bookings rather than all-time
+history.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .journal import dump_record, load_record
+
+logger = logging.getLogger(__name__)
+
+
+class BookingArchive:
+    """Finished bookings, appended as JSON lines to ``path`` or kept in memory.
+
+    The in-memory form is meant for development and tests; give a path to
+    keep history out of the process.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = Path(path) if path else None
+        self._records: List[Dict] = []
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        if self.path is None:
+            return len(self._records)
+        return sum(1 for _ in self)
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self.path is None:
+            yield from list(self._records)
+            return
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as handle:
+            for line in handle:
+                if line.endswith(b"\n"):
+                    yield load_record(json.loads(line))
+
+    def extend(self, records: List[Dict]) -> None:
+        if self.path is None:
+            with self._lock:
+                self._records.extend(records)
+            return
+        payload = b"".join(
+            json.dumps(dump_record(record), separators=(",", ":")).encode() + b"\n" for record in records
+        )
+        # One append per batch; O_APPEND keeps concurrent workers' batches whole.
+        with self._lock, open(self.path, "ab") as handle:
+            handle.write(payload)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            if self.path is not None and self.path.exists():
+                self.path.unlink()
+
+
+class CompactionTask:
+    """Daemon thread calling ``compact(now)`` every ``interval`` seconds."""
+
+    def __init__(self, compact: Callable[[datetime], int], interval: float) -> None:
+        self.compact = compact
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="booking-compaction", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                moved = self.compact(datetime.now(timezone.utc))
+            except Exception:  # keep compacting on later ticks
+                logger.exception("Booking compaction failed")
+                continue
+            if moved:
+                logger.info("Archived %d finished bookings", moved)
@@ -0,0 +1,190 @@
+"""Weekly availability windows compiled into sorted minute-of-week ranges."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+from typing import Iterable, List, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+WEEKDAY_INDEX = {name: index for index, name in enumerate(WEEKDAYS)}
+_MINUTE = timedelta(minutes=1)
+
+
+def _window_field(window: object, name: str) -> object:
+    value = getattr(window, name, None)
+    if value is None and isinstance(window, dict):
+        value = window.get(name)
+    return value
+
+
+def _minute_of_day(value: time, round_up: bool) -> int:
+    minute = value.hour * 60 + value.minute
+    if round_up and (value.second or value.microsecond):
+        minute += 1
+    return minute
+
+
+class WeeklyAvailability:
+    """Merged, sorted ``[start, end)`` minute-of-week ranges for one expert.
+
+    Windows whose end is not after their start run past midnight into the
+    next day, and adjacent or overlapping windows are merged, so a session
+    is bookable when a single merged range covers it.
+    """
+
+    __slots__ = ("_starts", "_ends", "_before", "key")
+
+    def __init__(self, ranges: Iterable[Tuple[int, int]] = ()) -> None:
+        self._starts = array("i")
+        self._ends = array("i")
+        for start, end in sorted(ranges):
+            if self._ends and start <= self._ends[-1]:
+                if end > self._ends[-1]:
+                    self._ends[-1] = end
+                continue
+            self._starts.append(start)
+            self._ends.append(end)
+        # _before[i] is the total length of the ranges preceding range i.
+        self._before = array("i", [0])
+        for start, end in zip(self._starts, self._ends):
+            self._before.append(self._before[-1] + end - start)
+        # Experts with identical schedules share a key, letting callers reuse
+        # work derived from the ranges alone.
+        self.key = (self._starts.tobytes(), self._ends.tobytes())
+
+    @classmethod
+    def compile(cls, windows: Iterable[object]) -> "WeeklyAvailability":
+        ranges: List[Tuple[int, int]] = []
+        for window in windows:
+            weekday = WEEKDAY_INDEX.get(str(_window_field(window, "weekday") or "").strip().lower())
+            window_start = _window_field(window, "start")
+            window_end = _window_field(window, "end")
+            if weekday is None or window_start is None or window_end is None:
+                continue
+            # Round inwards so partial minutes never widen a window.
+            start = weekday * MINUTES_PER_DAY + _minute_of_day(window_start, round_up=True)
+            end = weekday * MINUTES_PER_DAY + _minute_of_day(window_end, round_up=False)
+            if window_end < window_start:
+                end += MINUTES_PER_DAY
+            if end <= start:
+                continue
+            if end > MINUTES_PER_WEEK:
+                ranges.append((start, MINUTES_PER_WEEK))
+                ranges.append((0, end - MINUTES_PER_WEEK))
+            else:
+                ranges.append((start, end))
+        return cls(ranges)
+
+    def ranges(self) -> List[Tuple[int, int]]:
+        return list(zip(self._starts, self._ends))
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        """Return True when ``[start, end)`` lies inside one merged range."""
+        if end <= start:
+            return False
+        floor_start = start.replace(second=0, microsecond=0)
+        first = start.weekday() * MINUTES_PER_DAY + start.hour * 60 + start.minute
+        last = first + -(-(end - floor_start) // _MINUTE)
+        if last - first > MINUTES_PER_WEEK:
+            return self._covers_range(0, MINUTES_PER_WEEK)
+        if last > MINUTES_PER_WEEK:
+            return self._covers_range(first, MINUTES_PER_WEEK) and self._covers_range(
+                0, last - MINUTES_PER_WEEK
+            )
+        return self._covers_range(first, last)
+
+    def tile(self, first: int, last: int) -> List[Tuple[int, int]]:
+        """Repeat the weekly ranges over ``[first, last)`` minutes since a Monday.
+
+        Ranges that touch across the week boundary are merged, and the result
+        is clipped to ``[first, last)``.
+        """
+        if last <= first or not self._starts:
+            return []
+        week_ranges = list(zip(self._starts, self._ends))
+        weeks = range(first // MINUTES_PER_WEEK * MINUTES_PER_WEEK, last, MINUTES_PER_WEEK)
+        # Ranges are merged within a week, so copies only need merging where
+        # one week's last range runs into the next week's first.
+        if self._starts[0] == 0 and self._ends[-1] == MINUTES_PER_WEEK:
+            tiled: List[Tuple[int, int]] = []
+            for week in weeks:
+                for start, end in week_ranges:
+                    if tiled and start + week <= tiled[-1][1]:
+                        tiled[-1] = (tiled[-1][0], end + week)
+                    else:
+                        tiled.append((start + week, end + week))
+        else:
+            tiled = [(start + week, end + week) for week in weeks for start, end in week_ranges]
+
+        # Clip to [first, last); only the first and last week can stick out.
+        lower, upper = 0, len(tiled)
+        while lower < upper and tiled[lower][1] <= first:
+            lower += 1
+        while upper > lower and tiled[upper - 1][0] >= last:
+            upper -= 1
+        tiled = tiled[lower:upper]
+        if tiled:
+            tiled[0] = (max(tiled[0][0], first), tiled[0][1])
+            tiled[-1] = (tiled[-1][0], min(tiled[-1][1], last))
+        return tiled
+
+    def minutes_between(self, first: int, last: int) -> int:
+        """Available minutes in ``[first, last)`` minutes since a Monday, without tiling."""
+        if last <= first:
+            return 0
+        return self._minutes_before(last) - self._minutes_before(first)
+
+    def _minutes_before(self, minute: int) -> int:
+        weeks, offset = divmod(minute, MINUTES_PER_WEEK)
+        position = bisect_right(self._starts, offset)
+        partial = 0
+        if position:
+            partial = self._before[position - 1] + min(self._ends[position - 1], offset) - self._starts[position - 1]
+        return weeks * self._before[-1] + partial
+
+    def _covers_range(self, first: int, last: int) -> bool:
+        position = bisect_right(self._starts, first) - 1
+        return position >= 0 and self._ends[position] >= last
+
+
+def subtract_intervals(
+    free: List[Tuple[int, int]], busy: List[Tuple[int, int]], min_length: int = 1
+) -> List[Tuple[int, int]]:
+    """Remove sorted ``busy`` intervals from sorted, disjoint ``free`` ones.
+
+    Both inputs are walked once in a merge pass; pieces shorter than
+    ``min_length`` are dropped.
+    """
+    if not busy:
+        return [(start, end) for start, end in free if end - start >= min_length]
+
+    result: List[Tuple[int, int]] = []
+    append = result.append
+    position, count = 0, len(busy)
+    for start, end in free:
+        while position < count and busy[position][1] <= start:
+            position += 1
+        if position == count or busy[position][0] >= end:
+            # Most windows hold no booking at all.
+            if end - start >= min_length:
+                append((start, end))
+            continue
+        cursor = start
+        # Walk by index: slicing ``busy`` here would copy its tail per window.
+        index = position
+        while index < count:
+            busy_start, busy_end = busy[index]
+            if busy_start >= end:
+                break
+            if busy_start - cursor >= min_length:
+                append((cursor, busy_start))
+            if busy_end > cursor:
+                cursor = busy_end
+            index += 1
+        if end - cursor >= min_length:
+            append((cursor, end))
+    return result
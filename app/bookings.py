@@ -0,0 +1,681 @@
+"""Booking storage indexed per expert for fast conflict detection."""
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BookingStoreUnavailable(RuntimeError):
+    """Raised when a booking store cannot serve requests right now."""
+
+
+# Bookings read per lock acquisition while exporting, so a long export never
+# holds an expert's lock for more than one page.
+EXPORT_PAGE = 1000
+
+
+class BookingRepository(ABC):
+    """Interface every booking store implements.
+
+    Records are dicts with at least ``expert_id``, ``start`` and ``end``.
+    Stores never hold two overlapping bookings for one expert when they are
+    written through :meth:`reserve` or :meth:`reserve_many`.
+    """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[Dict]:
+        ...
+
+    @abstractmethod
+    def append(self, record: Dict) -> None:
+        """Store ``record`` without checking for conflicts."""
+
+    def extend(self, records: Iterable[Dict]) -> None:
+        for record in records:
+            self.append(record)
+
+    @abstractmethod
+    def reserve(self, record: Dict) -> bool:
+        """Insert ``record`` unless it overlaps the expert's existing bookings."""
+
+    @abstractmethod
+    def reserve_many(self, records: List[Dict], atomic: bool = False) -> List[bool]:
+        """Reserve ``records`` together, returning whether each one fits.
+
+        Every record is checked against existing bookings and against the
+        records accepted before it in the same call. With ``atomic`` set,
+        nothing is inserted unless every record fits.
+        """
+
+    @abstractmethod
+    def reserve_series(self, record: Dict, skip_conflicts: bool = False) -> Tuple[bool, List[int]]:
+        """Reserve a weekly series (see :class:`WeeklySeries`) as one booking.
+
+        Returns whether it was stored and the weeks that conflict with
+        existing bookings. Any conflict rejects the series unless
+        ``skip_conflicts`` is set, in which case those weeks are added to
+        ``record["skipped"]`` and the rest is booked (provided a week is left).
+        """
+
+    @abstractmethod
+    def get(self, booking_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def remove(self, booking_id: str) -> Optional[Dict]:
+        """Delete a booking, returning its record (None when there is no such booking)."""
+
+    @abstractmethod
+    def replace(self, record: Dict) -> bool:
+        """Swap the booking with ``record``'s ``booking_id`` for ``record``.
+
+        The expert stays the same. Returns False, changing nothing, when the
+        new slot overlaps another of the expert's bookings; raises
+        :class:`KeyError` when the booking does not exist.
+        """
+
+    @abstractmethod
+    def archive_finished(self, before: datetime, archive: Callable[[List[Dict]], None]) -> int:
+        """Hand bookings that ended by ``before`` to ``archive``, then delete them.
+
+        Returns how many bookings moved. Records reach ``archive`` before they
+        are deleted, so a crash in between duplicates rather than loses them.
+        """
+
+    @abstractmethod
+    def export(
+        self,
+        expert_id: Optional[str] = None,
+        concept_id: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[Dict]:
+        """Yield the sessions matching every given filter, by expert id and then start.
+
+        Sessions intersect ``[start, end)`` (either bound may be left open),
+        and each session of a series comes out as its own record with its
+        ``week``. Records are produced lazily, so memory does not grow with
+        the number of bookings exported.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def subscribe(self, listener: Callable[[Optional[str]], None]) -> None:
+        """Call ``listener(expert_id)`` after that expert's bookings change.
+
+        ``expert_id`` is None when every expert's bookings may have changed.
+        Listeners can run while the store holds its locks, so they should
+        only note the change and must not call back into the store.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, expert_id: Optional[str]) -> None:
+        for listener in self._listeners:
+            listener(expert_id)
+
+    @abstractmethod
+    def for_expert(self, expert_id: str) -> List[Dict]:
+        """Return the expert's bookings in start order."""
+
+    @abstractmethod
+    def overlapping(self, expert_id: str, start: datetime, end: datetime) -> List[Dict]:
+        """Return the expert's bookings intersecting ``[start, end)`` in start order."""
+
+    @abstractmethod
+    def has_conflict(self, expert_id: str, start: datetime, end: datetime) -> bool:
+        ...
+
+
+WEEK = timedelta(weeks=1)
+# Keys that make a booking record a weekly series rather than one session.
+SERIES_FIELDS = ("occurrences", "skipped")
+
+
+def is_series(record: Dict) -> bool:
+    return "occurrences" in record
+
+
+class WeeklySeries:
+    """A recurring booking stored as a rule plus exceptions.
+
+    The record's ``start``/``end`` describe the first session; session ``k``
+    is that slot shifted ``k`` weeks, for ``occurrences`` weeks, except the
+    weeks listed in ``skipped``. Which sessions can meet a time range is plain
+    arithmetic, so checks cost the same for a 4-week and a 52-week series.
+    Sessions must be shorter than a week, so they never overlap each other.
+    """
+
+    __slots__ = ("record", "first", "span", "count", "skipped")
+
+    def __init__(self, record: Dict) -> None:
+        self.record = record
+        self.first: datetime = record["start"]
+        self.span: timedelta = record["end"] - record["start"]
+        self.count: int = record["occurrences"]
+        self.skipped = frozenset(record.get("skipped") or ())
+
+    @property
+    def last_end(self) -> datetime:
+        return self.first + (self.count - 1) * WEEK + self.span
+
+    def weeks(self, start: datetime, end: datetime) -> range:
+        """Weeks whose session intersects ``[start, end)``, skipped ones included."""
+        low = max(0, (start - self.first - self.span) // WEEK + 1)
+        high = min(self.count, -((self.first - end) // WEEK))
+        return range(low, high)
+
+    def slots(self) -> Iterator[Tuple[int, datetime, datetime]]:
+        """``(week, start, end)`` of every session that takes place, in order."""
+        for week in range(self.count):
+            if week not in self.skipped:
+                start = self.first + week * WEEK
+                yield week, start, start + self.span
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        return any(week not in self.skipped for week in self.weeks(start, end))
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Dict]:
+        """Sessions intersecting ``[start, end)`` as plain booking records with a ``week``."""
+        base = {key: value for key, value in self.record.items() if key not in SERIES_FIELDS}
+        sessions = []
+        for week in self.weeks(start, end):
+            if week not in self.skipped:
+                session_start = self.first + week * WEEK
+                sessions.append({**base, "start": session_start, "end": session_start + self.span, "week": week})
+        return sessions
+
+
+def expand_sessions(record: Dict, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict]:
+    """The booking's sessions intersecting ``[start, end)``; a series yields one per week."""
+    if is_series(record):
+        series = WeeklySeries(record)
+        return series.overlapping(start or series.first, end or series.last_end)
+    if (start is None or start < record["end"]) and (end is None or record["start"] < end):
+        return [record]
+    return []
+
+
+class ExpertSchedule:
+    """Bookings for a single expert, kept in start-time order.
+
+    Weekly series are kept apart from single sessions and consulted by every
+    check, so conflicts see each of their sessions without expanding them.
+    """
+
+    __slots__ = ("_keys", "_records", "_max_span", "_series")
+
+    def __init__(self) -> None:
+        self._keys: List[Tuple[datetime, int]] = []
+        self._records: List[Dict] = []
+        self._max_span = timedelta(0)
+        self._series: List[WeeklySeries] = []
+
+    def __len__(self) -> int:
+        return len(self._records) + len(self._series)
+
+    def __iter__(self) -> Iterator[Dict]:
+        if not self._series:
+            return iter(self._records)
+        series = sorted((series.record for series in self._series), key=lambda record: record["start"])
+        return heapq.merge(self._records, series, key=lambda record: record["start"])
+
+    def add(self, record: Dict, sequence: int) -> None:
+        if is_series(record):
+            self._series.append(WeeklySeries(record))
+            return
+        # The sequence number keeps keys unique so equal start times never
+        # fall back to comparing the record dicts themselves.
+        key = (record["start"], sequence)
+        position = bisect_left(self._keys, key)
+        self._keys.insert(position, key)
+        self._records.insert(position, record)
+        span = record["end"] - record["start"]
+        if span > self._max_span:
+            self._max_span = span
+
+    def remove(self, record: Dict) -> bool:
+        """Drop ``record``, matched by identity or else by equality."""
+        if is_series(record):
+            for position, series in enumerate(self._series):
+                if series.record is record or series.record == record:
+                    del self._series[position]
+                    return True
+            return False
+        position = bisect_left(self._keys, (record["start"],))
+        match = None
+        while position < len(self._keys) and self._keys[position][0] == record["start"]:
+            candidate = self._records[position]
+            if candidate is record:
+                match = position
+                break
+            if match is None and candidate == record:
+                match = position
+            position += 1
+        if match is None:
+            return False
+        del self._keys[match]
+        del self._records[match]
+        return True
+
+    def finished(self, before: datetime) -> List[Dict]:
+        """Return the bookings (and whole series) that ended by ``before``."""
+        upper = bisect_left(self._keys, (before,))
+        finished = [record for record in self._records[:upper] if record["end"] <= before]
+        finished.extend(series.record for series in self._series if series.last_end <= before)
+        return finished
+
+    def prune(self, before: datetime) -> None:
+        """Drop the bookings :meth:`finished` returns and re-derive the longest span.
+
+        Only bookings starting before ``before`` are touched, so the cost is
+        proportional to the finished prefix plus one pass over what remains.
+        """
+        upper = bisect_left(self._keys, (before,))
+        kept = [position for position in range(upper) if self._records[position]["end"] > before]
+        self._keys[:upper] = [self._keys[position] for position in kept]
+        self._records[:upper] = [self._records[position] for position in kept]
+        self._max_span = max((record["end"] - record["start"] for record in self._records), default=timedelta(0))
+        self._series = [series for series in self._series if series.last_end > before]
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """Return True when any booking intersects ``[start, end)``.
+
+        Only bookings starting before ``end`` can overlap, and none of them can
+        reach ``start`` unless it began within the longest booked span, so the
+        scan is bounded to that window of the sorted list.
+        """
+        upper = bisect_left(self._keys, (end,))
+        lower = bisect_left(self._keys, (start - self._max_span,))
+        for record in self._records[lower:upper]:
+            if record["start"] < end and start < record["end"]:
+                return True
+        return any(series.overlaps(start, end) for series in self._series)
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Dict]:
+        """Return the bookings intersecting ``[start, end)`` in start order.
+
+        Sessions of a series come back as single bookings carrying their ``week``.
+        """
+        upper = bisect_left(self._keys, (end,))
+        lower = bisect_left(self._keys, (start - self._max_span,))
+        found = [record for record in self._records[lower:upper] if start < record["end"]]
+        if self._series:
+            for series in self._series:
+                found.extend(series.overlapping(start, end))
+            found.sort(key=lambda record: record["start"])
+        return found
+
+    def page(
+        self,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        after: Optional[Tuple[datetime, int]],
+        limit: int,
+    ) -> Tuple[List[Dict], Optional[Tuple[datetime, int]]]:
+        """Read single bookings intersecting ``[start, end)`` in start order, ``limit`` at a time.
+
+        Reading resumes past the key ``after`` and returns the key the next
+        page resumes from, or None once the range is exhausted. Keys never
+        move, so the lock need not be held between pages.
+        """
+        if after is not None:
+            position = bisect_right(self._keys, after)
+        elif start is not None:
+            position = bisect_left(self._keys, (start - self._max_span,))
+        else:
+            position = 0
+        stop = min(len(self._records), position + limit)
+        found = []
+        while position < stop:
+            record = self._records[position]
+            if end is not None and record["start"] >= end:
+                return found, None
+            if start is None or start < record["end"]:
+                found.append(record)
+            position += 1
+        return found, self._keys[position - 1] if position < len(self._records) else None
+
+    def series_sessions(self, start: Optional[datetime], end: Optional[datetime]) -> List[Dict]:
+        """Sessions of every series intersecting ``[start, end)``, in start order."""
+        sessions = [
+            session
+            for series in self._series
+            for session in series.overlapping(start or series.first, end or series.last_end)
+        ]
+        sessions.sort(key=lambda record: record["start"])
+        return sessions
+
+    def conflicts(self, slots: List[Tuple[datetime, datetime]]) -> List[bool]:
+        """Return, for each of ``slots`` (sorted by start), whether it overlaps a booking.
+
+        One merge pass: the lower bound only moves forward, so each search
+        starts where the previous slot's left off.
+        """
+        flags = []
+        lower = 0
+        total = len(self._records)
+        for start, end in slots:
+            lower = bisect_left(self._keys, (start - self._max_span,), lower)
+            position, hit = lower, False
+            while position < total and self._records[position]["start"] < end:
+                if start < self._records[position]["end"]:
+                    hit = True
+                    break
+                position += 1
+            flags.append(hit or any(series.overlaps(start, end) for series in self._series))
+        return flags
+
+
+def _keep_series(record: Dict, slots: List, conflicts: List[int], skip_conflicts: bool) -> bool:
+    """Decide whether a series with ``conflicts`` is stored, marking skipped weeks if so."""
+    if not conflicts:
+        return bool(slots)
+    if not skip_conflicts or len(conflicts) == len(slots):
+        return False
+    record["skipped"] = sorted({*(record.get("skipped") or ()), *conflicts})
+    return True
+
+
+class BookingIndex(BookingRepository):
+    """In-memory booking store keyed by expert.
+
+    Behaves like the plain list it replaces (``append``, ``clear``, ``len`` and
+    iteration) while answering conflict checks from the per-expert schedule.
+    Each expert's schedule is guarded by one of ``stripes`` locks, so
+    :meth:`reserve` checks and inserts atomically without serializing bookings
+    for experts that hash to different stripes.
+
+    Bookings with a ``booking_id`` are also indexed by it, so :meth:`get`,
+    :meth:`remove` and :meth:`replace` find them without a scan.
+
+    Subclasses can persist changes through :meth:`_log`, which runs under the
+    affected stripe locks just before the change is applied in memory, and
+    :meth:`_sync`, which runs after they are released and before the caller
+    sees the result. Logged changes are
+    applied again on recovery with :meth:`_replay`.
+    """
+
+    def __init__(self, stripes: int = 64) -> None:
+        self._schedules: Dict[str, ExpertSchedule] = {}
+        self._by_id: Dict[str, Dict] = {}
+        self._locks = tuple(threading.Lock() for _ in range(stripes))
+        self._sequence = count(1)
+        self._listeners: List[Callable[[Optional[str]], None]] = []
+
+    def __len__(self) -> int:
+        return sum(len(schedule) for schedule in list(self._schedules.values()))
+
+    def __iter__(self) -> Iterator[Dict]:
+        for schedule in list(self._schedules.values()):
+            yield from list(schedule)
+
+    def lock_for(self, expert_id: str) -> threading.Lock:
+        return self._locks[self._stripe(expert_id)]
+
+    def append(self, record: Dict) -> None:
+        with self.lock_for(record["expert_id"]):
+            ticket = self._log("add", record)
+            self._insert(record)
+        self._sync(ticket)
+
+    def reserve(self, record: Dict) -> bool:
+        with self.lock_for(record["expert_id"]):
+            if self._schedule(record["expert_id"]).overlaps(record["start"], record["end"]):
+                return False
+            ticket = self._log("add", record)
+            self._insert(record)
+        self._sync(ticket)
+        return True
+
+    def reserve_series(self, record: Dict, skip_conflicts: bool = False) -> Tuple[bool, List[int]]:
+        slots = list(WeeklySeries(record).slots())
+        with self._locked([record["expert_id"]]):
+            hits = self._schedule(record["expert_id"]).conflicts([(start, end) for _, start, end in slots])
+            conflicts = [week for (week, _, _), hit in zip(slots, hits) if hit]
+            if not _keep_series(record, slots, conflicts, skip_conflicts):
+                return False, conflicts
+            ticket = self._log("add", record)
+            self._insert(record)
+        self._sync(ticket)
+        return True, conflicts
+
+    def reserve_many(self, records: List[Dict], atomic: bool = False) -> List[bool]:
+        ticket = 0
+        with self._locked({record["expert_id"] for record in records}):
+            pending: Dict[str, ExpertSchedule] = {}
+            accepted: List[bool] = []
+            for position, record in enumerate(records):
+                start, end = record["start"], record["end"]
+                existing = self._schedules.get(record["expert_id"])
+                batch = pending.setdefault(record["expert_id"], ExpertSchedule())
+                fits = not (existing and existing.overlaps(start, end)) and not batch.overlaps(start, end)
+                if fits:
+                    batch.add(record, position)
+                accepted.append(fits)
+
+            if atomic and not all(accepted):
+                return accepted
+            for record, fits in zip(records, accepted):
+                if fits:
+                    ticket = self._log("add", record)
+                    self._insert(record)
+        self._sync(ticket)
+        return accepted
+
+    def get(self, booking_id: str) -> Optional[Dict]:
+        return self._by_id.get(booking_id)
+
+    def remove(self, booking_id: str) -> Optional[Dict]:
+        record = self.get(booking_id)
+        if record is None:
+            return None
+        with self._locked([record["expert_id"]]):
+            # Look again under the lock; another caller may have got there first.
+            record = self._by_id.get(booking_id)
+            if record is None:
+                return None
+            ticket = self._log("remove", record)
+            self._discard(record)
+        self._sync(ticket)
+        return record
+
+    def replace(self, record: Dict) -> bool:
+        booking_id = record["booking_id"]
+        current = self.get(booking_id)
+        if current is None:
+            raise KeyError(booking_id)
+        with self._locked([current["expert_id"]]):
+            current = self._by_id.get(booking_id)
+            if current is None:
+                raise KeyError(booking_id)
+            record = {**record, "expert_id": current["expert_id"]}
+            schedule = self._schedule(current["expert_id"])
+            if any(other is not current for other in schedule.overlapping(record["start"], record["end"])):
+                return False
+            ticket = self._log("replace", record)
+            self._discard(current)
+            self._insert(record)
+        self._sync(ticket)
+        return True
+
+    def archive_finished(self, before: datetime, archive: Callable[[List[Dict]], None]) -> int:
+        # One expert at a time, so bookings elsewhere never wait on compaction
+        # and one expert's failure does not hold back the rest.
+        moved = 0
+        for expert_id in self._expert_ids():
+            try:
+                moved += self._archive_expert(expert_id, before, archive)
+            except Exception:
+                logger.exception("Could not archive finished bookings of expert %r", expert_id)
+        return moved
+
+    def _archive_expert(self, expert_id: str, before: datetime, archive: Callable[[List[Dict]], None]) -> int:
+        ticket = 0
+        with self._locked([expert_id]):
+            schedule = self._schedules.get(expert_id)
+            finished = schedule.finished(before) if schedule is not None else []
+            if not finished:
+                return 0
+            archive(finished)
+            for record in finished:
+                ticket = self._log("remove", record)
+                self._by_id.pop(record.get("booking_id"), None)
+            schedule.prune(before)
+            self._notify(expert_id)
+        self._sync(ticket)
+        return len(finished)
+
+    def export(
+        self,
+        expert_id: Optional[str] = None,
+        concept_id: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[Dict]:
+        # Each expert's schedule is walked in place from ``start`` and left at
+        # ``end``; series sessions, few per expert, are merged in by start.
+        for current in [expert_id] if expert_id is not None else sorted(self._expert_ids()):
+            with self._locked([current], exclusive=False):
+                schedule = self._schedules.get(current)
+                series = schedule.series_sessions(start, end) if schedule is not None else []
+            if schedule is None:
+                continue
+            sessions: Iterable[Dict] = self._export_singles(current, start, end)
+            if series:
+                sessions = heapq.merge(sessions, series, key=lambda record: record["start"])
+            for session in sessions:
+                if concept_id is None or session.get("concept_id") == concept_id:
+                    yield session
+
+    def _export_singles(self, expert_id: str, start: Optional[datetime], end: Optional[datetime]) -> Iterator[Dict]:
+        after = None
+        while True:
+            with self._locked([expert_id], exclusive=False):
+                schedule = self._schedules.get(expert_id)
+                if schedule is None:
+                    return
+                records, after = schedule.page(start, end, after, EXPORT_PAGE)
+            yield from records
+            if after is None:
+                return
+
+    def clear(self) -> None:
+        with self._locked():
+            ticket = self._log("clear", None)
+            self._schedules.clear()
+            self._by_id.clear()
+            self._notify(None)
+        self._sync(ticket)
+
+    def for_expert(self, expert_id: str) -> List[Dict]:
+        schedule = self._schedules.get(expert_id)
+        if schedule is None:
+            return []
+        with self.lock_for(expert_id):
+            return list(schedule)
+
+    def overlapping(self, expert_id: str, start: datetime, end: datetime) -> List[Dict]:
+        schedule = self._schedules.get(expert_id)
+        if schedule is None:
+            return []
+        with self.lock_for(expert_id):
+            return schedule.overlapping(start, end)
+
+    def has_conflict(self, expert_id: str, start: datetime, end: datetime) -> bool:
+        schedule = self._schedules.get(expert_id)
+        if schedule is None:
+            return False
+        with self.lock_for(expert_id):
+            return schedule.overlaps(start, end)
+
+    def _log(self, operation: str, record: Optional[Dict]) -> int:
+        """Record a change made under the stripe locks; returns a sync ticket."""
+        return 0
+
+    def _sync(self, ticket: int) -> None:
+        """Wait until the change identified by ``ticket`` is durable."""
+
+    @contextmanager
+    def _locked(self, expert_ids: Optional[Iterable[str]] = None, exclusive: bool = True) -> Iterator[None]:
+        """Hold the stripes of ``expert_ids`` (every stripe when omitted).
+
+        Stripes are always held exclusively; subclasses sharing state across
+        processes may let readers (``exclusive=False``) share it.
+        """
+        if expert_ids is None:
+            stripes: Iterable[int] = range(len(self._locks))
+        else:
+            stripes = sorted({self._stripe(expert_id) for expert_id in expert_ids})
+        with ExitStack() as stack:
+            # Acquire stripes in index order so concurrent callers cannot deadlock.
+            for stripe in stripes:
+                stack.enter_context(self._locks[stripe])
+            yield
+
+    def _replay(self, operation: str, record: Optional[Dict]) -> None:
+        """Apply a change read back from a log, without logging it again."""
+        if operation == "add":
+            self._insert(record)
+        elif operation == "remove":
+            self._discard(record)
+        elif operation == "replace":
+            self._discard(record)
+            self._insert(record)
+        elif operation == "clear":
+            self._schedules.clear()
+            self._by_id.clear()
+            self._notify(None)
+
+    def _insert(self, record: Dict) -> None:
+        self._schedule(record["expert_id"]).add(record, next(self._sequence))
+        booking_id = record.get("booking_id")
+        if booking_id is not None:
+            self._by_id[booking_id] = record
+        self._notify(record["expert_id"])
+
+    def _discard(self, record: Dict) -> None:
+        """Remove the stored booking ``record`` stands for (same id, or equal without one)."""
+        booking_id = record.get("booking_id")
+        stored = self._by_id.pop(booking_id, None) if booking_id is not None else None
+        if stored is not None:
+            record = stored
+        schedule = self._schedules.get(record["expert_id"])
+        if schedule is not None:
+            schedule.remove(record)
+        self._notify(record["expert_id"])
+
+    def _forget(self, expert_id: str) -> None:
+        """Drop everything cached for ``expert_id``."""
+        schedule = self._schedules.pop(expert_id, None)
+        for record in schedule or ():
+            booking_id = record.get("booking_id")
+            if booking_id is not None and self._by_id.get(booking_id) is record:
+                del self._by_id[booking_id]
+        self._notify(expert_id)
+
+    def _expert_ids(self) -> List[str]:
+        return list(self._schedules)
+
+    def _stripe(self, expert_id: str) -> int:
+        return hash(expert_id) % len(self._locks)
+
+    def _schedule(self, expert_id: str) -> ExpertSchedule:
+        schedule = self._schedules.get(expert_id)
+        if schedule is None:
+            schedule = self._schedules.setdefault(expert_id, ExpertSchedule())
+        return schedule
@@ -0,0 +1,82 @@
+"""Pre-serialized response bodies with strong ETags."""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Callable, Hashable, NamedTuple, Optional, Tuple
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    return '"%s"' % blake2b(body, digest_size=16).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header against ``etag``.
+
+    ``If-None-Match`` uses weak comparison, so a ``W/`` prefix on a client
+    supplied tag still matches the strong tag we issued.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Encoded response bodies keyed by route and query parameters.
+
+    Entries are rendered on first use and kept until :meth:`invalidate` runs
+    for their route. A render that races with an invalidation is served but
+    not stored, so stale bodies never outlive a reload. Query parameters are
+    client controlled, so at most ``max_entries`` bodies are kept and the
+    least recently used go first.
+    """
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], CachedBody]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_render(self, route: str, key: Hashable, render: Callable[[], bytes]) -> CachedBody:
+        with self._lock:
+            entry = self._entries.get((route, key))
+            if entry is not None:
+                self._entries.move_to_end((route, key))
+                return entry
+            generation = self._generation
+
+        body = render()
+        entry = CachedBody(body=body, etag=make_etag(body))
+        with self._lock:
+            if generation == self._generation:
+                self._entries[(route, key)] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, *routes: str) -> None:
+        """Drop cached bodies for ``routes`` (every route when none are given)."""
+        with self._lock:
+            self._generation += 1
+            if not routes:
+                self._entries.clear()
+                return
+            for cache_key in [cache_key for cache_key in self._entries if cache_key[0] in routes]:
+                del self._entries[cache_key]
@@ -0,0 +1,213 @@
+"""Per-expert iCalendar feeds of bookings and weekly availability."""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from .availability import WEEKDAY_INDEX
+from .bookings import WEEK, BookingRepository, is_series
+from .cache import CachedBody, make_etag
+from .experts import ExpertDirectory
+from .schemas import Expert
+
+_UID_DOMAIN = "economics-learning"
+# Feeds carry no generation time, so an unchanged schedule renders the same
+# bytes (and ETag) in every worker; DTSTAMP is required, so it is fixed.
+_DTSTAMP = "DTSTAMP:20240101T000000Z\r\n"
+# A Monday; weekly availability repeats from the matching day of this week.
+_ANCHOR = date(2024, 1, 1)
+_FOOTER = "END:VCALENDAR\r\n"
+
+
+def _text(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _line(name: str, value: str) -> str:
+    """One content line, folded at 75 octets as RFC 5545 requires."""
+    line = f"{name}:{value}"
+    if len(line) <= 75 and line.isascii():
+        return line + "\r\n"
+    parts, current, size = [], [], 0
+    for char in line:
+        width = len(char.encode())
+        # Continuation lines start with a space, which counts towards the limit.
+        if size + width > (75 if not parts else 74):
+            parts.append("".join(current))
+            current, size = [], 0
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _stamp(value: datetime) -> str:
+    """A floating local time, as weekly availability is written."""
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _utc_stamp(value: datetime) -> str:
+    """A UTC time; naive booking times are already UTC (see ``utc_naive``)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_booking(record: Dict, concept_title: Optional[str]) -> str:
+    """A VEVENT for one booking; a weekly series becomes one recurring event."""
+    lines = [
+        "BEGIN:VEVENT\r\n",
+        _line("UID", f"{record.get('booking_id') or _stamp(record['start'])}@{_UID_DOMAIN}"),
+        _DTSTAMP,
+        _line("DTSTART", _utc_stamp(record["start"])),
+        _line("DTEND", _utc_stamp(record["end"])),
+    ]
+    if is_series(record):
+        lines.append(_line("RRULE", f"FREQ=WEEKLY;COUNT={record['occurrences']}"))
+        skipped = sorted(record.get("skipped") or ())
+        if skipped:
+            lines.append(_line("EXDATE", ",".join(_utc_stamp(record["start"] + week * WEEK) for week in skipped)))
+    title = concept_title or record.get("concept_id") or "Expert"
+    lines.append(_line("SUMMARY", _text(f"{title} session")))
+    details = []
+    if record.get("group_size"):
+        details.append(f"Group size: {record['group_size']}")
+    if record.get("price") is not None:
+        details.append(f"Price: {record['price']:.2f}")
+    if details:
+        lines.append(_line("DESCRIPTION", _text("\n".join(details))))
+    lines.append("TRANSP:OPAQUE\r\nEND:VEVENT\r\n")
+    return "".join(lines)
+
+
+def render_availability(expert: Expert) -> str:
+    """The calendar header plus one weekly recurring event per availability window."""
+    lines = [
+        "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n",
+        "PRODID:-//Economics Learning Prototype//Expert Calendar//EN\r\n",
+        "CALSCALE:GREGORIAN\r\nMETHOD:PUBLISH\r\n",
+        _line("X-WR-CALNAME", _text(f"{expert.name} sessions")),
+    ]
+    for window in expert.availability:
+        # Like WeeklyAvailability, windows on an unrecognized weekday are skipped.
+        weekday = WEEKDAY_INDEX.get(window.weekday)
+        if weekday is None:
+            continue
+        day = _ANCHOR + timedelta(days=weekday)
+        start, end = datetime.combine(day, window.start), datetime.combine(day, window.end)
+        # Same reading as WeeklyAvailability: an end before the start runs
+        # past midnight, and an empty window is not availability at all.
+        if end < start:
+            end += timedelta(days=1)
+        elif end == start:
+            continue
+        lines += [
+            "BEGIN:VEVENT\r\n",
+            _line("UID", f"availability-{expert.id}-{window.weekday}-{start:%H%M}@{_UID_DOMAIN}"),
+            _DTSTAMP,
+            _line("DTSTART", _stamp(start)),
+            _line("DTEND", _stamp(end)),
+            "RRULE:FREQ=WEEKLY\r\nSUMMARY:Available for sessions\r\nTRANSP:TRANSPARENT\r\nEND:VEVENT\r\n",
+        ]
+    return "".join(lines)
+
+
+class _Feed(NamedTuple):
+    token: Tuple[int, int]  # (generation, expert change count) it was built from
+    checked: float
+    cached: CachedBody
+    events: Dict[Hashable, Tuple[Dict, str]]  # booking key -> (record, rendered VEVENT)
+
+
+class CalendarFeeds:
+    """Rendered iCalendar feeds, one per expert, kept until that expert changes.
+
+    The booking store reports which expert each change touches, so a booking
+    only invalidates its own expert's feed. The next request rebuilds that
+    feed from the expert's bookings alone and re-renders only the events
+    whose booking changed. Directory and catalog reloads drop every feed.
+
+    Changes made by other worker processes are not reported; feeds older
+    than ``max_age`` seconds are checked against the store again, which
+    still reuses every unchanged event and keeps the ETag when nothing moved.
+    """
+
+    def __init__(
+        self,
+        bookings: BookingRepository,
+        directory: ExpertDirectory,
+        concept_title: Callable[[str], Optional[str]],
+        max_age: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._directory = directory
+        self._concept_title = concept_title
+        self.max_age = max_age
+        self._clock = clock
+        self._feeds: Dict[str, _Feed] = {}
+        self._changes: Dict[str, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.bind(bookings)
+        directory.subscribe(self.reset)
+
+    def __len__(self) -> int:
+        return len(self._feeds)
+
+    def bind(self, bookings: BookingRepository) -> None:
+        """Serve feeds from ``bookings`` from now on."""
+        self._bookings = bookings
+        bookings.subscribe(self.invalidate)
+        self.reset()
+
+    def invalidate(self, expert_id: Optional[str]) -> None:
+        with self._lock:
+            if expert_id is None:
+                self._generation += 1
+            else:
+                self._changes[expert_id] = self._changes.get(expert_id, 0) + 1
+
+    def reset(self) -> None:
+        """Drop every feed, e.g. after expert names, availability or concept titles change."""
+        with self._lock:
+            self._generation += 1
+            self._feeds.clear()
+
+    def get(self, expert_id: str) -> Optional[CachedBody]:
+        """Return the expert's feed, rebuilding it only when it may be stale."""
+        expert = self._directory.get(expert_id)
+        if expert is None:
+            return None
+        now = self._clock()
+        with self._lock:
+            token = (self._generation, self._changes.get(expert_id, 0))
+            feed = self._feeds.get(expert_id)
+        if feed is not None and feed.token == token and now - feed.checked < self.max_age:
+            return feed.cached
+
+        # Read after taking the token: a change landing meanwhile bumps the
+        # count, so the feed stored below is rebuilt on the next request.
+        previous = feed.events if feed is not None and feed.token[0] == token[0] else {}
+        events: Dict[Hashable, Tuple[Dict, str]] = {}
+        for record in self._bookings.for_expert(expert_id):
+            key = record.get("booking_id") or (record["start"], record["end"])
+            known = previous.get(key)
+            if known is not None and known[0] == record:
+                events[key] = known
+                continue
+            title = self._concept_title(record["concept_id"]) if record.get("concept_id") else None
+            events[key] = (dict(record), render_booking(record, title))
+
+        parts: List[str] = [render_availability(expert)]
+        parts.extend(text for _, text in events.values())
+        parts.append(_FOOTER)
+        body = "".join(parts).encode()
+        if feed is not None and feed.cached.body == body:
+            cached = feed.cached
+        else:
+            cached = CachedBody(body=body, etag=make_etag(body))
+        with self._lock:
+            self._feeds[expert_id] = _Feed(token, now, cached, events)
+        return cached
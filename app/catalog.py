@@ -0,0 +1,102 @@
+"""Prebuilt, read-only catalog of concepts and learning modules."""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .catalog_store import CatalogSource, FixtureCatalogSource
+from .schemas import Concept, LearningModule, trusted_concept, trusted_module
+
+
+class Catalog:
+    """Validated concept and module models shared by readers.
+
+    Models are built from ``source`` records on first access and kept in an
+    LRU of at most ``cache_size`` concepts; with no limit the whole catalog is
+    built up front on every :meth:`reload`. Between reloads every lookup
+    returns the same immutable instances while they stay cached. Listeners
+    registered with :meth:`subscribe` run after each reload so derived
+    caches can drop stale state.
+    """
+
+    def __init__(self, source: Optional[CatalogSource] = None, cache_size: Optional[int] = None) -> None:
+        self._source = source if source is not None else FixtureCatalogSource()
+        self.cache_size = cache_size
+        self._concepts: "OrderedDict[str, Concept]" = OrderedDict()
+        self._ids: Tuple[str, ...] = ()
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+        self.version = 0
+        self.reload()
+
+    def reload(self) -> None:
+        """Re-read the source, rebuild or drop cached models and notify listeners."""
+        self._source.refresh()
+        ids = tuple(self._source.concept_ids())
+        concepts: "OrderedDict[str, Concept]" = OrderedDict()
+        if self.cache_size is None:
+            for concept_id in ids:
+                concept = self._build(concept_id)
+                if concept is not None:
+                    concepts[concept_id] = concept
+        # Swap in one step so readers never see a half-built catalog.
+        with self._lock:
+            self._concepts, self._ids = concepts, ids
+        self.version += 1
+        for listener in list(self._listeners):
+            listener()
+
+    def subscribe(self, listener: Callable[[], None]) -> None:
+        self._listeners.append(listener)
+
+    def concept_ids(self) -> Tuple[str, ...]:
+        return self._ids
+
+    def concepts(self) -> List[Concept]:
+        if self.cache_size is None:
+            return list(self._concepts.values())
+        return [
+            concept
+            for concept in (self.get(concept_id) for concept_id in self._ids)
+            if concept is not None
+        ]
+
+    def get(self, concept_id: str) -> Optional[Concept]:
+        concept = self._concepts.get(concept_id)
+        if self.cache_size is None:
+            return concept
+        if concept is not None:
+            with self._lock:
+                if concept_id in self._concepts:
+                    self._concepts.move_to_end(concept_id)
+            return concept
+
+        concept = self._build(concept_id)
+        if concept is None:
+            return None
+        with self._lock:
+            concept = self._concepts.setdefault(concept_id, concept)
+            while len(self._concepts) > self.cache_size:
+                self._concepts.popitem(last=False)
+        return concept
+
+    def record(self, concept_id: str) -> Optional[Dict]:
+        """Return the raw source record for ``concept_id`` without building models."""
+        return self._source.concept(concept_id)
+
+    def module_records(self, concept_id: str) -> List[Dict]:
+        """Return the raw source records of the concept's modules."""
+        return self._source.modules(concept_id)
+
+    def modules_for(self, concept_id: str) -> List[LearningModule]:
+        concept = self.get(concept_id)
+        return list(concept.modules) if concept is not None else []
+
+    def _build(self, concept_id: str) -> Optional[Concept]:
+        record = self._source.concept(concept_id)
+        if record is None:
+            return None
+        # Source records are trusted, so models are built without validation.
+        modules = [trusted_module(module) for module in self._source.modules(concept_id)]
+        return trusted_concept(record, modules)
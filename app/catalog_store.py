@@ -0,0 +1,197 @@
+"""Catalog record sources: the in-code fixture and on-disk JSON lines files.
+
+A source hands out raw concept, module and expert dicts; :class:`Catalog`
+and :class:`ExpertDirectory` turn them into models. The on-disk format is one
+JSON object per line in ``concepts.jsonl``, ``modules.jsonl`` and
+``experts.jsonl``, plus ``index.json`` holding each record's byte offset so
+records can be read individually without parsing the whole file.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from datetime import time
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+from . import data
+
+_FILES = ("concepts.jsonl", "modules.jsonl", "experts.jsonl")
+_INDEX = "index.json"
+
+
+class CatalogSource(Protocol):
+    def refresh(self) -> None:
+        ...
+
+    def concept_ids(self) -> List[str]:
+        ...
+
+    def concept(self, concept_id: str) -> Optional[Dict]:
+        ...
+
+    def modules(self, concept_id: str) -> List[Dict]:
+        ...
+
+    def experts(self) -> Iterator[Dict]:
+        ...
+
+
+class FixtureCatalogSource:
+    """Records taken from a module shaped like :mod:`app.data`.
+
+    The module's ``CONCEPTS``, ``MODULES`` and ``EXPERTS`` attributes are read
+    on every :meth:`refresh`, so reassigning them and reloading picks up the
+    change.
+    """
+
+    def __init__(self, module: ModuleType = data) -> None:
+        self._module = module
+        self._modules: Dict[str, List[Dict]] = {}
+        self.refresh()
+
+    def refresh(self) -> None:
+        modules: Dict[str, List[Dict]] = {}
+        for module in self._module.MODULES:
+            modules.setdefault(module["concept_id"], []).append(module)
+        self._modules = modules
+
+    def concept_ids(self) -> List[str]:
+        return list(self._module.CONCEPTS)
+
+    def concept(self, concept_id: str) -> Optional[Dict]:
+        return self._module.CONCEPTS.get(concept_id)
+
+    def modules(self, concept_id: str) -> List[Dict]:
+        return list(self._modules.get(concept_id, ()))
+
+    def experts(self) -> Iterator[Dict]:
+        return iter(list(self._module.EXPERTS.values()))
+
+
+def _encode(value: object) -> str:
+    if isinstance(value, time):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode_expert(record: Dict) -> Dict:
+    for window in record.get("availability", []):
+        for key in ("start", "end"):
+            if isinstance(window.get(key), str):
+                window[key] = time.fromisoformat(window[key])
+    return record
+
+
+def write_catalog(
+    directory: str,
+    concepts: Dict[str, Dict],
+    modules: Iterable[Dict],
+    experts: Dict[str, Dict],
+) -> None:
+    """Write a catalog in the JSON lines layout read by :class:`JsonlCatalogSource`.
+
+    Modules are grouped by concept so each concept's modules occupy one
+    contiguous byte range.
+    """
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    index: Dict[str, Dict] = {"concepts": {}, "modules": {}, "experts": {}}
+
+    def dump(name: str, records: Iterable[Tuple[str, Dict]], section: str, grouped: bool = False) -> None:
+        offset = 0
+        with open(root / name, "wb") as handle:
+            for key, record in records:
+                line = json.dumps(record, default=_encode, separators=(",", ":")).encode() + b"\n"
+                handle.write(line)
+                if grouped:
+                    start, length, count = index[section].get(key, (offset, 0, 0))
+                    index[section][key] = (start, length + len(line), count + 1)
+                else:
+                    index[section][key] = (offset, len(line))
+                offset += len(line)
+
+    grouped_modules: Dict[str, List[Dict]] = {}
+    for module in modules:
+        grouped_modules.setdefault(module["concept_id"], []).append(module)
+
+    dump("concepts.jsonl", concepts.items(), "concepts")
+    dump(
+        "modules.jsonl",
+        ((concept_id, module) for concept_id, items in grouped_modules.items() for module in items),
+        "modules",
+        grouped=True,
+    )
+    dump("experts.jsonl", experts.items(), "experts")
+    (root / _INDEX).write_text(json.dumps(index))
+
+
+class JsonlCatalogSource:
+    """Catalog records read on demand from files written by :func:`write_catalog`.
+
+    Only the offset index is held in memory; each lookup reads and parses the
+    bytes of the requested record. Callers cache the models they build.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._handles: Dict[str, int] = {}
+        self._index: Dict[str, Dict] = {}
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-read the offset index and reopen the files after they are rewritten."""
+        index = json.loads((self.directory / _INDEX).read_text())
+        handles = {name: os.open(self.directory / name, os.O_RDONLY) for name in _FILES}
+        with self._lock:
+            previous, self._handles, self._index = self._handles, handles, index
+        for descriptor in previous.values():
+            os.close(descriptor)
+
+    def close(self) -> None:
+        with self._lock:
+            for descriptor in self._handles.values():
+                os.close(descriptor)
+            self._handles = {}
+
+    def concept_ids(self) -> List[str]:
+        return list(self._index["concepts"])
+
+    def concept(self, concept_id: str) -> Optional[Dict]:
+        entry = self._index["concepts"].get(concept_id)
+        if entry is None:
+            return None
+        return json.loads(self._read("concepts.jsonl", *entry))
+
+    def modules(self, concept_id: str) -> List[Dict]:
+        entry = self._index["modules"].get(concept_id)
+        if entry is None:
+            return []
+        offset, length, _ = entry
+        return [json.loads(line) for line in self._read("modules.jsonl", offset, length).splitlines()]
+
+    def experts(self) -> Iterator[Dict]:
+        with open(self.directory / "experts.jsonl", "rb") as handle:
+            for line in handle:
+                yield _decode_expert(json.loads(line))
+
+    def _read(self, name: str, offset: int, length: int) -> bytes:
+        # Held so refresh() cannot close the descriptor mid-read.
+        with self._lock:
+            return os.pread(self._handles[name], length, offset)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Export the built-in fixture: ``python -m app.catalog_store DIRECTORY``."""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
+        raise SystemExit("usage: python -m app.catalog_store DIRECTORY")
+    write_catalog(args[0], data.CONCEPTS, data.MODULES, data.EXPERTS)
+
+
+if __name__ == "__main__":
+    main()
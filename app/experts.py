@@ -0,0 +1,115 @@
+"""Expert directory with a prebuilt focus-area index."""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, List, Optional
+
+from .availability import WeeklyAvailability
+from .catalog_store import CatalogSource, FixtureCatalogSource
+from .schemas import Expert, trusted_expert
+
+
+def normalize_concept_id(concept_id: str) -> str:
+    """The form concept ids are indexed and looked up in: stripped and lower-cased."""
+    return concept_id.strip().lower()
+
+
+def _index(
+    experts: Dict[str, Expert],
+    by_concept: Dict[str, Dict[str, Expert]],
+    availability: Dict[str, WeeklyAvailability],
+    expert: Expert,
+) -> None:
+    experts[expert.id] = expert
+    availability[expert.id] = WeeklyAvailability.compile(expert.availability)
+    for area in expert.focus_areas:
+        by_concept.setdefault(normalize_concept_id(area), {})[expert.id] = expert
+
+
+class ExpertDirectory:
+    """Validated expert models plus an inverted index from concept to experts.
+
+    Experts are validated once when added. ``by_concept`` maps each
+    normalized focus area to the experts covering it, so filtered lookups cost
+    time proportional to the result rather than the marketplace, and each
+    expert's availability is compiled once into a :class:`WeeklyAvailability`.
+    The indexes are kept current by :meth:`add`, :meth:`update` and :meth:`remove`, and
+    listeners registered with :meth:`subscribe` run after every change.
+    """
+
+    def __init__(self, source: Optional[CatalogSource] = None) -> None:
+        self._source = source if source is not None else FixtureCatalogSource()
+        self._experts: Dict[str, Expert] = {}
+        self._by_concept: Dict[str, Dict[str, Expert]] = {}
+        self._availability: Dict[str, WeeklyAvailability] = {}
+        self._listeners: List[Callable[[], None]] = []
+        self._lock = threading.RLock()
+        self.version = 0
+        self.reload()
+
+    def __len__(self) -> int:
+        return len(self._experts)
+
+    def reload(self) -> None:
+        """Rebuild the directory from the source's experts and notify listeners."""
+        experts: Dict[str, Expert] = {}
+        by_concept: Dict[str, Dict[str, Expert]] = {}
+        availability: Dict[str, WeeklyAvailability] = {}
+        for expert_dict in self._source.experts():
+            _index(experts, by_concept, availability, trusted_expert(expert_dict))
+        with self._lock:
+            # Swap in one step so readers never see a half-built directory.
+            self._experts, self._by_concept, self._availability = experts, by_concept, availability
+            self._changed()
+
+    def subscribe(self, listener: Callable[[], None]) -> None:
+        self._listeners.append(listener)
+
+    def add(self, expert_dict: Dict) -> Expert:
+        """Validate and index an expert, replacing any entry with the same id."""
+        expert = Expert(**expert_dict)
+        with self._lock:
+            self._unindex(expert.id)
+            _index(self._experts, self._by_concept, self._availability, expert)
+            self._changed()
+        return expert
+
+    update = add
+
+    def remove(self, expert_id: str) -> bool:
+        with self._lock:
+            if not self._unindex(expert_id):
+                return False
+            self._changed()
+        return True
+
+    def get(self, expert_id: str) -> Optional[Expert]:
+        return self._experts.get(expert_id)
+
+    def availability(self, expert_id: str) -> Optional[WeeklyAvailability]:
+        return self._availability.get(expert_id)
+
+    def experts(self) -> List[Expert]:
+        return list(self._experts.values())
+
+    def for_concept(self, concept_id: str) -> List[Expert]:
+        return list(self._by_concept.get(normalize_concept_id(concept_id), {}).values())
+
+    def _unindex(self, expert_id: str) -> bool:
+        expert = self._experts.pop(expert_id, None)
+        if expert is None:
+            return False
+        self._availability.pop(expert_id, None)
+        for area in expert.focus_areas:
+            bucket = self._by_concept.get(normalize_concept_id(area))
+            if bucket is None:
+                continue
+            bucket.pop(expert_id, None)
+            if not bucket:
+                del self._by_concept[normalize_concept_id(area)]
+        return True
+
+    def _changed(self) -> None:
+        self.version += 1
+        for listener in list(self._listeners):
+            listener()
@@ -0,0 +1,107 @@
+"""Replay completed results for repeated ``Idempotency-Key`` requests."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class IdempotencyKeyReused(ValueError):
+    """Raised when a key is sent again with a different request body."""
+
+
+class _Flight:
+    """A computation in progress that later callers with the same key wait on."""
+
+    __slots__ = ("fingerprint", "done", "value", "error")
+
+    def __init__(self, fingerprint: Hashable) -> None:
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class IdempotencyCache:
+    """Results of completed requests, kept for ``ttl`` seconds per key.
+
+    :meth:`run` computes a key's result once. Callers arriving while it is in
+    flight wait for it instead of repeating the work, and callers arriving
+    later get the stored result until it expires. Only successful results are
+    stored: a computation that raises is reported to the callers already
+    waiting on it, and the next retry runs again. Every entry lives for the
+    same ``ttl``, so insertion order is expiry order and expired entries are
+    dropped from the front; past ``max_entries`` the oldest go first.
+    """
+
+    def __init__(
+        self, max_entries: int = 10_000, ttl: float = 24 * 3600, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Hashable, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def run(self, key: str, fingerprint: Hashable, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``compute()``'s result for ``key`` and whether it was replayed.
+
+        ``fingerprint`` identifies the request body; reusing a key for a
+        different body raises :class:`IdempotencyKeyReused`.
+        """
+        with self._lock:
+            self._expire(self._clock())
+            entry = self._entries.get(key)
+            if entry is not None:
+                _check(entry[1], fingerprint)
+                return entry[2], True
+            flight = self._in_flight.get(key)
+            if flight is None:
+                flight = self._in_flight[key] = _Flight(fingerprint)
+                leader = True
+            else:
+                _check(flight.fingerprint, fingerprint)
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+
+        try:
+            flight.value = compute()
+        except BaseException as exc:
+            flight.error = exc
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            self._entries[key] = (self._clock() + self.ttl, fingerprint, flight.value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        flight.done.set()
+        return flight.value, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            expires = next(iter(self._entries.values()))[0]
+            if expires > now:
+                return
+            self._entries.popitem(last=False)
+
+
+def _check(expected: Hashable, fingerprint: Hashable) -> None:
+    if expected != fingerprint:
+        raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
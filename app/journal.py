@@ -0,0 +1,351 @@
+"""Append-only booking journal with group commit and snapshots."""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from zlib import crc32
+
+from .bookings import BookingIndex, BookingStoreUnavailable
+
+_SNAPSHOT = "snapshot.json"
+_SEGMENT = "journal-%020d.log"
+_DATETIME_FIELDS = ("start", "end")
+
+
+def dump_record(record: Dict) -> Dict:
+    """Return ``record`` with datetimes as ISO strings, ready for JSON."""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in record.items()
+    }
+
+
+def load_record(payload: Dict) -> Dict:
+    """Turn the datetimes :func:`dump_record` wrote back into ``datetime`` objects."""
+    for key in _DATETIME_FIELDS:
+        if key in payload:
+            payload[key] = datetime.fromisoformat(payload[key])
+    return payload
+
+
+def encode_entry(sequence: int, operation: str, record: Optional[Dict]) -> bytes:
+    """Serialize one operation as a CRC-prefixed journal line."""
+    entry = {"seq": sequence, "op": operation}
+    if record is not None:
+        entry["record"] = dump_record(record)
+    payload = json.dumps(entry, separators=(",", ":")).encode()
+    return b"%08x %s\n" % (crc32(payload), payload)
+
+
+def decode_entry(line: bytes) -> Optional[Dict]:
+    """Parse one journal line, returning None when it is torn or corrupt."""
+    if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != crc32(payload):
+            return None
+        entry = json.loads(payload)
+    except ValueError:
+        return None
+    if "record" in entry:
+        entry["record"] = load_record(entry["record"])
+    return entry
+
+
+def _fsync_directory(directory: Path) -> None:
+    if os.name != "posix":  # pragma: no cover - directories cannot be fsync'd on Windows
+        return
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class BookingJournal:
+    """Segmented append-only log of booking operations.
+
+    Writers call :meth:`append` and then :meth:`wait`. The first waiter
+    becomes the commit leader: it optionally lingers up to ``group_delay``
+    seconds for ``group_size`` entries to accumulate, then writes every
+    pending entry with a single ``fsync`` and wakes the whole group.
+    Each line carries a CRC so a torn final record is detected and dropped
+    on recovery.
+
+    A failed write stops the journal: that waiter and every later one get
+    :class:`BookingStoreUnavailable` until the journal is reopened, which
+    recovers whatever reached the disk.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        group_size: int = 64,
+        group_delay: float = 0.0,
+        durable: bool = True,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.group_size = group_size
+        self.group_delay = group_delay
+        self.durable = durable
+        self.since_snapshot = 0
+        self._condition = threading.Condition()
+        self._pending: List[bytes] = []
+        self._sequence = 0
+        self._written = 0
+        self._flushing = False
+        self._error: Optional[BaseException] = None
+        self._file = None
+
+    def recover(self) -> Tuple[List[Dict], List[Dict]]:
+        """Return the latest snapshot's records and the journal entries after it.
+
+        Torn or corrupt trailing lines are truncated away. Writing resumes in
+        a fresh segment once recovery finishes.
+        """
+        snapshot_sequence, records = 0, []
+        snapshot_path = self.directory / _SNAPSHOT
+        if snapshot_path.exists():
+            snapshot = json.loads(snapshot_path.read_bytes())
+            snapshot_sequence = snapshot["seq"]
+            records = [load_record(record) for record in snapshot["records"]]
+
+        entries: List[Dict] = []
+        last_sequence = snapshot_sequence
+        for segment in self._segments():
+            for entry in self._read_segment(segment):
+                last_sequence = max(last_sequence, entry["seq"])
+                if entry["seq"] > snapshot_sequence:
+                    entries.append(entry)
+
+        entries.sort(key=lambda entry: entry["seq"])
+        self._sequence = self._written = last_sequence
+        self.since_snapshot = len(entries)
+        self._open_segment(last_sequence + 1)
+        return records, entries
+
+    def append(self, operation: str, record: Optional[Dict]) -> int:
+        """Queue an entry and return the sequence number to :meth:`wait` on."""
+        with self._condition:
+            self._sequence += 1
+            self._pending.append(encode_entry(self._sequence, operation, record))
+            self.since_snapshot += 1
+            if len(self._pending) >= self.group_size:
+                self._condition.notify_all()
+            return self._sequence
+
+    def wait(self, sequence: int) -> None:
+        """Block until the entry numbered ``sequence`` is on disk."""
+        with self._condition:
+            while self._written < sequence:
+                if self._error is not None:
+                    raise BookingStoreUnavailable("The booking journal could not be written") from self._error
+                if self._flushing:
+                    self._condition.wait()
+                    continue
+                self._lead_commit()
+
+    def rotate(self) -> int:
+        """Start a new segment and return the last sequence number assigned.
+
+        Callers must prevent concurrent :meth:`append` calls, so the returned
+        sequence describes exactly the state they are about to snapshot.
+        """
+        with self._condition:
+            while self._flushing:
+                self._condition.wait()
+            sequence = self._sequence
+            self._open_segment(sequence + 1)
+            self.since_snapshot = 0
+            return sequence
+
+    def write_snapshot(self, sequence: int, records: List[Dict]) -> None:
+        """Atomically persist ``records`` as of ``sequence`` and drop older segments."""
+        payload = json.dumps(
+            {"seq": sequence, "records": [dump_record(record) for record in records]},
+            separators=(",", ":"),
+        ).encode()
+        temporary = self.directory / (_SNAPSHOT + ".tmp")
+        with open(temporary, "wb") as handle:
+            handle.write(payload)
+            handle.flush()
+            if self.durable:
+                os.fsync(handle.fileno())
+        os.replace(temporary, self.directory / _SNAPSHOT)
+        if self.durable:
+            _fsync_directory(self.directory)
+
+        current = self.directory / (_SEGMENT % (sequence + 1))
+        for segment in self._segments():
+            if segment < current:
+                segment.unlink()
+
+    def close(self) -> None:
+        with self._condition:
+            while self._flushing:
+                self._condition.wait()
+            if self._pending and self._error is None:
+                self._lead_commit()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _lead_commit(self) -> None:
+        # Called with the condition held; releases it around the disk write.
+        self._flushing = True
+        try:
+            if self.group_delay > 0:
+                deadline = time.monotonic() + self.group_delay
+                while len(self._pending) < self.group_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            batch, self._pending = self._pending, []
+            last = self._sequence
+            handle = self._file
+            self._condition.release()
+            try:
+                handle.write(b"".join(batch))
+                handle.flush()
+                if self.durable:
+                    os.fsync(handle.fileno())
+            except Exception as error:
+                # Waiters find the error and raise it; nothing is retried.
+                self._error = error
+            else:
+                self._written = last
+            finally:
+                self._condition.acquire()
+        finally:
+            self._flushing = False
+            self._condition.notify_all()
+
+    def _open_segment(self, first_sequence: int) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.directory / (_SEGMENT % first_sequence), "ab")
+        if self.durable:
+            _fsync_directory(self.directory)
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.directory.glob("journal-*.log"))
+
+    @staticmethod
+    def _read_segment(segment: Path) -> Iterator[Dict]:
+        offset = 0
+        with open(segment, "rb") as handle:
+            for line in handle:
+                entry = decode_entry(line)
+                if entry is None:
+                    break
+                offset += len(line)
+                yield entry
+        if offset != segment.stat().st_size:
+            with open(segment, "r+b") as handle:
+                handle.truncate(offset)
+
+
+class JournaledBookingStore(BookingIndex):
+    """In-memory booking index made durable by a :class:`BookingJournal`.
+
+    Every change is journaled under the stripe locks that order it and is
+    durable before the call returns. A change the journal fails to write is
+    taken back out of memory before the caller sees the error. After ``snapshot_every`` journal entries
+    a compact snapshot replaces the older segments, so recovery loads one
+    snapshot and replays a bounded tail no matter how long the history is.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        snapshot_every: int = 10_000,
+        group_size: int = 64,
+        group_delay: float = 0.0,
+        durable: bool = True,
+        stripes: int = 64,
+    ) -> None:
+        super().__init__(stripes)
+        self.snapshot_every = snapshot_every
+        self.journal = BookingJournal(directory, group_size, group_delay, durable)
+        self._snapshot_lock = threading.Lock()
+        # Per thread: the changes logged since its last _sync, with what they replaced.
+        self._unsynced = threading.local()
+
+        records, entries = self.journal.recover()
+        for record in records:
+            self._insert(record)
+        for entry in entries:
+            self._replay(entry["op"], entry.get("record"))
+
+    def snapshot(self) -> None:
+        """Write a snapshot of the current bookings and drop replayed segments."""
+        with self._snapshot_lock:
+            self._write_snapshot()
+
+    def close(self) -> None:
+        self.journal.close()
+
+    def _log(self, operation: str, record: Optional[Dict]) -> int:
+        # Called before the change is applied, so whatever it replaces is still here.
+        if operation == "replace":
+            previous = [self._by_id[record["booking_id"]]]
+        elif operation == "clear":
+            previous = list(self)
+        else:
+            previous = []
+        self._changes().append((operation, record, previous))
+        return self.journal.append(operation, record)
+
+    def _sync(self, ticket: int) -> None:
+        changes = self._changes()
+        self._unsynced.changes = []
+        if not ticket:
+            return
+        try:
+            self.journal.wait(ticket)
+        except BookingStoreUnavailable:
+            self._roll_back(changes)
+            raise
+        if self.journal.since_snapshot < self.snapshot_every:
+            return
+        # One writer takes the snapshot; the others carry on without waiting.
+        if self._snapshot_lock.acquire(blocking=False):
+            try:
+                self._write_snapshot()
+            finally:
+                self._snapshot_lock.release()
+
+    def _changes(self) -> List[Tuple[str, Optional[Dict], List[Dict]]]:
+        changes = getattr(self._unsynced, "changes", None)
+        if changes is None:
+            changes = self._unsynced.changes = []
+        return changes
+
+    def _roll_back(self, changes: List[Tuple[str, Optional[Dict], List[Dict]]]) -> None:
+        """Undo ``changes`` in memory, newest first, after the journal lost them."""
+        if any(operation == "clear" for operation, _, _ in changes):
+            expert_ids = None
+        else:
+            expert_ids = {record["expert_id"] for _, record, _ in changes}
+        with self._locked(expert_ids):
+            for operation, record, previous in reversed(changes):
+                if operation in ("add", "replace"):
+                    self._discard(record)
+                elif operation == "remove":
+                    self._insert(record)
+                for replaced in previous:
+                    self._insert(replaced)
+
+    def _write_snapshot(self) -> None:
+        with self._locked():
+            records = list(self)
+            sequence = self.journal.rotate()
+        self.journal.write_snapshot(sequence, records)
@@ -0,0 +1,160 @@
+"""Rank experts for a learning request and return only the best few."""
+from __future__ import annotations
+
+import heapq
+import math
+from datetime import datetime, time, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .availability import WeeklyAvailability
+from .experts import ExpertDirectory, normalize_concept_id
+from .pricing import PricingEngine
+from .schemas import Expert
+
+_MINUTE = timedelta(minutes=1)
+
+# How much each normalized feature (all in [0, 1]) contributes to the score.
+COVERAGE_WEIGHT = 0.5
+PRICE_WEIGHT = 0.3
+OPEN_TIME_WEIGHT = 0.2
+
+
+class _Features(NamedTuple):
+    """What ranking needs from one expert, read once per directory change."""
+
+    rank: int  # position in id order, the tie-breaker
+    id: str
+    expert: Expert
+    availability: WeeklyAvailability
+
+
+class Match(NamedTuple):
+    expert: Expert
+    score: float
+    coverage: float
+    price: float
+    open_minutes: int
+
+
+class ExpertMatcher:
+    """Scores experts on concept coverage, price for the group and open time.
+
+    Prices come from ``pricing``, the engine bookings are charged by: the
+    rules' hourly rate and group multiplier for the requested group size.
+    Peak-time multipliers are left out, as a match names no session time.
+
+    Features are precomputed per expert and bucketed by focus area whenever
+    the directory changes, so a request only touches experts covering at
+    least one requested concept and never builds models for them. Ranking is
+    a threshold top-k: every candidate gets an upper-bound score that
+    assumes no bookings, candidates are popped from a heap in bound order and
+    scored exactly (which reads their bookings), and the search stops once
+    the k-th best exact score beats the best remaining bound. Bookings are
+    thus read for roughly k experts, not for every candidate.
+    """
+
+    def __init__(self, directory: ExpertDirectory, pricing: Optional[PricingEngine] = None) -> None:
+        self._directory = directory
+        self._pricing = pricing or PricingEngine()
+        self._by_concept: Dict[str, List[_Features]] = {}
+        directory.subscribe(self.refresh)
+        self.refresh()
+
+    def refresh(self) -> None:
+        by_concept: Dict[str, List[_Features]] = {}
+        experts = sorted(self._directory.experts(), key=lambda expert: expert.id)
+        for rank, expert in enumerate(experts):
+            availability = self._directory.availability(expert.id)
+            if availability is None:
+                availability = WeeklyAvailability.compile(expert.availability)
+            features = _Features(rank, expert.id, expert, availability)
+            for area in {normalize_concept_id(area) for area in expert.focus_areas}:
+                by_concept.setdefault(area, []).append(features)
+        self._by_concept = by_concept
+
+    def match(
+        self,
+        concept_ids: Iterable[str],
+        start: datetime,
+        end: datetime,
+        busy: Callable[[str, datetime, datetime], List[Dict]],
+        group_size: int = 1,
+        duration_minutes: int = 60,
+        k: int = 10,
+    ) -> List[Match]:
+        """Return the ``k`` best experts for ``concept_ids`` in ``[start, end)``, best first.
+
+        ``busy(expert_id, start, end)`` returns an expert's bookings in the
+        window. Experts with less open time than ``duration_minutes`` are
+        left out.
+        """
+        wanted = {normalize_concept_id(concept_id) for concept_id in concept_ids}
+        if not wanted or k <= 0 or end <= start:
+            return []
+        covered: Dict[int, int] = {}
+        candidates: Dict[int, _Features] = {}
+        for concept_id in wanted:
+            for features in self._by_concept.get(concept_id, ()):
+                covered[features.rank] = covered.get(features.rank, 0) + 1
+                candidates[features.rank] = features
+        if not candidates:
+            return []
+
+        week_start = datetime.combine(start.date() - timedelta(days=start.weekday()), time(0), start.tzinfo)
+        first = -((week_start - start) // _MINUTE)
+        last = (end - week_start) // _MINUTE
+
+        # One pass over the candidates computes their features for this
+        # window plus the extremes the score is normalized by.
+        rows: List[Tuple[int, _Features, int, float, int]] = []
+        cheapest, most_open = math.inf, 0
+        for rank, features in candidates.items():
+            available = features.availability.minutes_between(first, last)
+            if available < duration_minutes:
+                continue
+            # Per request: group sizes come from clients, so rates are not kept.
+            rate = self._pricing.hourly_rate(features.expert, group_size)
+            cheapest = min(cheapest, rate)
+            most_open = max(most_open, available)
+            rows.append((rank, features, covered[rank], rate, available))
+        if not rows:
+            return []
+        coverage_unit = COVERAGE_WEIGHT / len(wanted)
+        open_unit = OPEN_TIME_WEIGHT / most_open
+
+        def score(covers: int, rate: float, open_minutes: int) -> float:
+            # Price is proportional to rate, so the cheapest rate scores 1.
+            value = PRICE_WEIGHT * cheapest / rate if rate > 0 else PRICE_WEIGHT
+            return coverage_unit * covers + value + open_unit * open_minutes
+
+        # Max-heap on the no-bookings bound; heapify is linear in candidates.
+        bounds = [
+            (-score(covers, rate, available), rank, features, covers, rate, available)
+            for rank, features, covers, rate, available in rows
+        ]
+        heapq.heapify(bounds)
+        best: List[Tuple[float, int, _Features, int, float, int]] = []
+        while bounds and (len(best) < k or best[0][:2] < (-bounds[0][0], -bounds[0][1])):
+            _, rank, features, covers, rate, available = heapq.heappop(bounds)
+            booked = sum(
+                (min(booking["end"], end) - max(booking["start"], start)) // _MINUTE
+                for booking in busy(features.id, start, end)
+            )
+            open_minutes = max(0, available - booked)
+            if open_minutes < duration_minutes:
+                continue
+            entry = (score(covers, rate, open_minutes), -rank, features, covers, rate, open_minutes)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry[:2] > best[0][:2]:
+                heapq.heapreplace(best, entry)
+
+        best.sort(key=lambda entry: entry[:2], reverse=True)
+        matches = []
+        hours = duration_minutes / 60
+        for total, _, features, covers, rate, open_minutes in best:
+            expert = self._directory.get(features.id)
+            if expert is not None:
+                coverage = covers / len(wanted)
+                matches.append(Match(expert, round(total, 4), coverage, round(rate * hours, 2), open_minutes))
+        return matches
@@ -0,0 +1,288 @@
+"""In-process counters and histograms rendered in the Prometheus text format.
+
+Metrics are plain Python objects updated under a per-metric lock; there is no
+client library dependency. Booking stages are timed with a :class:`Stopwatch`
+that buffers its laps and records them into a count/sum summary per stage
+with a single lock acquisition, and HTTP latency histograms are recorded by
+:class:`MetricsMiddleware`, a pure ASGI wrapper.
+Set ``METRICS=0`` to turn collection off.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds, from 10us (an in-memory stage) to 10s (a stuck request).
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts are stored per bucket and cumulated on render."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: one count per bucket plus +Inf, then the running sum.
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._add(labels, value)
+
+    def observe_many(self, observations: Iterable[Tuple[Labels, float]]) -> None:
+        with self._lock:
+            for labels, value in observations:
+                self._add(labels, value)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def _add(self, labels: Labels, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket = _labels(self.labelnames, labels, 'le="%s"' % le)
+                yield f"{self.name}_bucket{bucket} {int(cumulative)}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {repr(float(series[-1]))}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {int(cumulative)}"
+
+
+class Summary:
+    """Running count and sum per label set: the cheapest timer Prometheus can read."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Per label set: [count, sum].
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        self.observe_many(((labels, value),))
+
+    def observe_many(self, observations: Iterable[Tuple[Labels, float]]) -> None:
+        series = self._series
+        with self._lock:
+            for labels, value in observations:
+                entry = series.get(labels)
+                if entry is None:
+                    entry = series[labels] = [0, 0.0]
+                entry[0] += 1
+                entry[1] += value
+
+    def count(self, *labels: str) -> int:
+        entry = self._series.get(labels)
+        return int(entry[0]) if entry else 0
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} summary"
+        with self._lock:
+            snapshot = sorted((labels, list(entry)) for labels, entry in self._series.items())
+        for labels, (count, total) in snapshot:
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {repr(float(total))}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {int(count)}"
+
+
+class Stopwatch:
+    """Times consecutive stages of one operation into a metric labelled by stage.
+
+    Laps only append a timestamp; durations are computed and recorded in one
+    locked pass by :meth:`finish`.
+    """
+
+    __slots__ = ("_metric", "_started", "_marks")
+
+    def __init__(self, metric: Summary) -> None:
+        self._metric = metric
+        self._marks: List[Tuple[str, float]] = []
+        self._started = perf_counter()
+
+    def lap(self, stage: str) -> None:
+        self._marks.append((stage, perf_counter()))
+
+    def finish(self) -> None:
+        last = self._started
+        durations = []
+        for stage, at in self._marks:
+            durations.append(((stage,), at - last))
+            last = at
+        self._metric.observe_many(durations)
+
+
+class _NullStopwatch(Stopwatch):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        pass
+
+    def lap(self, stage: str) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+NULL_STOPWATCH = _NullStopwatch()
+
+
+class Registry:
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def summary(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Summary:
+        metric = Summary(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def stopwatch(self, metric: Summary) -> Stopwatch:
+        return Stopwatch(metric) if self.enabled else NULL_STOPWATCH
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = Registry(enabled=os.environ.get("METRICS", "1") != "0")
+
+BOOKING_STAGE_SECONDS = REGISTRY.summary(
+    "booking_stage_seconds", "Time spent in each stage of booking a session.", ("stage",)
+)
+BOOKING_OUTCOMES = REGISTRY.counter(
+    "booking_outcomes_total", "Booking attempts by outcome: booked or the rejection reason.", ("outcome",)
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+)
+HTTP_RESPONSES = REGISTRY.counter(
+    "http_responses_total", "HTTP responses by route and status code.", ("method", "route", "status")
+)
+
+
+def record_outcome(outcome: str) -> None:
+    if REGISTRY.enabled:
+        BOOKING_OUTCOMES.inc(outcome)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and status per route template.
+
+    The route is read from ``scope["route"]`` after the app has run, so the
+    label is the path template (``/concepts/{concept_id}``) rather than the
+    raw path and label cardinality stays bounded.
+    """
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not REGISTRY.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - started
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(elapsed, method, route)
+            HTTP_RESPONSES.inc(method, route, str(status))
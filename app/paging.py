@@ -0,0 +1,72 @@
+"""Cursor pagination and field projection for list endpoints."""
+from __future__ import annotations
+
+import base64
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class InvalidQuery(ValueError):
+    """Raised for a malformed or stale cursor or an unknown projected field."""
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(offset: int, last_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{offset}:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        offset, last_id = raw.split(":", 1)
+        return int(offset), last_id
+    except ValueError as exc:
+        raise InvalidQuery("Malformed cursor") from exc
+
+
+def paginate(
+    items: Sequence[T], key: Callable[[T], str], cursor: Optional[str], limit: Optional[int]
+) -> Page:
+    """Return the slice of ``items`` following ``cursor``, at most ``limit`` long.
+
+    A cursor records the offset of the next item and the id of the last one
+    served. The offset makes resuming O(1); the id is checked against it so a
+    page requested after a reload resumes after that id even if items moved,
+    and fails with :class:`InvalidQuery` if it is gone.
+    """
+    start = 0
+    if cursor:
+        offset, last_id = decode_cursor(cursor)
+        if 0 < offset <= len(items) and key(items[offset - 1]) == last_id:
+            start = offset
+        else:
+            positions = [index for index, item in enumerate(items) if key(item) == last_id]
+            if not positions:
+                raise InvalidQuery("Cursor no longer matches any item")
+            start = positions[0] + 1
+
+    stop = len(items) if limit is None else min(len(items), start + limit)
+    page = list(items[start:stop])
+    next_cursor = encode_cursor(stop, key(page[-1])) if page and stop < len(items) else None
+    return Page(page, next_cursor)
+
+
+def parse_fields(text: Optional[str], allowed: Sequence[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a comma separated ``fields=`` value, always keeping ``id``.
+
+    Returns ``None`` when no projection was requested. Fields come back in
+    model order so projected bodies are deterministic.
+    """
+    if text is None:
+        return None
+    requested = {name.strip() for name in text.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise InvalidQuery(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(name for name in allowed if name in requested)
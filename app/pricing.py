@@ -0,0 +1,258 @@
+"""Rule-based session pricing evaluated column-wise over batches of quotes.
+
+A price is ``rate * hours * group multiplier * time multiplier``, rounded to
+cents. With default rules the group multiplier is the expert's
+``group_discount`` for groups and 1.0 otherwise and there are no peak windows,
+which is exactly the flat pricing bookings have always used.
+"""
+from __future__ import annotations
+
+import json
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .availability import MINUTES_PER_DAY, MINUTES_PER_WEEK, WEEKDAYS
+from .schemas import Expert
+
+_WEEKDAY_INDEX = {name: index for index, name in enumerate(WEEKDAYS)}
+
+
+class InvalidPricingRules(ValueError):
+    """Raised while loading rules with an unknown weekday, a malformed time or a missing field."""
+
+
+@dataclass(frozen=True)
+class GroupTier:
+    """Multiplier applied to groups of at least ``min_size`` learners."""
+
+    min_size: int
+    multiplier: float
+
+
+@dataclass(frozen=True)
+class PeakWindow:
+    """Time multiplier for ``[start, end)`` on each listed weekday.
+
+    As with availability windows, an ``end`` not after ``start`` runs past
+    midnight into the next day.
+    """
+
+    weekdays: Tuple[str, ...]
+    start: time
+    end: time
+    multiplier: float
+
+
+@dataclass(frozen=True)
+class PricingRules:
+    # ``None`` keeps the expert's own rate / group_discount.
+    rate_per_hour: Optional[float] = None
+    group_tiers: Optional[Tuple[GroupTier, ...]] = None
+    peak_windows: Tuple[PeakWindow, ...] = ()
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "PricingRules":
+        """Parse one rules object, raising :class:`InvalidPricingRules` for anything malformed."""
+        try:
+            return cls._parse(config)
+        except InvalidPricingRules:
+            raise
+        except (KeyError, TypeError, ValueError) as exc:
+            raise InvalidPricingRules(f"Malformed pricing rules: {exc!r}") from exc
+
+    @classmethod
+    def _parse(cls, config: Dict[str, Any]) -> "PricingRules":
+        if not isinstance(config, dict):
+            raise InvalidPricingRules(f"Pricing rules must be JSON objects, not {config!r}")
+        tiers = config.get("group_tiers")
+        return cls(
+            rate_per_hour=float(config["rate_per_hour"]) if config.get("rate_per_hour") is not None else None,
+            group_tiers=(
+                tuple(
+                    sorted(
+                        (GroupTier(int(tier["min_size"]), float(tier["multiplier"])) for tier in tiers),
+                        key=lambda tier: tier.min_size,
+                    )
+                )
+                if tiers is not None
+                else None
+            ),
+            peak_windows=tuple(
+                PeakWindow(
+                    weekdays=tuple(_weekday(day) for day in window["weekdays"]),
+                    start=_time(window["start"]),
+                    end=_time(window["end"]),
+                    multiplier=float(window["multiplier"]),
+                )
+                for window in config.get("peak_windows", ())
+            ),
+        )
+
+
+def _weekday(value: str) -> str:
+    day = value.strip().lower()
+    if day not in _WEEKDAY_INDEX:
+        raise InvalidPricingRules(f"Unknown weekday {value!r} in pricing rules; use one of {', '.join(WEEKDAYS)}")
+    return day
+
+
+def _time(value: str) -> time:
+    try:
+        return time.fromisoformat(value)
+    except (TypeError, ValueError) as exc:
+        raise InvalidPricingRules(f"Invalid time {value!r} in pricing rules; use HH:MM") from exc
+
+
+class _CompiledRules:
+    """Lookup tables for one :class:`PricingRules`.
+
+    ``cumulative[m]`` is the summed time multiplier over minutes ``[0, m)`` of
+    the week, so the mean multiplier of any session is two lookups. It is
+    ``None`` when no peak windows apply.
+    """
+
+    __slots__ = ("rate_per_hour", "tier_sizes", "tier_multipliers", "cumulative")
+
+    def __init__(self, rules: PricingRules) -> None:
+        self.rate_per_hour = rules.rate_per_hour
+        tiers = rules.group_tiers
+        self.tier_sizes = [tier.min_size for tier in tiers] if tiers is not None else None
+        self.tier_multipliers = [tier.multiplier for tier in tiers] if tiers is not None else None
+        self.cumulative: Optional[array] = None
+        if rules.peak_windows:
+            per_minute = array("d", [1.0]) * MINUTES_PER_WEEK
+            for window in rules.peak_windows:
+                start = window.start.hour * 60 + window.start.minute
+                end = window.end.hour * 60 + window.end.minute
+                length = end - start if end > start else end - start + MINUTES_PER_DAY
+                for weekday in window.weekdays:
+                    first = _WEEKDAY_INDEX[weekday] * MINUTES_PER_DAY + start
+                    for minute in range(first, first + length):
+                        per_minute[minute % MINUTES_PER_WEEK] = window.multiplier
+            cumulative = array("d", [0.0]) * (MINUTES_PER_WEEK + 1)
+            running = 0.0
+            for minute, multiplier in enumerate(per_minute):
+                running += multiplier
+                cumulative[minute + 1] = running
+            self.cumulative = cumulative
+
+
+class PricingEngine:
+    """Default rules plus per-expert overrides, priced a batch at a time."""
+
+    def __init__(
+        self, default: Optional[PricingRules] = None, overrides: Optional[Dict[str, PricingRules]] = None
+    ) -> None:
+        self.default = default or PricingRules()
+        self.overrides = dict(overrides or {})
+        self._compiled: Dict[PricingRules, _CompiledRules] = {}
+        # Compile every rule set now, so bad rules fail at startup rather
+        # than on the first quote that uses them.
+        for rules in (self.default, *self.overrides.values()):
+            self._compile(rules)
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "PricingEngine":
+        """Build from ``{"default": {...}, "experts": {expert_id: {...}}}``.
+
+        Expert entries are merged over the default, so an override only needs
+        the settings it changes.
+        """
+        if not isinstance(config, dict):
+            raise InvalidPricingRules("Pricing rules must be a JSON object")
+        default, experts = config.get("default", {}), config.get("experts", {})
+        if not isinstance(default, dict):
+            raise InvalidPricingRules('"default" pricing rules must be a JSON object')
+        if not isinstance(experts, dict):
+            raise InvalidPricingRules('"experts" must map expert ids to pricing rules')
+        overrides = {}
+        for expert_id, override in experts.items():
+            if not isinstance(override, dict):
+                raise InvalidPricingRules(f"Pricing rules for expert {expert_id!r} must be a JSON object")
+            overrides[expert_id] = PricingRules.from_dict({**default, **override})
+        return cls(PricingRules.from_dict(default), overrides)
+
+    @classmethod
+    def from_file(cls, path: str) -> "PricingEngine":
+        with open(path) as handle:
+            try:
+                config = json.load(handle)
+            except json.JSONDecodeError as exc:
+                raise InvalidPricingRules(f"{path} is not valid JSON: {exc}") from exc
+        return cls.from_dict(config)
+
+    def rules_for(self, expert_id: str) -> PricingRules:
+        return self.overrides.get(expert_id, self.default)
+
+    def hourly_rate(self, expert: Expert, group_size: int = 1) -> float:
+        """The rate per hour ``group_size`` learners pay, before peak-time multipliers."""
+        rules = self._compile(self.rules_for(expert.id))
+        rate = rules.rate_per_hour if rules.rate_per_hour is not None else expert.rate_per_hour
+        return rate * _group_multiplier(rules, expert, group_size)
+
+    def quote(self, expert: Expert, duration_minutes: int, group_size: int, start: Optional[datetime] = None) -> float:
+        """Price one session; the scalar twin of :meth:`quote_many` used when booking."""
+        rules = self._compile(self.rules_for(expert.id))
+        rate = rules.rate_per_hour if rules.rate_per_hour is not None else expert.rate_per_hour
+        base = rate * (duration_minutes / 60)
+        group = _group_multiplier(rules, expert, group_size)
+        return round(base * group * _time_multiplier(rules.cumulative, start, duration_minutes), 2)
+
+    def quote_many(
+        self,
+        experts: Sequence[Expert],
+        durations: Sequence[int],
+        group_sizes: Sequence[int],
+        starts: Sequence[Optional[datetime]],
+    ) -> List[float]:
+        """Price parallel columns of sessions.
+
+        Each factor is computed as a whole column before the columns are
+        multiplied, so per-quote work is a few table lookups rather than a
+        walk through the rules.
+        """
+        compiled = [self._compile(self.rules_for(expert.id)) for expert in experts]
+        rates = [
+            rules.rate_per_hour if rules.rate_per_hour is not None else expert.rate_per_hour
+            for rules, expert in zip(compiled, experts)
+        ]
+        bases = [rate * (duration / 60) for rate, duration in zip(rates, durations)]
+        groups = [
+            _group_multiplier(rules, expert, size) for rules, expert, size in zip(compiled, experts, group_sizes)
+        ]
+        times = [
+            _time_multiplier(rules.cumulative, start, duration)
+            for rules, start, duration in zip(compiled, starts, durations)
+        ]
+        return [round(base * group * factor, 2) for base, group, factor in zip(bases, groups, times)]
+
+    def _compile(self, rules: PricingRules) -> _CompiledRules:
+        compiled = self._compiled.get(rules)
+        if compiled is None:
+            compiled = self._compiled[rules] = _CompiledRules(rules)
+        return compiled
+
+
+def _group_multiplier(rules: _CompiledRules, expert: Expert, group_size: int) -> float:
+    if rules.tier_sizes is None:
+        return expert.group_discount if group_size > 1 else 1.0
+    position = bisect_right(rules.tier_sizes, group_size)
+    return rules.tier_multipliers[position - 1] if position else 1.0
+
+
+def _time_multiplier(cumulative: Optional[array], start: Optional[datetime], duration: int) -> float:
+    """Mean time multiplier over the session's minutes (1.0 without peak rules)."""
+    if cumulative is None or start is None or duration <= 0:
+        return 1.0
+    first = start.weekday() * MINUTES_PER_DAY + start.hour * 60 + start.minute
+    weeks, remainder = divmod(duration, MINUTES_PER_WEEK)
+    total = weeks * cumulative[MINUTES_PER_WEEK]
+    last = first + remainder
+    if last <= MINUTES_PER_WEEK:
+        total += cumulative[last] - cumulative[first]
+    else:
+        total += cumulative[MINUTES_PER_WEEK] - cumulative[first] + cumulative[last - MINUTES_PER_WEEK]
+    return total / duration
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime, time
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
 
 try:  # pragma: no cover - exercised implicitly when pydantic is available
     from pydantic import BaseModel, Field, validator
@@ -11,16 +11,25 @@ except ImportError:  # pragma: no cover
     Field = None  # type: ignore[assignment]
     validator = None  # type: ignore[assignment]
 
+M = TypeVar("M")
+
 
 if BaseModel:  # pragma: no cover - executed in environments with pydantic
 
-    class Resource(BaseModel):
+    class _ReadOnlyModel(BaseModel):
+        """Base for catalog and expert models that are built once and shared."""
+
+        class Config:
+            allow_mutation = False
+
+
+    class Resource(_ReadOnlyModel):
         type: str
         title: str
         url: str
 
 
-    class LearningModule(BaseModel):
+    class LearningModule(_ReadOnlyModel):
         id: str
         concept_id: str
         title: str
@@ -29,7 +38,7 @@ if BaseModel:  # pragma: no cover - executed in environments with pydantic
         resources: List[Resource]
 
 
-    class Concept(BaseModel):
+    class Concept(_ReadOnlyModel):
         id: str
         title: str
         summary: str
@@ -37,7 +46,7 @@ if BaseModel:  # pragma: no cover - executed in environments with pydantic
         modules: List[LearningModule]
 
 
-    class ExpertAvailability(BaseModel):
+    class ExpertAvailability(_ReadOnlyModel):
         weekday: str
         start: time
         end: time
@@ -47,7 +56,7 @@ if BaseModel:  # pragma: no cover - executed in environments with pydantic
             return value.strip().lower()
 
 
-    class Expert(BaseModel):
+    class Expert(_ReadOnlyModel):
         id: str
         name: str
         credentials: str
@@ -80,28 +89,183 @@ if BaseModel:  # pragma: no cover - executed in environments with pydantic
         price: float
 
 
+    class BatchBookingRequest(BaseModel):
+        bookings: List[BookingRequest] = Field(..., min_items=1, max_items=500)
+        atomic: bool = False
+
+
+    class RecurringBookingRequest(BaseModel):
+        expert_id: str
+        concept_id: str
+        start_time: datetime
+        duration_minutes: int
+        client_name: str
+        # Consecutive weeks starting with ``start_time``'s week, at most two years.
+        weeks: int = Field(..., ge=1, le=104)
+        group_size: Optional[int] = 1
+        # Week numbers (0 = first session) to leave out, e.g. holidays.
+        skip_weeks: List[int] = []
+        # Skip weeks that clash with existing bookings instead of rejecting.
+        skip_conflicts: bool = False
+
+
+    class BookingUpdate(BaseModel):
+        start_time: datetime
+        # Keeps the current length when omitted.
+        duration_minutes: Optional[int] = None
+
+
+    class QuoteItem(BaseModel):
+        expert_id: str
+        duration_minutes: int
+        group_size: Optional[int] = 1
+        start_time: Optional[datetime] = None
+
+
+    class QuoteRequest(BaseModel):
+        quotes: List[QuoteItem] = Field(..., min_items=1, max_items=1000)
+
+
+    class Quote(BaseModel):
+        index: int
+        expert_id: str
+        price: Optional[float] = None
+        error: Optional[str] = None
+
+
+    class QuoteResponse(BaseModel):
+        quotes: List[Quote]
+
+
+    class SearchResult(BaseModel):
+        type: str
+        id: str
+        concept_id: str
+        title: str
+        score: float
+
+
+    class SearchResponse(BaseModel):
+        results: List[SearchResult]
+
+
+    class ExpertMatch(BaseModel):
+        expert: Expert
+        score: float
+        coverage: float
+        price: float
+        open_minutes: int
+
+
+    class MatchResponse(BaseModel):
+        matches: List[ExpertMatch]
+
+
+    class SeriesConfirmation(BaseModel):
+        booking_id: str
+        expert: Expert
+        concept: Concept
+        # The first session; the others follow weekly.
+        start_time: datetime
+        end_time: datetime
+        weeks: int
+        skipped_weeks: List[int]
+        sessions: int
+        group_size: int
+        price_per_session: float
+        total_price: float
+
+
+    class SeriesResponse(BaseModel):
+        series: SeriesConfirmation
+
+
+    class BatchBookingResult(BaseModel):
+        index: int
+        confirmation: Optional[BookingConfirmation] = None
+        error: Optional[str] = None
+
+
     class ConceptResponse(BaseModel):
         concepts: List[Concept]
+        next_cursor: Optional[str] = None
 
 
     class ExpertsResponse(BaseModel):
         experts: List[Expert]
+        next_cursor: Optional[str] = None
+
+
+    class OpenSlot(BaseModel):
+        start: datetime
+        end: datetime
+
+
+    class ExpertOpenSlots(BaseModel):
+        expert_id: str
+        name: str
+        slots: List[OpenSlot]
+
+
+    class AvailabilityResponse(BaseModel):
+        experts: List[ExpertOpenSlots]
 
 
     class BookingResponse(BaseModel):
         confirmation: BookingConfirmation
 
+
+    class BatchBookingResponse(BaseModel):
+        results: List[BatchBookingResult]
+        booked: int
+
+
+    def field_names(model: type) -> Tuple[str, ...]:
+        return tuple(model.__fields__)
+
+
+    def to_dict(instance: BaseModel) -> Dict[str, Any]:
+        return instance.dict()
+
+
+    def trusted(model: Type[M], **values: Any) -> M:
+        """Build ``model`` from already typed values, skipping validation.
+
+        Only for data produced inside the service (catalog records, models we
+        already hold); request bodies must go through normal validation.
+        """
+        return model.construct(**values)
+
+
+    def trusted_module(record: Dict[str, Any]) -> LearningModule:
+        resources = [Resource.construct(**resource) for resource in record["resources"]]
+        return LearningModule.construct(**{**record, "resources": resources})
+
+
+    def trusted_concept(record: Dict[str, Any], modules: List[LearningModule]) -> Concept:
+        return Concept.construct(**record, modules=modules)
+
+
+    def trusted_expert(record: Dict[str, Any]) -> Expert:
+        availability = [
+            ExpertAvailability.construct(
+                weekday=window["weekday"].strip().lower(), start=window["start"], end=window["end"]
+            )
+            for window in record["availability"]
+        ]
+        return Expert.construct(**{**record, "availability": availability})
+
 else:
-    from dataclasses import dataclass, field
+    from dataclasses import asdict, dataclass, field, fields
 
-    @dataclass
+    @dataclass(frozen=True, slots=True)
     class Resource:
         type: str
         title: str
         url: str
 
 
-    @dataclass
+    @dataclass(frozen=True, slots=True)
     class LearningModule:
         id: str
         concept_id: str
@@ -111,7 +275,7 @@ else:
         resources: List[Resource]
 
 
-    @dataclass
+    @dataclass(frozen=True, slots=True)
     class Concept:
         id: str
         title: str
@@ -120,17 +284,17 @@ else:
         modules: List[LearningModule]
 
 
-    @dataclass
+    @dataclass(frozen=True, slots=True)
     class ExpertAvailability:
         weekday: str
         start: time
         end: time
 
         def __post_init__(self) -> None:
-            self.weekday = self.weekday.strip().lower()
+            object.__setattr__(self, "weekday", self.weekday.strip().lower())
 
 
-    @dataclass
+    @dataclass(frozen=True, slots=True)
     class Expert:
         id: str
         name: str
@@ -166,16 +330,174 @@ else:
         price: float
 
 
+    @dataclass
+    class BatchBookingRequest:
+        bookings: List[BookingRequest]
+        atomic: bool = False
+
+
+    @dataclass
+    class RecurringBookingRequest:
+        expert_id: str
+        concept_id: str
+        start_time: datetime
+        duration_minutes: int
+        client_name: str
+        weeks: int
+        group_size: Optional[int] = 1
+        skip_weeks: List[int] = field(default_factory=list)
+        skip_conflicts: bool = False
+
+
+    @dataclass
+    class BookingUpdate:
+        start_time: datetime
+        duration_minutes: Optional[int] = None
+
+
+    @dataclass
+    class QuoteItem:
+        expert_id: str
+        duration_minutes: int
+        group_size: Optional[int] = 1
+        start_time: Optional[datetime] = None
+
+
+    @dataclass
+    class QuoteRequest:
+        quotes: List[QuoteItem]
+
+
+    @dataclass
+    class Quote:
+        index: int
+        expert_id: str
+        price: Optional[float] = None
+        error: Optional[str] = None
+
+
+    @dataclass
+    class QuoteResponse:
+        quotes: List[Quote]
+
+
+    @dataclass
+    class SearchResult:
+        type: str
+        id: str
+        concept_id: str
+        title: str
+        score: float
+
+
+    @dataclass
+    class SearchResponse:
+        results: List[SearchResult]
+
+
+    @dataclass
+    class ExpertMatch:
+        expert: Expert
+        score: float
+        coverage: float
+        price: float
+        open_minutes: int
+
+
+    @dataclass
+    class MatchResponse:
+        matches: List[ExpertMatch]
+
+
+    @dataclass
+    class SeriesConfirmation:
+        booking_id: str
+        expert: Expert
+        concept: Concept
+        start_time: datetime
+        end_time: datetime
+        weeks: int
+        skipped_weeks: List[int]
+        sessions: int
+        group_size: int
+        price_per_session: float
+        total_price: float
+
+
+    @dataclass
+    class SeriesResponse:
+        series: SeriesConfirmation
+
+
+    @dataclass
+    class BatchBookingResult:
+        index: int
+        confirmation: Optional[BookingConfirmation] = None
+        error: Optional[str] = None
+
+
     @dataclass
     class ConceptResponse:
         concepts: List[Concept]
+        next_cursor: Optional[str] = None
 
 
     @dataclass
     class ExpertsResponse:
         experts: List[Expert]
+        next_cursor: Optional[str] = None
+
+
+    @dataclass
+    class OpenSlot:
+        start: datetime
+        end: datetime
+
+
+    @dataclass
+    class ExpertOpenSlots:
+        expert_id: str
+        name: str
+        slots: List[OpenSlot]
+
+
+    @dataclass
+    class AvailabilityResponse:
+        experts: List[ExpertOpenSlots]
 
 
     @dataclass
     class BookingResponse:
         confirmation: BookingConfirmation
+
+
+    @dataclass
+    class BatchBookingResponse:
+        results: List[BatchBookingResult]
+        booked: int
+
+
+    def field_names(model: type) -> Tuple[str, ...]:
+        return tuple(item.name for item in fields(model))
+
+
+    def to_dict(instance: Any) -> Dict[str, Any]:
+        return asdict(instance)
+
+
+    def trusted(model: Type[M], **values: Any) -> M:
+        return model(**values)
+
+
+    def trusted_module(record: Dict[str, Any]) -> LearningModule:
+        resources = [Resource(**resource) for resource in record["resources"]]
+        return LearningModule(**{**record, "resources": resources})
+
+
+    def trusted_concept(record: Dict[str, Any], modules: List[LearningModule]) -> Concept:
+        return Concept(**record, modules=modules)
+
+
+    def trusted_expert(record: Dict[str, Any]) -> Expert:
+        availability = [ExpertAvailability(**window) for window in record["availability"]]
+        return Expert(**{**record, "availability": availability})
@@ -0,0 +1,260 @@
+"""Inverted index with BM25 ranking over concepts and learning modules."""
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import count
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the to what when where why with".split()
+)
+
+# Typeahead expands the last token to at most this many vocabulary terms and
+# reads at most this many of each term's highest-impact postings.
+MAX_EXPANSIONS = 64
+TOP_POSTINGS = 256
+# Typeahead completions score slightly below the exact term typed so far.
+_COMPLETION_WEIGHT = 0.9
+# Past this many vocabulary changes in one update, re-sorting beats inserting.
+_RESORT_THRESHOLD = 256
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+class SearchDocument(NamedTuple):
+    kind: str
+    id: str
+    concept_id: str
+    title: str
+    body: str
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    id: str
+    concept_id: str
+    title: str
+    score: float
+
+
+def catalog_documents(catalog: object) -> Iterator[SearchDocument]:
+    """Documents for every concept and module, read from raw catalog records."""
+    for concept_id in catalog.concept_ids():  # type: ignore[attr-defined]
+        record = catalog.record(concept_id)  # type: ignore[attr-defined]
+        if record is None:
+            continue
+        yield SearchDocument(
+            "concept", concept_id, concept_id, record["title"], f"{record['summary']} {record['why_it_matters']}"
+        )
+        for module in catalog.module_records(concept_id):  # type: ignore[attr-defined]
+            body = " ".join(
+                [*module["objectives"], module["content_summary"], *(r["title"] for r in module["resources"])]
+            )
+            yield SearchDocument("module", module["id"], concept_id, module["title"], body)
+
+
+class SearchIndex:
+    """BM25 ranked inverted index that is updated in place.
+
+    :meth:`update` diffs the given documents against what is indexed and only
+    re-tokenizes new or changed ones, so a catalog reload costs time
+    proportional to what changed. Titles count twice towards term frequency.
+    Vocabulary terms are kept sorted so a prefix maps to a contiguous range,
+    and each term caches its postings in impact order so typeahead can score
+    a bounded candidate set instead of every posting.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._vocabulary: List[str] = []
+        self._top: Dict[str, List[int]] = {}
+        self._documents: Dict[int, SearchDocument] = {}
+        self._numbers: Dict[Tuple[str, str], int] = {}
+        self._terms: Dict[int, Counter] = {}
+        self._lengths: Dict[int, int] = {}
+        self._total_length = 0
+        self._sequence = count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def update(self, documents: Iterable[SearchDocument]) -> Tuple[int, int, int]:
+        """Make the index match ``documents``; returns (added, changed, removed) counts."""
+        added = changed = 0
+        with self._lock:
+            new_terms: Set[str] = set()
+            dropped_terms: Set[str] = set()
+            current: Set[Tuple[str, str]] = set()
+            for document in documents:
+                key = (document.kind, document.id)
+                current.add(key)
+                number = self._numbers.get(key)
+                if number is not None:
+                    if self._documents[number] == document:
+                        continue
+                    dropped_terms |= self._remove(number)
+                    changed += 1
+                else:
+                    added += 1
+                new_terms |= self._add(key, document)
+
+            removed_keys = [key for key in self._numbers if key not in current]
+            for key in removed_keys:
+                dropped_terms |= self._remove(self._numbers[key])
+            self._refresh_vocabulary(new_terms, dropped_terms)
+        return added, changed, len(removed_keys)
+
+    def search(self, query: str, limit: int = 10, prefix: bool = False) -> List[SearchHit]:
+        """Rank documents for ``query``.
+
+        With ``prefix`` the last token also matches any term it starts, for
+        typeahead; see :meth:`_typeahead`.
+        """
+        tokens = _TOKEN.findall(query.lower())
+        if not tokens:
+            return []
+        with self._lock:
+            if not self._documents:
+                return []
+            complete = tokens[:-1] if prefix else tokens
+            terms = [token for token in complete if token not in _STOPWORDS and token in self._postings]
+            scores = self._typeahead(terms, tokens[-1]) if prefix else self._accumulate(terms)
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+            return [
+                SearchHit(document.kind, document.id, document.concept_id, document.title, round(score, 4))
+                for document, score in ((self._documents[number], score) for number, score in best)
+            ]
+
+    def _add(self, key: Tuple[str, str], document: SearchDocument) -> Set[str]:
+        number = next(self._sequence)
+        terms = Counter(tokenize(document.title) * 2 + tokenize(document.body))
+        new_terms = set()
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                new_terms.add(term)
+            postings[number] = frequency
+            self._top.pop(term, None)
+        self._numbers[key] = number
+        self._documents[number] = document
+        self._terms[number] = terms
+        length = sum(terms.values())
+        self._lengths[number] = length
+        self._total_length += length
+        return new_terms
+
+    def _remove(self, number: int) -> Set[str]:
+        document = self._documents.pop(number)
+        del self._numbers[(document.kind, document.id)]
+        self._total_length -= self._lengths.pop(number)
+        dropped = set()
+        for term in self._terms.pop(number):
+            postings = self._postings[term]
+            del postings[number]
+            self._top.pop(term, None)
+            if not postings:
+                del self._postings[term]
+                dropped.add(term)
+        return dropped
+
+    def _refresh_vocabulary(self, new_terms: Set[str], dropped_terms: Set[str]) -> None:
+        # Terms can be dropped and re-added within one update.
+        new_terms = {term for term in new_terms if term in self._postings}
+        dropped_terms = {term for term in dropped_terms if term not in self._postings}
+        if len(new_terms) + len(dropped_terms) > _RESORT_THRESHOLD:
+            self._vocabulary = sorted(self._postings)
+            return
+        for term in dropped_terms:
+            position = bisect_left(self._vocabulary, term)
+            if position < len(self._vocabulary) and self._vocabulary[position] == term:
+                del self._vocabulary[position]
+        for term in new_terms:
+            position = bisect_left(self._vocabulary, term)
+            if position == len(self._vocabulary) or self._vocabulary[position] != term:
+                insort(self._vocabulary, term)
+
+    def _expand(self, prefix: str) -> List[str]:
+        start = bisect_left(self._vocabulary, prefix)
+        stop = bisect_left(self._vocabulary, prefix + "\uffff")
+        if stop - start <= MAX_EXPANSIONS:
+            return self._vocabulary[start:stop]
+        return heapq.nlargest(
+            MAX_EXPANSIONS, self._vocabulary[start:stop], key=lambda term: len(self._postings[term])
+        )
+
+    def _idf(self, term: str) -> float:
+        frequency = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self._documents) - frequency + 0.5) / (frequency + 0.5))
+
+    def _weight(self, frequency: int, length: int, average: float) -> float:
+        return frequency * (self.k1 + 1) / (frequency + self.k1 * (1 - self.b + self.b * length / average))
+
+    def _accumulate(self, terms: List[str]) -> Dict[int, float]:
+        average = self._total_length / len(self._documents)
+        scores: Dict[int, float] = {}
+        for term in terms:
+            idf = self._idf(term)
+            for number, frequency in self._postings[term].items():
+                scores[number] = scores.get(number, 0.0) + idf * self._weight(
+                    frequency, self._lengths[number], average
+                )
+        return scores
+
+    def _typeahead(self, terms: List[str], prefix: str) -> Dict[int, float]:
+        """Score a bounded candidate set for ``terms`` plus completions of ``prefix``.
+
+        Candidates are the highest-impact postings of every term, with the
+        per-term share shrinking as a short prefix expands to many terms, so
+        the work is capped at about ``TOP_POSTINGS * 8`` postings. Candidates
+        then get exact scores for the complete terms; completions longer than
+        the typed prefix count slightly less than an exact match.
+        """
+        average = self._total_length / len(self._documents)
+        expansions = self._expand(prefix)
+        share = max(16, TOP_POSTINGS * 8 // max(1, len(terms) + len(expansions)))
+        scores: Dict[int, float] = {}
+        for term in expansions:
+            postings = self._postings[term]
+            idf = self._idf(term) * (1.0 if term == prefix else _COMPLETION_WEIGHT)
+            for number in self._top_postings(term)[:share]:
+                scores[number] = scores.get(number, 0.0) + idf * self._weight(
+                    postings[number], self._lengths[number], average
+                )
+        for term in terms:
+            for number in self._top_postings(term)[:share]:
+                scores.setdefault(number, 0.0)
+        for term in terms:
+            postings = self._postings[term]
+            idf = self._idf(term)
+            for number in scores:
+                frequency = postings.get(number)
+                if frequency:
+                    scores[number] += idf * self._weight(frequency, self._lengths[number], average)
+        return scores
+
+    def _top_postings(self, term: str) -> List[int]:
+        top = self._top.get(term)
+        if top is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return []
+            average = self._total_length / len(self._documents)
+            top = heapq.nlargest(
+                TOP_POSTINGS,
+                postings,
+                key=lambda number: self._weight(postings[number], self._lengths[number], average),
+            )
+            self._top[term] = top
+        return top
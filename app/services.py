@@ -1,149 +1,683 @@
 """Service layer for the economics education prototype."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Dict, Iterable, List, Optional
+import os
+from datetime import datetime, time, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from uuid import uuid4
 
-from . import data
+from .archive import BookingArchive, CompactionTask
+from .availability import WeeklyAvailability, subtract_intervals
+from .bookings import WEEK, BookingIndex, BookingRepository, expand_sessions, is_series
+from .cache import CachedBody
+from .calendar_feed import CalendarFeeds
+from .catalog import Catalog
+from .catalog_store import CatalogSource, FixtureCatalogSource, JsonlCatalogSource
+from .experts import ExpertDirectory
+from .journal import JournaledBookingStore
+from .matching import ExpertMatcher, Match
+from .metrics import BOOKING_STAGE_SECONDS, NULL_STOPWATCH, REGISTRY, Stopwatch, record_outcome
+from .paging import Page, paginate
+from .pricing import PricingEngine
 from .schemas import (
+    BatchBookingResult,
     BookingConfirmation,
     BookingRequest,
+    BookingUpdate,
     Concept,
     Expert,
     LearningModule,
+    QuoteItem,
+    RecurringBookingRequest,
+    SeriesConfirmation,
+    field_names,
+    to_dict,
+    trusted,
 )
+from .search import SearchHit, SearchIndex, catalog_documents
+from .shared_store import SharedBookingStore
+from .sqlite_store import SQLiteBookingRepository
 
-# In-memory booking store for prototype purposes only.
-BOOKINGS: List[Dict] = []
+_MINUTE = timedelta(minutes=1)
+
+
+def _default_booking_store() -> BookingRepository:
+    """Pick the booking store from the environment.
+
+    ``BOOKINGS_DATABASE`` names a SQLite file, ``BOOKINGS_SHARED_DIR`` a
+    directory shared by every worker process on the host and
+    ``BOOKINGS_JOURNAL`` a journal directory; without any of them, bookings
+    live only in memory.
+    """
+    path = os.environ.get("BOOKINGS_DATABASE")
+    if path:
+        return SQLiteBookingRepository(path)
+    shared = os.environ.get("BOOKINGS_SHARED_DIR")
+    if shared:
+        return SharedBookingStore(shared)
+    directory = os.environ.get("BOOKINGS_JOURNAL")
+    if directory:
+        return JournaledBookingStore(directory)
+    return BookingIndex()
+
+
+# Booking store, indexed per expert; in memory unless configured otherwise.
+BOOKINGS: BookingRepository = _default_booking_store()
+
+# Finished sessions moved out of BOOKINGS by compact_bookings(); appended to
+# the JSON lines file named by ``BOOKINGS_ARCHIVE``, in memory without it.
+BOOKINGS_ARCHIVE = BookingArchive(os.environ.get("BOOKINGS_ARCHIVE"))
+
+
+def _default_catalog() -> Tuple[CatalogSource, Optional[int]]:
+    """Pick the catalog source and LRU size from the environment.
+
+    ``CATALOG_DIR`` names a directory written by ``python -m app.catalog_store``;
+    its concepts are built lazily into an LRU of ``CATALOG_CACHE_SIZE``
+    entries. Without it the ``app.data`` fixture is built eagerly.
+    """
+    directory = os.environ.get("CATALOG_DIR")
+    if directory:
+        return JsonlCatalogSource(directory), int(os.environ.get("CATALOG_CACHE_SIZE", "4096"))
+    return FixtureCatalogSource(), None
+
+
+_CATALOG_SOURCE, _CATALOG_CACHE_SIZE = _default_catalog()
+
+# Concepts and modules are validated once and shared across requests.
+CATALOG = Catalog(_CATALOG_SOURCE, cache_size=_CATALOG_CACHE_SIZE)
+
+# Experts are validated once and indexed by focus area.
+EXPERT_DIRECTORY = ExpertDirectory(_CATALOG_SOURCE)
+
+
+# Full-text index over concepts and modules, updated in place on each reload.
+SEARCH_INDEX = SearchIndex()
+SEARCH_INDEX.update(catalog_documents(CATALOG))
+CATALOG.subscribe(lambda: SEARCH_INDEX.update(catalog_documents(CATALOG)))
+
+
+def _default_pricing() -> PricingEngine:
+    """Load pricing rules from the JSON file named by ``PRICING_RULES``, if set."""
+    path = os.environ.get("PRICING_RULES")
+    return PricingEngine.from_file(path) if path else PricingEngine()
+
+
+# Prices both quotes and bookings, so a quote is what a booking will charge.
+PRICING = _default_pricing()
+
+# Per-expert ranking features, rebuilt whenever the directory changes, with
+# prices from the same rules bookings are charged by.
+EXPERT_MATCHER = ExpertMatcher(EXPERT_DIRECTORY, PRICING)
+
+
+def use_booking_store(store: BookingRepository) -> BookingRepository:
+    """Swap the active booking store, returning the previous one."""
+    global BOOKINGS
+    previous, BOOKINGS = BOOKINGS, store
+    CALENDAR_FEEDS.bind(store)
+    return previous
+
+
+def utc_naive(value: datetime) -> datetime:
+    """Bring ``value`` to the store's convention: naive datetimes in UTC.
+
+    Clients may send offset-aware times; converting them at the service
+    boundary keeps every stored and compared datetime naive.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def compact_bookings(now: Optional[datetime] = None) -> int:
+    """Archive every booking that ended by ``now``; returns how many moved."""
+    before = utc_naive(now) if now is not None else datetime.now(timezone.utc).replace(tzinfo=None)
+    return BOOKINGS.archive_finished(before, BOOKINGS_ARCHIVE.extend)
+
+
+# Rendered iCalendar feeds per expert; each booking change invalidates only
+# its expert's feed. Feeds are re-checked after ``CALENDAR_MAX_AGE`` seconds to
+# pick up bookings made by other workers.
+CALENDAR_FEEDS = CalendarFeeds(
+    BOOKINGS,
+    EXPERT_DIRECTORY,
+    lambda concept_id: (CATALOG.record(concept_id) or {}).get("title"),
+    max_age=float(os.environ.get("CALENDAR_MAX_AGE", "60")),
+)
+CATALOG.subscribe(CALENDAR_FEEDS.reset)
+
+
+def expert_calendar(expert_id: str) -> Optional[CachedBody]:
+    """The expert's bookings and weekly availability as an iCalendar feed."""
+    return CALENDAR_FEEDS.get(expert_id)
+
+
+def _compaction_interval() -> float:
+    """Seconds between background compactions, 0 when there is nowhere to archive.
+
+    Without ``BOOKINGS_ARCHIVE`` finished bookings would only move into the
+    in-memory archive, so memory would still grow with all history.
+    """
+    if BOOKINGS_ARCHIVE.path is None:
+        return 0.0
+    return float(os.environ.get("BOOKINGS_COMPACT_INTERVAL", "300"))
+
+
+# Runs compact_bookings() every ``BOOKINGS_COMPACT_INTERVAL`` seconds while the
+# app is up; 0 disables it, as does leaving ``BOOKINGS_ARCHIVE`` unset.
+COMPACTION = CompactionTask(compact_bookings, _compaction_interval())
+
+
+def reload_catalog() -> None:
+    """Rebuild the shared catalog after its source data changes."""
+    CATALOG.reload()
+
+
+def subscribe_experts(listener: Callable[[], None]) -> None:
+    EXPERT_DIRECTORY.subscribe(listener)
+
+
+def reload_experts() -> None:
+    """Rebuild the expert directory after its source data changes."""
+    EXPERT_DIRECTORY.reload()
 
 
 def _concept_modules(concept_id: str) -> List[LearningModule]:
-    return [
-        LearningModule(**module)
-        for module in data.MODULES
-        if module["concept_id"] == concept_id
-    ]
+    return CATALOG.modules_for(concept_id)
 
 
 def list_concepts() -> List[Concept]:
     """Return each concept with its associated learning modules."""
-    return [
-        Concept(**concept_dict, modules=_concept_modules(concept_id))
-        for concept_id, concept_dict in data.CONCEPTS.items()
-    ]
+    return CATALOG.concepts()
 
 
 def get_concept(concept_id: str) -> Optional[Concept]:
-    concept_info = data.CONCEPTS.get(concept_id)
-    if not concept_info:
-        return None
-    return Concept(**concept_info, modules=_concept_modules(concept_id))
+    return CATALOG.get(concept_id)
+
+
+def search_catalog(query: str, limit: int = 10, prefix: bool = False) -> List[SearchHit]:
+    return SEARCH_INDEX.search(query, limit, prefix)
 
 
 def list_experts(concept_id: Optional[str] = None) -> List[Expert]:
-    experts: Iterable[Dict] = data.EXPERTS.values()
     if concept_id:
-        concept_id = concept_id.strip().lower()
-        experts = [
-            expert
-            for expert in experts
-            if concept_id in {area.lower() for area in expert["focus_areas"]}
-        ]
-    return [Expert(**expert_dict) for expert_dict in experts]
+        return EXPERT_DIRECTORY.for_concept(concept_id)
+    return EXPERT_DIRECTORY.experts()
+
+
+def match_experts(
+    concept_ids: List[str],
+    start: datetime,
+    end: datetime,
+    group_size: int = 1,
+    duration_minutes: int = 60,
+    k: int = 10,
+) -> List[Match]:
+    """Return the ``k`` experts best suited to the request, best first; see :class:`ExpertMatcher`."""
+    return EXPERT_MATCHER.match(
+        concept_ids, utc_naive(start), utc_naive(end), BOOKINGS.overlapping, group_size or 1, duration_minutes, k
+    )
 
 
-def _slot_overlaps(existing_start: datetime, existing_end: datetime, start: datetime, end: datetime) -> bool:
-    return existing_start < end and start < existing_end
+# Fields accepted by the ``fields=`` projection on list endpoints.
+CONCEPT_FIELDS = field_names(Concept)
+EXPERT_FIELDS = field_names(Expert)
 
 
-def _is_within_availability(expert: Expert, start: datetime, end: datetime) -> bool:
-    weekday_name = start.strftime("%A").lower()
-    for window in expert.availability:
-        window_weekday = getattr(window, "weekday", None)
-        if window_weekday is None and isinstance(window, dict):
-            window_weekday = str(window.get("weekday", "")).strip().lower()
-        elif window_weekday is not None:
-            window_weekday = str(window_weekday).strip().lower()
-
-        window_start = getattr(window, "start", None)
-        if window_start is None and isinstance(window, dict):
-            window_start = window.get("start")
-
-        window_end = getattr(window, "end", None)
-        if window_end is None and isinstance(window, dict):
-            window_end = window.get("end")
-
-        if window_weekday != weekday_name:
-            continue
-        if window_start is None or window_end is None:
-            continue
-        if window_start <= start.time() and end.time() <= window_end:
-            return True
-    return False
+def _project_concept(concept_id: str, fields: Tuple[str, ...]) -> Optional[Dict]:
+    if "modules" not in fields:
+        # Scalar fields come straight from the source record, so neither the
+        # concept nor its modules are ever materialized as models.
+        record = CATALOG.record(concept_id)
+        return {name: record[name] for name in fields} if record is not None else None
+    concept = CATALOG.get(concept_id)
+    if concept is None:
+        return None
+    row = {name: getattr(concept, name) for name in fields if name != "modules"}
+    row["modules"] = [to_dict(module) for module in concept.modules]
+    return row
+
+
+def _project_expert(expert: Expert, fields: Tuple[str, ...]) -> Dict:
+    row = {name: getattr(expert, name) for name in fields if name != "availability"}
+    if "availability" in fields:
+        row["availability"] = [to_dict(window) for window in expert.availability]
+    return row
+
+
+def concepts_page(
+    cursor: Optional[str] = None, limit: Optional[int] = None, fields: Optional[Tuple[str, ...]] = None
+) -> Page:
+    """Return the concepts after ``cursor``, at most ``limit`` of them.
+
+    Without ``fields`` the page holds :class:`Concept` models; with it, plain
+    dicts carrying only those fields.
+    """
+    page = paginate(CATALOG.concept_ids(), str, cursor, limit)
+    if fields is None:
+        items = [CATALOG.get(concept_id) for concept_id in page.items]
+    else:
+        items = [_project_concept(concept_id, fields) for concept_id in page.items]
+    return Page([item for item in items if item is not None], page.next_cursor)
+
+
+def experts_page(
+    concept_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Page:
+    """Like :func:`concepts_page` for experts, optionally filtered by concept."""
+    page = paginate(list_experts(concept_id), lambda expert: expert.id, cursor, limit)
+    if fields is None:
+        return page
+    return Page([_project_expert(expert, fields) for expert in page.items], page.next_cursor)
 
 
-def _has_conflict(expert_id: str, start: datetime, end: datetime) -> bool:
-    for booking in BOOKINGS:
-        if booking["expert_id"] != expert_id:
-            continue
-        if _slot_overlaps(booking["start"], booking["end"], start, end):
-            return True
-    return False
+def _slot_overlaps(existing_start: datetime, existing_end: datetime, start: datetime, end: datetime) -> bool:
+    return existing_start < end and start < existing_end
 
 
-def _calculate_price(expert: Expert, duration_minutes: int, group_size: int) -> float:
-    hours = duration_minutes / 60
-    base = expert.rate_per_hour * hours
-    if group_size > 1:
-        return round(base * expert.group_discount, 2)
-    return round(base, 2)
+def _availability_for(expert: Expert) -> WeeklyAvailability:
+    availability = None
+    if EXPERT_DIRECTORY.get(expert.id) is expert:
+        availability = EXPERT_DIRECTORY.availability(expert.id)
+    if availability is None:
+        availability = WeeklyAvailability.compile(expert.availability)
+    return availability
 
 
-def create_booking(request: BookingRequest) -> Optional[BookingConfirmation]:
-    concept = get_concept(request.concept_id)
-    if not concept:
-        return None
+def _is_within_availability(expert: Expert, start: datetime, end: datetime) -> bool:
+    return _availability_for(expert).covers(start, end)
 
-    expert_dict = data.EXPERTS.get(request.expert_id)
-    if not expert_dict:
-        return None
-    expert = Expert(**expert_dict)
 
+def _has_conflict(expert_id: str, start: datetime, end: datetime) -> bool:
+    return BOOKINGS.has_conflict(expert_id, start, end)
+
+
+def _calculate_price(
+    expert: Expert, duration_minutes: int, group_size: int, start: Optional[datetime] = None
+) -> float:
+    return PRICING.quote(expert, duration_minutes, group_size, start)
+
+
+class _MinuteClock(Dict[int, datetime]):
+    """Memoized ``origin + minutes`` conversions."""
+
+    def __init__(self, origin: datetime) -> None:
+        super().__init__()
+        self.origin = origin
+
+    def __missing__(self, minute: int) -> datetime:
+        moment = self[minute] = self.origin + minute * _MINUTE
+        return moment
+
+
+class _MinuteOffsets(Dict[datetime, int]):
+    """Memoized whole minutes since ``origin``, rounded down or up."""
+
+    def __init__(self, origin: datetime, round_up: bool) -> None:
+        super().__init__()
+        self.origin = origin
+        self.round_up = round_up
+
+    def __missing__(self, moment: datetime) -> int:
+        if self.round_up:
+            minute = self[moment] = -((self.origin - moment) // _MINUTE)
+        else:
+            minute = self[moment] = (moment - self.origin) // _MINUTE
+        return minute
+
+
+def find_open_slots(
+    concept_id: str, start: datetime, end: datetime, duration_minutes: int
+) -> List[Tuple[Expert, List[Tuple[datetime, datetime]]]]:
+    """Return, per expert covering ``concept_id``, the free windows in ``[start, end)``.
+
+    Each window is at least ``duration_minutes`` long, so a session can start
+    anywhere from its start up to ``duration_minutes`` before its end. Weekly
+    availability is tiled over the range and booked intervals are subtracted
+    in one merge pass per expert, working in whole minutes since the Monday
+    before ``start``.
+    """
+    start, end = utc_naive(start), utc_naive(end)
+    week_start = datetime.combine(start.date() - timedelta(days=start.weekday()), time(0))
+
+    # Many experts share weekly schedules, slot boundaries and booking
+    # times, so tiling and conversions in both directions are memoized per call.
+    floors, ceilings = _MinuteOffsets(week_start, round_up=False), _MinuteOffsets(week_start, round_up=True)
+    first, last = ceilings[start], floors[end]
+    tiles: Dict[Tuple[bytes, bytes], List[Tuple[int, int]]] = {}
+    moments = _MinuteClock(week_start)
+
+    results: List[Tuple[Expert, List[Tuple[datetime, datetime]]]] = []
+    for expert in list_experts(concept_id):
+        availability = _availability_for(expert)
+        tiled = tiles.get(availability.key)
+        if tiled is None:
+            tiled = tiles[availability.key] = availability.tile(first, last)
+        bookings = BOOKINGS.overlapping(expert.id, start, end)
+        if bookings:
+            busy = [(floors[booking["start"]], ceilings[booking["end"]]) for booking in bookings]
+            free = subtract_intervals(tiled, busy, duration_minutes)
+        else:
+            free = tiled
+        # Short windows are dropped in the same pass that converts the rest.
+        results.append(
+            (
+                expert,
+                [
+                    (moments[slot_start], moments[slot_end])
+                    for slot_start, slot_end in free
+                    if slot_end - slot_start >= duration_minutes
+                ],
+            )
+        )
+    return results
+
+
+# Reasons a booking request is rejected, reported per item by batch booking.
+REJECT_UNKNOWN_CONCEPT = "unknown_concept"
+REJECT_UNKNOWN_EXPERT = "unknown_expert"
+REJECT_CONCEPT_MISMATCH = "concept_mismatch"
+REJECT_OUTSIDE_AVAILABILITY = "outside_availability"
+REJECT_CONFLICT = "conflict"
+REJECT_BATCH_ABORTED = "batch_aborted"
+REJECT_INVALID_SESSION = "invalid_session"
+REJECT_NOT_FOUND = "not_found"
+REJECT_SERIES = "recurring_series"
+BOOKED = "booked"
+
+
+def _plan_booking(
+    request: BookingRequest,
+    concept: Optional[Concept],
+    expert: Optional[Expert],
+    watch: Stopwatch = NULL_STOPWATCH,
+) -> Tuple[Optional[Dict], Optional[str]]:
+    """Validate ``request`` and build its booking record, short of reserving it."""
+    if not concept:
+        return None, REJECT_UNKNOWN_CONCEPT
+    if not expert:
+        return None, REJECT_UNKNOWN_EXPERT
     if request.concept_id not in expert.focus_areas:
-        return None
+        return None, REJECT_CONCEPT_MISMATCH
 
-    start_time = request.start_time
+    start_time = utc_naive(request.start_time)
     end_time = start_time + timedelta(minutes=request.duration_minutes)
+    watch.lap("validation")
 
-    if not _is_within_availability(expert, start_time, end_time):
-        return None
-
-    if _has_conflict(expert.id, start_time, end_time):
-        return None
+    within = _is_within_availability(expert, start_time, end_time)
+    watch.lap("availability")
+    if not within:
+        return None, REJECT_OUTSIDE_AVAILABILITY
 
-    booking_id = str(uuid4())
     group_size = request.group_size or 1
-    price = _calculate_price(expert, request.duration_minutes, group_size)
-
-    BOOKINGS.append(
-        {
-            "booking_id": booking_id,
-            "expert_id": expert.id,
-            "concept_id": concept.id,
-            "start": start_time,
-            "end": end_time,
-            "group_size": group_size,
-            "price": price,
-        }
+    record = {
+        "booking_id": str(uuid4()),
+        "expert_id": expert.id,
+        "concept_id": concept.id,
+        "start": start_time,
+        "end": end_time,
+        "group_size": group_size,
+        "price": _calculate_price(expert, request.duration_minutes, group_size, start_time),
+    }
+    watch.lap("pricing")
+    return record, None
+
+
+def _confirmation(record: Dict, expert: Expert, concept: Concept) -> BookingConfirmation:
+    # Every value here was validated on the way in; skip re-validating (and
+    # copying) the shared expert and concept models.
+    return trusted(
+        BookingConfirmation,
+        booking_id=record["booking_id"],
+        expert=expert,
+        concept=concept,
+        start_time=record["start"],
+        end_time=record["end"],
+        group_size=record["group_size"],
+        price=record["price"],
     )
 
-    return BookingConfirmation(
-        booking_id=booking_id,
+
+def _rejected(watch: Stopwatch, reason: str) -> None:
+    watch.finish()
+    record_outcome(reason)
+
+
+def create_booking(request: BookingRequest) -> Optional[BookingConfirmation]:
+    # Each stage is timed into booking_stage_seconds and every exit counted
+    # in booking_outcomes_total, so slow or refused bookings can be traced.
+    watch = REGISTRY.stopwatch(BOOKING_STAGE_SECONDS)
+    concept = get_concept(request.concept_id)
+    watch.lap("concept_lookup")
+    expert = EXPERT_DIRECTORY.get(request.expert_id)
+    watch.lap("expert_lookup")
+    record, reason = _plan_booking(request, concept, expert, watch)
+    if record is None:
+        return _rejected(watch, reason)
+
+    # The conflict check and insert happen atomically under the expert's lock.
+    reserved = BOOKINGS.reserve(record)
+    watch.lap("conflict_check")
+    if not reserved:
+        return _rejected(watch, REJECT_CONFLICT)
+
+    confirmation = _confirmation(record, expert, concept)
+    watch.lap("confirmation")
+    watch.finish()
+    record_outcome(BOOKED)
+    return confirmation
+
+
+def create_bookings(requests: List[BookingRequest], atomic: bool = False) -> List[BatchBookingResult]:
+    """Book many sessions at once, returning one result per request.
+
+    Concepts and experts are resolved once per distinct id. Every request is
+    checked against existing bookings and against earlier requests in the same
+    batch. With ``atomic`` set, nothing is booked unless every request can be.
+    """
+    concepts = {concept_id: get_concept(concept_id) for concept_id in {r.concept_id for r in requests}}
+    experts = {expert_id: EXPERT_DIRECTORY.get(expert_id) for expert_id in {r.expert_id for r in requests}}
+
+    plans = [
+        _plan_booking(request, concepts[request.concept_id], experts[request.expert_id])
+        for request in requests
+    ]
+    records = [record for record, _ in plans if record is not None]
+    if atomic and len(records) < len(plans):
+        # Something already failed validation; skip the reservation attempt.
+        available, committed = [True] * len(records), False
+    else:
+        available = BOOKINGS.reserve_many(records, atomic=atomic)
+        committed = not atomic or all(available)
+
+    results: List[BatchBookingResult] = []
+    flags = iter(available)
+    for position, (request, (record, reason)) in enumerate(zip(requests, plans)):
+        if record is None:
+            results.append(trusted(BatchBookingResult, index=position, error=reason))
+        elif not next(flags):
+            results.append(trusted(BatchBookingResult, index=position, error=REJECT_CONFLICT))
+        elif not committed:
+            results.append(trusted(BatchBookingResult, index=position, error=REJECT_BATCH_ABORTED))
+        else:
+            confirmation = _confirmation(
+                record, experts[request.expert_id], concepts[request.concept_id]
+            )
+            results.append(trusted(BatchBookingResult, index=position, confirmation=confirmation))
+        record_outcome(results[-1].error or BOOKED)
+    return results
+
+
+def create_series(
+    request: RecurringBookingRequest,
+) -> Tuple[Optional[SeriesConfirmation], Optional[str], List[int]]:
+    """Book the same weekly slot for ``request.weeks`` weeks as one booking.
+
+    Returns the confirmation, or the rejection reason and any conflicting
+    weeks. Concept, expert, availability and price are resolved once: weekly
+    availability and pricing repeat every week, so the first session stands
+    for all of them. The store then checks every session against existing
+    bookings in one pass and keeps the series as a rule plus skipped weeks.
+    """
+    concept = get_concept(request.concept_id)
+    expert = EXPERT_DIRECTORY.get(request.expert_id)
+    if request.duration_minutes <= 0 or request.duration_minutes >= WEEK // _MINUTE:
+        record, reason = None, REJECT_INVALID_SESSION
+    else:
+        record, reason = _plan_booking(request, concept, expert)  # type: ignore[arg-type]
+    if record is None:
+        record_outcome(reason)
+        return None, reason, []
+
+    skipped = sorted({week for week in request.skip_weeks if 0 <= week < request.weeks})
+    if len(skipped) == request.weeks:
+        record_outcome(REJECT_INVALID_SESSION)
+        return None, REJECT_INVALID_SESSION, []
+    record["occurrences"] = request.weeks
+    record["skipped"] = skipped
+
+    stored, conflicts = BOOKINGS.reserve_series(record, skip_conflicts=request.skip_conflicts)
+    if not stored:
+        record_outcome(REJECT_CONFLICT)
+        return None, REJECT_CONFLICT, conflicts
+    record_outcome(BOOKED)
+
+    sessions = request.weeks - len(record["skipped"])
+    confirmation = trusted(
+        SeriesConfirmation,
+        booking_id=record["booking_id"],
         expert=expert,
         concept=concept,
-        start_time=start_time,
-        end_time=end_time,
-        group_size=group_size,
-        price=price,
+        start_time=record["start"],
+        end_time=record["end"],
+        weeks=request.weeks,
+        skipped_weeks=record["skipped"],
+        sessions=sessions,
+        group_size=record["group_size"],
+        price_per_session=record["price"],
+        total_price=round(record["price"] * sessions, 2),
+    )
+    return confirmation, None, conflicts
+
+
+def cancel_booking(booking_id: str) -> bool:
+    return BOOKINGS.remove(booking_id) is not None
+
+
+def reschedule_booking(
+    booking_id: str, update: BookingUpdate
+) -> Tuple[Optional[BookingConfirmation], Optional[str]]:
+    """Move a booking to ``update.start_time``, returning its new confirmation or a rejection.
+
+    The session keeps its expert, concept and group, is re-checked against
+    availability and repriced for the new time. The expert's other bookings
+    must not overlap the new slot; the booking's own old slot may.
+    """
+    current = BOOKINGS.get(booking_id)
+    if current is None:
+        return None, REJECT_NOT_FOUND
+    if is_series(current):
+        return None, REJECT_SERIES
+    concept = get_concept(current["concept_id"])
+    if not concept:
+        return None, REJECT_UNKNOWN_CONCEPT
+    expert = EXPERT_DIRECTORY.get(current["expert_id"])
+    if not expert:
+        return None, REJECT_UNKNOWN_EXPERT
+
+    duration_minutes = update.duration_minutes
+    if duration_minutes is None:
+        duration_minutes = (current["end"] - current["start"]) // _MINUTE
+    if duration_minutes <= 0:
+        return None, REJECT_INVALID_SESSION
+    start_time = utc_naive(update.start_time)
+    end_time = start_time + timedelta(minutes=duration_minutes)
+    if not _is_within_availability(expert, start_time, end_time):
+        return None, REJECT_OUTSIDE_AVAILABILITY
+
+    group_size = current["group_size"] or 1
+    record = {
+        **current,
+        "start": start_time,
+        "end": end_time,
+        "price": _calculate_price(expert, duration_minutes, group_size, start_time),
+    }
+    try:
+        moved = BOOKINGS.replace(record)
+    except KeyError:  # cancelled meanwhile
+        return None, REJECT_NOT_FOUND
+    if not moved:
+        return None, REJECT_CONFLICT
+    return _confirmation(record, expert, concept), None
+
+
+# Columns of a bookings export, in order; ``week`` is only set for sessions of a series.
+EXPORT_FIELDS = ("booking_id", "expert_id", "concept_id", "start", "end", "group_size", "price", "week")
+
+
+def export_bookings(
+    expert_id: Optional[str] = None,
+    concept_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    archived: bool = False,
+) -> Iterator[Tuple]:
+    """Yield one :data:`EXPORT_FIELDS` row per booked session matching the filters.
+
+    Live bookings come from the store expert by expert; with ``archived``,
+    sessions already moved to the archive by compaction are yielded first.
+    The bounds are normalized before the first row is requested, so callers
+    streaming the rows see bad input here rather than mid-response.
+    """
+    start = utc_naive(start) if start is not None else None
+    end = utc_naive(end) if end is not None else None
+    return _export_rows(expert_id, concept_id, start, end, archived)
+
+
+def _export_rows(
+    expert_id: Optional[str], concept_id: Optional[str], start: Optional[datetime], end: Optional[datetime], archived: bool
+) -> Iterator[Tuple]:
+    if archived:
+        for record in BOOKINGS_ARCHIVE:
+            if (expert_id is None or record["expert_id"] == expert_id) and (
+                concept_id is None or record.get("concept_id") == concept_id
+            ):
+                for session in expand_sessions(record, start, end):
+                    yield tuple(session.get(field) for field in EXPORT_FIELDS)
+    for session in BOOKINGS.export(expert_id, concept_id, start, end):
+        yield tuple(session.get(field) for field in EXPORT_FIELDS)
+
+
+def quote_sessions(items: List[QuoteItem]) -> List[Tuple[Optional[float], Optional[str]]]:
+    """Price each item without booking it, returning ``(price, rejection)`` pairs.
+
+    Valid items are priced together by :meth:`PricingEngine.quote_many`.
+    """
+    results: List[Tuple[Optional[float], Optional[str]]] = []
+    positions: List[int] = []
+    experts: List[Expert] = []
+    for item in items:
+        expert = EXPERT_DIRECTORY.get(item.expert_id)
+        if expert is None:
+            results.append((None, REJECT_UNKNOWN_EXPERT))
+        elif item.duration_minutes <= 0 or (item.group_size or 1) < 1:
+            results.append((None, REJECT_INVALID_SESSION))
+        else:
+            results.append((None, None))
+            positions.append(len(results) - 1)
+            experts.append(expert)
+
+    valid = [items[position] for position in positions]
+    prices = PRICING.quote_many(
+        experts,
+        [item.duration_minutes for item in valid],
+        [item.group_size or 1 for item in valid],
+        [utc_naive(item.start_time) if item.start_time is not None else None for item in valid],
     )
+    for position, price in zip(positions, prices):
+        results[position] = (price, None)
+    return results
@@ -0,0 +1,275 @@
+"""Booking store shared by every worker process on a host.
+
+Each expert has an append-only file of journal-format lines in a shared
+directory. A writer takes the thread stripe for the expert and then an
+exclusive ``flock`` on the expert's file. It replays whatever other processes
+appended since it last looked, checks for conflicts in its in-memory
+schedule, and appends. Because check and append happen under the file lock, no
+two processes can sell the same slot, yet workers booking different experts
+never wait on each other.
+
+A separate append-only index maps booking ids to experts, so looking a
+booking up by id touches that expert's file alone.
+"""
+from __future__ import annotations
+
+import base64
+import fcntl
+import json
+import os
+import threading
+import struct
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .bookings import BookingIndex
+from .journal import decode_entry, encode_entry
+
+# Magic plus a generation counter that :meth:`SharedBookingStore.clear` bumps
+# so other processes know to drop what they have cached for the file.
+_HEADER = struct.Struct("<4sQ")
+_MAGIC = b"BKG1"
+_SUFFIX = ".log"
+# ``[booking_id, expert_id]`` JSON lines, appended whenever a booking is added.
+# Entries are never removed; one for a cancelled booking just finds nothing.
+_ID_INDEX = "booking-ids.idx"
+
+
+def _file_name(expert_id: str) -> str:
+    return base64.urlsafe_b64encode(expert_id.encode()).decode().rstrip("=") + _SUFFIX
+
+
+def _expert_id(file_name: str) -> str:
+    encoded = file_name[: -len(_SUFFIX)]
+    return base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+
+
+class SharedBookingStore(BookingIndex):
+    """:class:`BookingIndex` kept consistent across processes through per-expert files.
+
+    The in-memory schedules are a cache of the files, refreshed incrementally
+    under the file lock before every read or write. Files are opened only
+    while locked, so open descriptors track in-flight operations rather than
+    every expert ever touched, and reads never create files: an expert without
+    one simply has no bookings. ``durable`` adds an ``fsync`` per write;
+    without it bookings still survive a worker crash but not a power loss.
+    """
+
+    def __init__(self, directory: str, durable: bool = False, stripes: int = 64) -> None:
+        super().__init__(stripes)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.durable = durable
+        # expert_id -> descriptor, only while the expert's file is locked
+        self._descriptors: Dict[str, int] = {}
+        # expert_id -> (generation, byte offset) of the file contents replayed so far
+        self._seen: Dict[str, Tuple[int, int]] = {}
+        # booking_id -> expert_id, read from the id index up to _index_offset
+        self._index: Dict[str, str] = {}
+        self._index_offset = 0
+        self._index_lock = threading.Lock()
+        path = self.directory / _ID_INDEX
+        try:
+            self._index_descriptor = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            self._index_descriptor = os.open(path, os.O_RDWR | os.O_APPEND)
+        else:
+            self._build_index()
+
+    def close(self) -> None:
+        with super()._locked():
+            for descriptor in self._descriptors.values():
+                os.close(descriptor)
+            self._descriptors.clear()
+        os.close(self._index_descriptor)
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._all_experts())
+
+    def __iter__(self) -> Iterator[Dict]:
+        for records in self._all_experts():
+            yield from records
+
+    def append(self, record: Dict) -> None:
+        with self._locked([record["expert_id"]]):
+            self._log("add", record)
+            self._insert(record)
+
+    def reserve(self, record: Dict) -> bool:
+        return self.reserve_many([record])[0]
+
+    def get(self, booking_id: str) -> Optional[Dict]:
+        record = self._by_id.get(booking_id)
+        if record is not None:
+            with self._locked([record["expert_id"]], exclusive=False):
+                return self._by_id.get(booking_id)
+        # Made by another process, or for an expert this one never loaded:
+        # the id index names the one file to catch up on.
+        expert_id = self._indexed_expert(booking_id)
+        if expert_id is None:
+            return None
+        with self._locked([expert_id], exclusive=False):
+            return self._by_id.get(booking_id)
+
+    def clear(self) -> None:
+        # Expert by expert, so clearing never holds every file open at once.
+        for expert_id in self._expert_ids():
+            with self._locked([expert_id]):
+                self._reset(expert_id)
+                self._forget(expert_id)
+        with self._index_lock:
+            fcntl.flock(self._index_descriptor, fcntl.LOCK_EX)
+            try:
+                os.ftruncate(self._index_descriptor, 0)
+            finally:
+                fcntl.flock(self._index_descriptor, fcntl.LOCK_UN)
+            self._index.clear()
+            self._index_offset = 0
+        self._notify(None)
+
+    def for_expert(self, expert_id: str) -> List[Dict]:
+        with self._locked([expert_id], exclusive=False):
+            schedule = self._schedules.get(expert_id)
+            return list(schedule) if schedule is not None else []
+
+    def overlapping(self, expert_id: str, start: datetime, end: datetime) -> List[Dict]:
+        with self._locked([expert_id], exclusive=False):
+            schedule = self._schedules.get(expert_id)
+            return schedule.overlapping(start, end) if schedule is not None else []
+
+    def has_conflict(self, expert_id: str, start: datetime, end: datetime) -> bool:
+        with self._locked([expert_id], exclusive=False):
+            schedule = self._schedules.get(expert_id)
+            return schedule is not None and schedule.overlaps(start, end)
+
+    def _all_experts(self) -> Iterator[List[Dict]]:
+        for expert_id in self._expert_ids():
+            yield self.for_expert(expert_id)
+
+    def _expert_ids(self) -> List[str]:
+        return sorted(_expert_id(name) for name in os.listdir(self.directory) if name.endswith(_SUFFIX))
+
+    @contextmanager
+    def _locked(self, expert_ids: Optional[Iterable[str]] = None, exclusive: bool = True) -> Iterator[None]:
+        """Hold the thread stripes and file locks of ``expert_ids`` (all experts when omitted).
+
+        File locks are taken in expert id order, the same order in every
+        process, so batches spanning several experts cannot deadlock.
+        """
+        targets = sorted(set(self._expert_ids() if expert_ids is None else expert_ids))
+        with super()._locked(None if expert_ids is None else targets), ExitStack() as stack:
+            for expert_id in targets:
+                # Only writers create files; a reader finding none has nothing to load.
+                descriptor = self._open(expert_id, create=exclusive)
+                if descriptor is None:
+                    continue
+                stack.callback(self._close, expert_id)
+                fcntl.flock(descriptor, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                stack.callback(fcntl.flock, descriptor, fcntl.LOCK_UN)
+                self._catch_up(expert_id, descriptor, exclusive)
+            yield
+
+    def _log(self, operation: str, record: Optional[Dict]) -> int:
+        expert_id = record["expert_id"]
+        descriptor = self._descriptors[expert_id]
+        generation, offset = self._seen[expert_id]
+        line = encode_entry(0, operation, record)
+        os.pwrite(descriptor, line, offset)
+        if self.durable:
+            os.fsync(descriptor)
+        self._seen[expert_id] = (generation, offset + len(line))
+        if operation == "add" and record.get("booking_id") is not None:
+            self._index_booking(record)
+        return 0
+
+    def _index_booking(self, record: Dict) -> None:
+        # O_APPEND keeps concurrent single-line writes from interleaving.
+        os.write(self._index_descriptor, (json.dumps([record["booking_id"], record["expert_id"]]) + "\n").encode())
+        if self.durable:
+            os.fsync(self._index_descriptor)
+
+    def _build_index(self) -> None:
+        """Index the bookings of a directory written before the id index existed."""
+        fcntl.flock(self._index_descriptor, fcntl.LOCK_EX)
+        try:
+            for expert_id in self._expert_ids():
+                for record in self.for_expert(expert_id):
+                    if record.get("booking_id") is not None:
+                        self._index_booking(record)
+        finally:
+            fcntl.flock(self._index_descriptor, fcntl.LOCK_UN)
+
+    def _indexed_expert(self, booking_id: str) -> Optional[str]:
+        with self._index_lock:
+            expert_id = self._index.get(booking_id)
+            if expert_id is not None:
+                return expert_id
+            fcntl.flock(self._index_descriptor, fcntl.LOCK_SH)
+            try:
+                size = os.fstat(self._index_descriptor).st_size
+                if size < self._index_offset:  # cleared by another process
+                    self._index.clear()
+                    self._index_offset = 0
+                chunk = os.pread(self._index_descriptor, size - self._index_offset, self._index_offset)
+            finally:
+                fcntl.flock(self._index_descriptor, fcntl.LOCK_UN)
+            complete = chunk.rfind(b"\n") + 1
+            for line in chunk[:complete].splitlines():
+                indexed_id, indexed_expert = json.loads(line)
+                self._index[indexed_id] = indexed_expert
+            self._index_offset += complete
+            return self._index.get(booking_id)
+
+    def _open(self, expert_id: str, create: bool) -> Optional[int]:
+        # Called under the expert's stripe, so no other thread holds its file.
+        flags = os.O_RDWR | (os.O_CREAT if create else 0)
+        try:
+            descriptor = os.open(self.directory / _file_name(expert_id), flags, 0o644)
+        except FileNotFoundError:
+            return None
+        self._descriptors[expert_id] = descriptor
+        return descriptor
+
+    def _close(self, expert_id: str) -> None:
+        os.close(self._descriptors.pop(expert_id))
+
+    def _catch_up(self, expert_id: str, descriptor: int, exclusive: bool) -> None:
+        """Replay lines other processes appended since this process last read the file."""
+        header = os.pread(descriptor, _HEADER.size, 0)
+        if len(header) < _HEADER.size:
+            if not exclusive:
+                self._seen[expert_id] = (0, _HEADER.size)
+                return
+            os.pwrite(descriptor, _HEADER.pack(_MAGIC, 0), 0)
+            header = os.pread(descriptor, _HEADER.size, 0)
+        _, generation = _HEADER.unpack(header)
+
+        seen_generation, offset = self._seen.get(expert_id, (generation, _HEADER.size))
+        if seen_generation != generation:
+            self._forget(expert_id)
+            offset = _HEADER.size
+
+        size = os.fstat(descriptor).st_size
+        if size > offset:
+            chunk = os.pread(descriptor, size - offset, offset)
+            complete = chunk.rfind(b"\n") + 1
+            for line in chunk[:complete].splitlines(keepends=True):
+                entry = decode_entry(line)
+                if entry is not None:
+                    self._replay(entry["op"], entry.get("record"))
+            offset += complete
+            if exclusive and complete < len(chunk):
+                # A writer died mid-line; drop the fragment before appending.
+                os.ftruncate(descriptor, offset)
+        self._seen[expert_id] = (generation, offset)
+
+    def _reset(self, expert_id: str) -> None:
+        descriptor = self._descriptors[expert_id]
+        generation = self._seen.get(expert_id, (0, 0))[0] + 1
+        os.ftruncate(descriptor, 0)
+        os.pwrite(descriptor, _HEADER.pack(_MAGIC, generation), 0)
+        if self.durable:
+            os.fsync(descriptor)
+        self._seen[expert_id] = (generation, _HEADER.size)
@@ -0,0 +1,430 @@
+"""SQLite-backed booking repository for restart-safe bookings."""
+from __future__ import annotations
+
+import heapq
+import json
+import queue
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .bookings import (
+    EXPORT_PAGE,
+    BookingRepository,
+    BookingStoreUnavailable,
+    ExpertSchedule,
+    WeeklySeries,
+    _keep_series,
+    expand_sessions,
+)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS bookings (
+        id INTEGER PRIMARY KEY,
+        booking_id TEXT UNIQUE,
+        expert_id TEXT NOT NULL,
+        concept_id TEXT,
+        start_at TEXT NOT NULL,
+        end_at TEXT NOT NULL,
+        group_size INTEGER,
+        price REAL,
+        occurrences INTEGER,
+        skipped TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS bookings_expert_range ON bookings (expert_id, start_at, end_at)",
+    "CREATE INDEX IF NOT EXISTS bookings_end ON bookings (end_at)",
+    """
+    CREATE TABLE IF NOT EXISTS booking_meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """,
+)
+# Columns added after the first release, created on databases that predate them.
+_LATER_COLUMNS = (("occurrences", "INTEGER"), ("skipped", "TEXT"))
+# Weekly series are rows with ``occurrences`` set; their start_at/end_at are
+# the first session only, so range queries skip them and conflict checks
+# evaluate the few series of an expert through this partial index.
+_SERIES_INDEX = "CREATE INDEX IF NOT EXISTS bookings_series ON bookings (expert_id) WHERE occurrences IS NOT NULL"
+
+_COLUMNS = "booking_id, expert_id, concept_id, start_at, end_at, group_size, price, occurrences, skipped"
+
+# Statements are module constants so each pooled connection compiles them
+# once and reuses the prepared form from its statement cache.
+_INSERT = f"INSERT INTO bookings ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_MAX_SPAN = "SELECT value FROM booking_meta WHERE key = 'max_span_seconds'"
+_WIDEN_SPAN = (
+    "INSERT INTO booking_meta (key, value) VALUES ('max_span_seconds', ?) "
+    "ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)"
+)
+_CONFLICT = (
+    "SELECT 1 FROM bookings WHERE expert_id = ? AND start_at >= ? AND start_at < ? AND end_at > ? "
+    "AND occurrences IS NULL LIMIT 1"
+)
+_OVERLAPPING = (
+    f"SELECT {_COLUMNS} FROM bookings "
+    "WHERE expert_id = ? AND start_at >= ? AND start_at < ? AND end_at > ? AND occurrences IS NULL "
+    "ORDER BY start_at, id"
+)
+_SERIES_FOR_EXPERT = f"SELECT {_COLUMNS} FROM bookings WHERE expert_id = ? AND occurrences IS NOT NULL"
+_ALL_SERIES = f"SELECT {_COLUMNS} FROM bookings WHERE occurrences IS NOT NULL"
+_FOR_EXPERT = f"SELECT {_COLUMNS} FROM bookings WHERE expert_id = ? ORDER BY start_at, id"
+_CONFLICT_EXCEPT = (
+    "SELECT 1 FROM bookings WHERE expert_id = ? AND start_at >= ? AND start_at < ? AND end_at > ? "
+    "AND occurrences IS NULL AND booking_id != ? LIMIT 1"
+)
+_BY_ID = f"SELECT {_COLUMNS} FROM bookings WHERE booking_id = ?"
+_DELETE = "DELETE FROM bookings WHERE booking_id = ?"
+_UPDATE = (
+    "UPDATE bookings SET concept_id = ?, start_at = ?, end_at = ?, group_size = ?, price = ? "
+    "WHERE booking_id = ?"
+)
+_FINISHED = (
+    f"SELECT {_COLUMNS} FROM bookings "
+    "WHERE end_at <= ? AND occurrences IS NULL ORDER BY expert_id, start_at, id"
+)
+_DELETE_FINISHED = "DELETE FROM bookings WHERE end_at <= ? AND occurrences IS NULL"
+# Archiving may remove the longest booking; shrink the conflict-scan bound to
+# what remains, rounded up a second against floating point truncation.
+_RESET_SPAN = (
+    "INSERT INTO booking_meta (key, value) "
+    "SELECT 'max_span_seconds', COALESCE(CAST(MAX(julianday(end_at) - julianday(start_at)) * 86400 AS INTEGER) + 1, 0) "
+    "FROM bookings WHERE occurrences IS NULL "
+    "ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+)
+_ALL = f"SELECT {_COLUMNS} FROM bookings ORDER BY expert_id, start_at, id"
+
+
+def _encode(value: datetime) -> str:
+    # A fixed width keeps lexicographic order equal to chronological order.
+    return value.isoformat(timespec="microseconds")
+
+
+def _decode(row: Tuple) -> Dict:
+    booking_id, expert_id, concept_id, start_at, end_at, group_size, price, occurrences, skipped = row
+    record = {
+        "booking_id": booking_id,
+        "expert_id": expert_id,
+        "concept_id": concept_id,
+        "start": datetime.fromisoformat(start_at),
+        "end": datetime.fromisoformat(end_at),
+        "group_size": group_size,
+        "price": price,
+    }
+    if occurrences is not None:
+        record["occurrences"] = occurrences
+        record["skipped"] = json.loads(skipped) if skipped else []
+    return record
+
+
+class SQLiteBookingRepository(BookingRepository):
+    """Bookings persisted in a SQLite database running in WAL mode.
+
+    Conflict checks are range queries on the ``(expert_id, start_at, end_at)``
+    index, bounded below by the longest span ever booked, so they touch only
+    the rows that could overlap. Writes run in ``BEGIN IMMEDIATE``
+    transactions, which makes :meth:`reserve` atomic across threads and
+    processes sharing the database file. Connections come from a fixed pool.
+    A weekly series is one row holding its rule and skipped weeks.
+    """
+
+    def __init__(self, path: str, pool_size: int = 8, timeout: float = 5.0) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._listeners: List[Callable[[Optional[str]], None]] = []
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect(timeout))
+        with self._connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            existing = {row[1] for row in connection.execute("PRAGMA table_info(bookings)")}
+            for name, kind in _LATER_COLUMNS:
+                if name not in existing:
+                    connection.execute(f"ALTER TABLE bookings ADD COLUMN {name} {kind}")
+            connection.execute(_SERIES_INDEX)
+
+    def _connect(self, timeout: float) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            connection = self._pool.get(timeout=self.timeout)
+        except queue.Empty:
+            raise BookingStoreUnavailable(
+                f"No database connection became free within {self.timeout}s; the pool may be too small"
+            ) from None
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    def __len__(self) -> int:
+        with self._connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+    def __iter__(self) -> Iterator[Dict]:
+        with self._connection() as connection:
+            rows = connection.execute(_ALL).fetchall()
+        return (_decode(row) for row in rows)
+
+    def append(self, record: Dict) -> None:
+        with self._write() as connection:
+            self._insert(connection, record)
+        self._notify(record["expert_id"])
+
+    def reserve(self, record: Dict) -> bool:
+        with self._write() as connection:
+            if self._conflicts(connection, record["expert_id"], record["start"], record["end"]):
+                return False
+            self._insert(connection, record)
+        self._notify(record["expert_id"])
+        return True
+
+    def reserve_many(self, records: List[Dict], atomic: bool = False) -> List[bool]:
+        accepted: List[bool] = []
+        with self._write() as connection:
+            connection.execute("SAVEPOINT batch")
+            for record in records:
+                # Earlier records in the batch are already inserted, so the
+                # same query also catches conflicts within the batch.
+                fits = not self._conflicts(connection, record["expert_id"], record["start"], record["end"])
+                if fits:
+                    self._insert(connection, record)
+                accepted.append(fits)
+            if atomic and not all(accepted):
+                connection.execute("ROLLBACK TO batch")
+            connection.execute("RELEASE batch")
+        if not atomic or all(accepted):
+            for expert_id in {record["expert_id"] for record, fits in zip(records, accepted) if fits}:
+                self._notify(expert_id)
+        return accepted
+
+    def reserve_series(self, record: Dict, skip_conflicts: bool = False) -> Tuple[bool, List[int]]:
+        slots = list(WeeklySeries(record).slots())
+        if not slots:
+            return False, []
+        with self._write() as connection:
+            # Load every row the series could touch in one range query, then
+            # check all sessions against it in a single merge pass.
+            params = self._range_params(connection, record["expert_id"], slots[0][1], slots[-1][2])
+            schedule = ExpertSchedule()
+            for sequence, row in enumerate(connection.execute(_OVERLAPPING, params)):
+                schedule.add(_decode(row), sequence)
+            for row in connection.execute(_SERIES_FOR_EXPERT, (record["expert_id"],)):
+                schedule.add(_decode(row), 0)
+            hits = schedule.conflicts([(start, end) for _, start, end in slots])
+            conflicts = [week for (week, _, _), hit in zip(slots, hits) if hit]
+            if not _keep_series(record, slots, conflicts, skip_conflicts):
+                return False, conflicts
+            self._insert(connection, record)
+        self._notify(record["expert_id"])
+        return True, conflicts
+
+    def get(self, booking_id: str) -> Optional[Dict]:
+        with self._connection() as connection:
+            row = connection.execute(_BY_ID, (booking_id,)).fetchone()
+        return _decode(row) if row is not None else None
+
+    def remove(self, booking_id: str) -> Optional[Dict]:
+        with self._write() as connection:
+            row = connection.execute(_BY_ID, (booking_id,)).fetchone()
+            if row is None:
+                return None
+            connection.execute(_DELETE, (booking_id,))
+        self._notify(row[1])
+        return _decode(row)
+
+    def replace(self, record: Dict) -> bool:
+        booking_id = record["booking_id"]
+        with self._write() as connection:
+            row = connection.execute(_BY_ID, (booking_id,)).fetchone()
+            if row is None:
+                raise KeyError(booking_id)
+            expert_id, start, end = row[1], record["start"], record["end"]
+            params = self._range_params(connection, expert_id, start, end)
+            if connection.execute(_CONFLICT_EXCEPT, (*params, booking_id)).fetchone() is not None:
+                return False
+            if any(
+                series.record["booking_id"] != booking_id and series.overlaps(start, end)
+                for series in self._series(connection, expert_id)
+            ):
+                return False
+            connection.execute(
+                _UPDATE,
+                (
+                    record.get("concept_id"),
+                    _encode(start),
+                    _encode(end),
+                    record.get("group_size"),
+                    record.get("price"),
+                    booking_id,
+                ),
+            )
+            self._widen_span(connection, start, end)
+        self._notify(expert_id)
+        return True
+
+    def archive_finished(self, before: datetime, archive: Callable[[List[Dict]], None]) -> int:
+        with self._write() as connection:
+            finished = [_decode(row) for row in connection.execute(_FINISHED, (_encode(before),))]
+            series = [WeeklySeries(_decode(row)) for row in connection.execute(_ALL_SERIES)]
+            finished_series = [item.record for item in series if item.last_end <= before]
+            if not finished and not finished_series:
+                return 0
+            archive(finished + finished_series)
+            connection.execute(_DELETE_FINISHED, (_encode(before),))
+            connection.executemany(_DELETE, [(record["booking_id"],) for record in finished_series])
+            connection.execute(_RESET_SPAN)
+        for expert_id in {record["expert_id"] for record in finished + finished_series}:
+            self._notify(expert_id)
+        return len(finished) + len(finished_series)
+
+    def export(
+        self,
+        expert_id: Optional[str] = None,
+        concept_id: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[Dict]:
+        conditions, params = ["occurrences IS NULL"], []
+        for column, value in (("expert_id", expert_id), ("concept_id", concept_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        # Series are few; their sessions are expanded up front and merged
+        # into the single bookings, which are read a page at a time.
+        with self._connection() as connection:
+            if start is not None:
+                row: Optional[Tuple[int]] = connection.execute(_MAX_SPAN).fetchone()
+                conditions.append("start_at >= ? AND end_at > ?")
+                params += [_encode(start - timedelta(seconds=row[0] if row else 0)), _encode(start)]
+            if end is not None:
+                conditions.append("start_at < ?")
+                params.append(_encode(end))
+            series = connection.execute(*((_SERIES_FOR_EXPERT, (expert_id,)) if expert_id else (_ALL_SERIES,)))
+            sessions = sorted(
+                (
+                    session
+                    for record in map(_decode, series)
+                    if concept_id is None or record["concept_id"] == concept_id
+                    for session in expand_sessions(record, start, end)
+                ),
+                key=lambda record: (record["expert_id"], record["start"]),
+            )
+        yield from heapq.merge(
+            self._export_rows(" AND ".join(conditions), params),
+            sessions,
+            key=lambda record: (record["expert_id"], record["start"]),
+        )
+
+    def _export_rows(self, where: str, params: List) -> Iterator[Dict]:
+        # Keyset pages: each holds a connection (and read transaction) only
+        # while it is fetched, so slow downloads never pin the pool or
+        # block WAL checkpoints.
+        query = (
+            f"SELECT {_COLUMNS}, id FROM bookings WHERE {where} AND (expert_id, start_at, id) > (?, ?, ?) "
+            f"ORDER BY expert_id, start_at, id LIMIT {EXPORT_PAGE}"
+        )
+        after: Tuple = ("", "", 0)
+        while True:
+            with self._connection() as connection:
+                rows = connection.execute(query, [*params, *after]).fetchall()
+            for row in rows:
+                yield _decode(row[:-1])
+            if len(rows) < EXPORT_PAGE:
+                return
+            after = (rows[-1][1], rows[-1][3], rows[-1][-1])
+
+    def clear(self) -> None:
+        with self._write() as connection:
+            connection.execute("DELETE FROM bookings")
+            connection.execute("DELETE FROM booking_meta")
+        self._notify(None)
+
+    def for_expert(self, expert_id: str) -> List[Dict]:
+        with self._connection() as connection:
+            return [_decode(row) for row in connection.execute(_FOR_EXPERT, (expert_id,))]
+
+    def overlapping(self, expert_id: str, start: datetime, end: datetime) -> List[Dict]:
+        with self._connection() as connection:
+            params = self._range_params(connection, expert_id, start, end)
+            found = [_decode(row) for row in connection.execute(_OVERLAPPING, params)]
+            series = self._series(connection, expert_id)
+        if series:
+            for item in series:
+                found.extend(item.overlapping(start, end))
+            found.sort(key=lambda record: record["start"])
+        return found
+
+    def has_conflict(self, expert_id: str, start: datetime, end: datetime) -> bool:
+        with self._connection() as connection:
+            return self._conflicts(connection, expert_id, start, end)
+
+    def _conflicts(self, connection: sqlite3.Connection, expert_id: str, start: datetime, end: datetime) -> bool:
+        params = self._range_params(connection, expert_id, start, end)
+        if connection.execute(_CONFLICT, params).fetchone() is not None:
+            return True
+        return any(series.overlaps(start, end) for series in self._series(connection, expert_id))
+
+    @staticmethod
+    def _series(connection: sqlite3.Connection, expert_id: str) -> List[WeeklySeries]:
+        return [WeeklySeries(_decode(row)) for row in connection.execute(_SERIES_FOR_EXPERT, (expert_id,))]
+
+    @staticmethod
+    def _range_params(
+        connection: sqlite3.Connection, expert_id: str, start: datetime, end: datetime
+    ) -> Tuple[str, str, str, str]:
+        row: Optional[Tuple[int]] = connection.execute(_MAX_SPAN).fetchone()
+        max_span = timedelta(seconds=row[0] if row else 0)
+        return expert_id, _encode(start - max_span), _encode(end), _encode(start)
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, record: Dict) -> None:
+        connection.execute(
+            _INSERT,
+            (
+                record.get("booking_id"),
+                record["expert_id"],
+                record.get("concept_id"),
+                _encode(record["start"]),
+                _encode(record["end"]),
+                record.get("group_size"),
+                record.get("price"),
+                record.get("occurrences"),
+                json.dumps(record["skipped"]) if record.get("skipped") else None,
+            ),
+        )
+        SQLiteBookingRepository._widen_span(connection, record["start"], record["end"])
+
+    @staticmethod
+    def _widen_span(connection: sqlite3.Connection, start: datetime, end: datetime) -> None:
+        connection.execute(_WIDEN_SPAN, (-(-(end - start) // timedelta(seconds=1)),))
@@ -0,0 +1 @@
+"""Benchmarks for the economics learning prototype."""
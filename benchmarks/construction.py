@@ -0,0 +1,102 @@
+"""Validated versus trusted model construction and response serialization.
+
+Builds the synthetic catalog's concepts and experts both ways, then encodes a
+booking response through FastAPI's ``response_model`` pass (as the endpoint
+did before it returned pre-encoded bodies) and directly. Run with
+``python -m benchmarks.construction [--scale medium] [--repeat 200]``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.schemas import (
+    BookingConfirmation,
+    BookingResponse,
+    Concept,
+    Expert,
+    LearningModule,
+    trusted,
+    trusted_concept,
+    trusted_expert,
+    trusted_module,
+)
+
+from .run import measure
+from .synthetic import EPOCH, SCALES, generate
+
+
+def _pairs(scale_name: str) -> Dict[str, Dict[str, Callable[[], object]]]:
+    market = generate(SCALES[scale_name])
+    modules: Dict[str, List[Dict]] = {}
+    for module in market.MODULES:
+        modules.setdefault(module["concept_id"], []).append(module)
+    concepts = list(market.CONCEPTS.values())
+    experts = list(market.EXPERTS.values())
+
+    concept = trusted_concept(concepts[0], [trusted_module(module) for module in modules[concepts[0]["id"]]])
+    expert = trusted_expert(experts[0])
+    confirmation = {
+        "booking_id": "benchmark",
+        "expert": expert,
+        "concept": concept,
+        "start_time": EPOCH,
+        "end_time": EPOCH + timedelta(hours=1),
+        "group_size": 1,
+        "price": 120.0,
+    }
+    field = create_response_field(name="BookingResponse", type_=BookingResponse)
+    loop = asyncio.new_event_loop()
+
+    return {
+        "build concepts": {
+            "validated": lambda: [
+                Concept(**record, modules=[LearningModule(**module) for module in modules.get(record["id"], [])])
+                for record in concepts
+            ],
+            "trusted": lambda: [
+                trusted_concept(record, [trusted_module(module) for module in modules.get(record["id"], [])])
+                for record in concepts
+            ],
+        },
+        "build experts": {
+            "validated": lambda: [Expert(**record) for record in experts],
+            "trusted": lambda: [trusted_expert(record) for record in experts],
+        },
+        "booking response": {
+            "validated": lambda: json.dumps(
+                loop.run_until_complete(
+                    serialize_response(
+                        field=field,
+                        response_content=BookingResponse(confirmation=BookingConfirmation(**confirmation)),
+                    )
+                )
+            ),
+            "trusted": lambda: trusted(
+                BookingResponse, confirmation=trusted(BookingConfirmation, **confirmation)
+            ).json(),
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    print(f"{'operation':<18} {'validated us':>13} {'trusted us':>11} {'speedup':>8}")
+    for name, variants in _pairs(args.scale).items():
+        validated = measure(name, args.scale, variants["validated"], args.repeat)["median_us"]
+        fast = measure(name, args.scale, variants["trusted"], args.repeat)["median_us"]
+        print(f"{name:<18} {validated:>13.1f} {fast:>11.1f} {validated / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
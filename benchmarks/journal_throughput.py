@@ -0,0 +1,69 @@
+"""Measure booking journal append throughput under different group-commit settings.
+
+Run with ``python -m benchmarks.journal_throughput``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import product
+from time import perf_counter
+from typing import Dict, List
+
+from app.journal import JournaledBookingStore
+
+BASE = datetime(2024, 1, 1)
+HOUR = timedelta(hours=1)
+
+
+def run(group_size: int, group_delay: float, writers: int, bookings: int) -> Dict:
+    with tempfile.TemporaryDirectory() as directory:
+        store = JournaledBookingStore(directory, group_size=group_size, group_delay=group_delay)
+
+        def book(position: int) -> None:
+            start = BASE + (position // writers) * HOUR
+            store.reserve({"expert_id": f"expert-{position % writers}", "start": start, "end": start + HOUR})
+
+        started = perf_counter()
+        with ThreadPoolExecutor(max_workers=writers) as pool:
+            list(pool.map(book, range(bookings)))
+        elapsed = perf_counter() - started
+        store.close()
+    return {
+        "group_size": group_size,
+        "group_delay_ms": group_delay * 1000,
+        "writers": writers,
+        "bookings": bookings,
+        "appends_per_second": round(bookings / elapsed, 1),
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=2_000)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--group-sizes", type=int, nargs="+", default=[1, 16, 128])
+    parser.add_argument("--group-delays-ms", type=float, nargs="+", default=[0.0, 1.0])
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [
+        run(group_size, delay / 1000, writers, args.bookings)
+        for writers, group_size, delay in product(args.writers, args.group_sizes, args.group_delays_ms)
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'writers':>8} {'group':>6} {'delay ms':>9} {'appends/s':>12}")
+    for result in results:
+        print(
+            f"{result['writers']:>8} {result['group_size']:>6} "
+            f"{result['group_delay_ms']:>9.1f} {result['appends_per_second']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""In-process load driver reporting throughput and latency percentiles per route.
+
+Replays a weighted mix of catalog reads, expert filters and bookings against
+``app.api:app`` through the ASGI interface (no network) at a fixed
+concurrency. Run with ``python -m benchmarks.load``, for example::
+
+    python -m benchmarks.load --scale medium --concurrency 64 --requests 20000 \\
+        --mix concepts=30,concept=20,experts=30,booking=15,contended=5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+from collections import Counter, defaultdict
+from datetime import timedelta
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.availability import WEEKDAYS
+
+from .asgi import ASGIResponse, request
+from .synthetic import EPOCH, SCALES, Marketplace, generate, installed
+
+DEFAULT_MIX = {"concepts": 30, "concept": 20, "experts": 30, "booking": 15, "contended": 5}
+
+Operation = Callable[[random.Random], Tuple[str, Awaitable[ASGIResponse]]]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted ``samples``."""
+    if not samples:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(samples)))
+    return samples[rank - 1]
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+def _booking_body(expert: Dict, week: int) -> Dict[str, Any]:
+    window = expert["availability"][0]
+    start = EPOCH + timedelta(
+        weeks=week, days=WEEKDAYS.index(window["weekday"]), hours=window["start"].hour
+    )
+    return {
+        "expert_id": expert["id"],
+        "concept_id": expert["focus_areas"][0],
+        "start_time": start.isoformat(),
+        "duration_minutes": 60,
+        "client_name": "Load Tester",
+    }
+
+
+def operations(app: Any, market: Marketplace) -> Dict[str, Operation]:
+    concept_ids = list(market.CONCEPTS)
+    experts = list(market.EXPERTS.values())
+    contended = experts[0]
+    week = iter(range(1_000, 10**9))
+
+    return {
+        "concepts": lambda rng: ("GET /concepts", request(app, "GET", "/concepts")),
+        "concept": lambda rng: (
+            "GET /concepts/{id}",
+            request(app, "GET", f"/concepts/{rng.choice(concept_ids)}"),
+        ),
+        "experts": lambda rng: (
+            "GET /experts?concept_id",
+            request(app, "GET", "/experts", params={"concept_id": rng.choice(concept_ids)}),
+        ),
+        # Each uncontended booking targets a fresh week for a random expert.
+        "booking": lambda rng: (
+            "POST /bookings",
+            request(app, "POST", "/bookings", json_body=_booking_body(rng.choice(experts), next(week))),
+        ),
+        # Contended bookings race for a handful of slots on one expert.
+        "contended": lambda rng: (
+            "POST /bookings [contended]",
+            request(app, "POST", "/bookings", json_body=_booking_body(contended, 2_000 + rng.randrange(4))),
+        ),
+    }
+
+
+async def drive(
+    app: Any, market: Marketplace, mix: Dict[str, int], concurrency: int, total: int, seed: int = 0
+) -> Dict[str, Any]:
+    available = operations(app, market)
+    names = [name for name in mix if mix[name] > 0]
+    weights = [mix[name] for name in names]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+    remaining = total
+
+    async def worker(worker_seed: int) -> None:
+        nonlocal remaining
+        rng = random.Random(worker_seed)
+        while remaining > 0:
+            remaining -= 1
+            route, pending = available[rng.choices(names, weights)[0]](rng)
+            started = perf_counter()
+            response = await pending
+            latencies[route].append(perf_counter() - started)
+            statuses[route][response.status] += 1
+
+    started = perf_counter()
+    await asyncio.gather(*(worker(seed * 1_000_003 + index) for index in range(concurrency)))
+    elapsed = perf_counter() - started
+
+    routes = {}
+    for route, samples in sorted(latencies.items()):
+        samples.sort()
+        routes[route] = {
+            "requests": len(samples),
+            "throughput_rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+            "statuses": {str(status): count for status, count in sorted(statuses[route].items())},
+        }
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "routes": routes,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    from app.api import app
+
+    with installed(generate(SCALES[args.scale], seed=args.seed)) as market:
+        report = asyncio.run(drive(app, market, args.mix, args.concurrency, args.requests, args.seed))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(
+        f"{report['requests']} requests at concurrency {report['concurrency']} in "
+        f"{report['elapsed_s']}s ({report['throughput_rps']} req/s)"
+    )
+    print(f"{'route':<28} {'reqs':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for route, stats in report["routes"].items():
+        print(
+            f"{route:<28} {stats['requests']:>7} {stats['throughput_rps']:>9.1f} "
+            f"{stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f}  {stats['statuses']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
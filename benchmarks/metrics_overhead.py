@@ -0,0 +1,96 @@
+"""Cost of the metrics instrumentation on bookings and HTTP routes.
+
+Times the same operations with collection switched on and off (the
+``METRICS=0`` setting) and reports the difference. Run with
+``python -m benchmarks.metrics_overhead [--scale medium] [--repeat 2000]``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from typing import Callable, Dict, List, Optional
+
+from app import services
+from app.metrics import BOOKING_STAGE_SECONDS, REGISTRY
+
+from .asgi import request
+from .run import _booking_requests, measure
+from .synthetic import SCALES, generate, installed
+
+
+def _stopwatch_cost(repeat: int) -> Dict:
+    """Seven laps and a flush: exactly what one create_booking records."""
+
+    def record() -> None:
+        watch = REGISTRY.stopwatch(BOOKING_STAGE_SECONDS)
+        for stage in ("a", "b", "c", "d", "e", "f", "g"):
+            watch.lap(stage)
+        watch.finish()
+
+    return measure("stopwatch[7 laps]", "-", record, repeat)
+
+
+def compare_overhead(scale_name: str, repeat: int) -> List[Dict]:
+    from app.api import app
+
+    market = generate(SCALES[scale_name])
+    concept_id = next(iter(market.CONCEPTS))
+    next_request = _booking_requests(market)
+    loop = asyncio.new_event_loop()
+    operations: Dict[str, Callable[[], object]] = {
+        "create_booking": lambda: services.create_booking(next_request()),
+        "GET /concepts/{id}": lambda: loop.run_until_complete(
+            request(app, "GET", f"/concepts/{concept_id}")
+        ),
+        "POST /bookings": lambda: loop.run_until_complete(
+            request(app, "POST", "/bookings", json_body=json.loads(next_request().json()))
+        ),
+    }
+
+    rows = []
+    enabled = REGISTRY.enabled
+    try:
+        with installed(market):
+            for name, call in operations.items():
+                timings = {}
+                # Alternate on and off so drift in machine load hits both.
+                for state in (False, True, False, True):
+                    REGISTRY.enabled = state
+                    result = measure(name, scale_name, call, repeat)
+                    timings.setdefault(state, []).append(result["median_us"])
+                off, on = min(timings[False]), min(timings[True])
+                rows.append(
+                    {
+                        "name": name,
+                        "scale": scale_name,
+                        "off_us": off,
+                        "on_us": on,
+                        "overhead_us": round(on - off, 2),
+                        "overhead_pct": round((on - off) / off * 100, 1),
+                    }
+                )
+    finally:
+        REGISTRY.enabled = enabled
+        loop.close()
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=1_000)
+    args = parser.parse_args(argv)
+
+    stopwatch = _stopwatch_cost(args.repeat)
+    print(f"stopwatch, 7 laps + flush: median {stopwatch['median_us']:.2f}us")
+    print(f"{'operation':<22} {'off us':>9} {'on us':>9} {'overhead':>9} {'%':>6}")
+    for row in compare_overhead(args.scale, args.repeat):
+        print(
+            f"{row['name']:<22} {row['off_us']:>9.1f} {row['on_us']:>9.1f} "
+            f"{row['overhead_us']:>9.2f} {row['overhead_pct']:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
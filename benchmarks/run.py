@@ -0,0 +1,218 @@
+"""Time service calls and HTTP routes against synthetic marketplaces.
+
+Run with ``python -m benchmarks.run``. Results are written as JSON and can be
+compared against a stored baseline::
+
+    python -m benchmarks.run --scales small medium --output results.json
+    python -m benchmarks.run --baseline results.json --tolerance 0.25
+
+The free-slot search is also timed against fixed budgets (see
+``OPEN_SLOTS_BUDGETS_MS``); a median over budget fails the run.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+from app import services
+from app.schemas import BookingRequest
+
+from .asgi import request
+from .synthetic import EPOCH, SCALES, Marketplace, Scale, generate, installed
+
+# find_open_slots over 1,000 experts with 6 weekly windows each, searched
+# across 90 days (about 77k free windows), by number of booked sessions.
+OPEN_SLOTS_EXPERTS = 1_000
+OPEN_SLOTS_DAYS = 90
+OPEN_SLOTS_BUDGETS_MS = {0: 100.0, 50_000: 200.0}
+
+
+def measure(name: str, scale: str, call: Callable[[], object], repeat: int) -> Dict:
+    call()  # warm caches so steady-state latency is what gets recorded
+    samples = []
+    for _ in range(repeat):
+        started = perf_counter()
+        call()
+        samples.append(perf_counter() - started)
+    samples.sort()
+    return {
+        "name": name,
+        "scale": scale,
+        "repeat": repeat,
+        "median_us": round(statistics.median(samples) * 1e6, 2),
+        "p95_us": round(samples[int(len(samples) * 0.95) - 1] * 1e6, 2),
+        "ops_per_second": round(repeat / sum(samples), 1),
+    }
+
+
+def _booking_requests(market: Marketplace) -> Callable[[], BookingRequest]:
+    """Yield requests for free future slots, cycling through experts."""
+    experts = list(market.EXPERTS.values())
+    position = 0
+
+    def next_request() -> BookingRequest:
+        nonlocal position
+        expert = experts[position % len(experts)]
+        window = expert["availability"][0]
+        week = 1_000 + position // len(experts)
+        start = EPOCH + timedelta(weeks=week) + timedelta(
+            days=["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"].index(
+                window["weekday"]
+            ),
+            hours=window["start"].hour,
+        )
+        position += 1
+        return BookingRequest(
+            expert_id=expert["id"],
+            concept_id=expert["focus_areas"][0],
+            start_time=start,
+            duration_minutes=60,
+            client_name="Benchmark Learner",
+        )
+
+    return next_request
+
+
+def run_scale(scale_name: str, repeat: int) -> List[Dict]:
+    from app.api import app  # imported lazily: FastAPI is only needed for HTTP timings
+
+    market = generate(SCALES[scale_name])
+    concept_id = next(iter(market.CONCEPTS))
+    next_request = _booking_requests(market)
+    results = []
+    with installed(market):
+        results.append(measure("list_concepts", scale_name, services.list_concepts, repeat))
+        results.append(measure("get_concept", scale_name, lambda: services.get_concept(concept_id), repeat))
+        results.append(measure("list_experts", scale_name, services.list_experts, repeat))
+        results.append(
+            measure("list_experts[concept]", scale_name, lambda: services.list_experts(concept_id), repeat)
+        )
+        results.append(
+            measure("create_booking", scale_name, lambda: services.create_booking(next_request()), repeat)
+        )
+
+        loop = asyncio.new_event_loop()
+        try:
+            routes = {
+                "GET /concepts": lambda: request(app, "GET", "/concepts"),
+                "GET /concepts/{id}": lambda: request(app, "GET", f"/concepts/{concept_id}"),
+                "GET /experts": lambda: request(app, "GET", "/experts"),
+                "GET /experts?concept_id": lambda: request(
+                    app, "GET", "/experts", params={"concept_id": concept_id}
+                ),
+                "POST /bookings": lambda: request(
+                    app, "POST", "/bookings", json_body=json.loads(next_request().json())
+                ),
+            }
+            for name, make in routes.items():
+                results.append(measure(name, scale_name, lambda: loop.run_until_complete(make()), repeat))
+        finally:
+            loop.close()
+    return results
+
+
+def run_open_slots(repeat: int) -> List[Dict]:
+    results = []
+    for bookings, budget in OPEN_SLOTS_BUDGETS_MS.items():
+        scale = Scale(
+            concepts=1,
+            modules_per_concept=1,
+            experts=OPEN_SLOTS_EXPERTS,
+            windows_per_expert=6,
+            bookings=bookings,
+            focus_areas_per_expert=1,
+        )
+        market = generate(scale)
+        end = EPOCH + timedelta(days=OPEN_SLOTS_DAYS)
+        with installed(market):
+            entry = measure(
+                "find_open_slots",
+                f"{bookings // 1000}k",
+                lambda: services.find_open_slots("concept-0", EPOCH, end, 60),
+                repeat,
+            )
+        results.append({**entry, "budget_us": budget * 1000})
+    return results
+
+
+def over_budget(results: List[Dict]) -> List[str]:
+    """Return a message for every result whose median exceeds its ``budget_us``."""
+    return [
+        f"{entry['name']} [{entry['scale']}]: {entry['median_us']}us vs budget {entry['budget_us']}us"
+        for entry in results
+        if "budget_us" in entry and entry["median_us"] > entry["budget_us"]
+    ]
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """Return a message for every result slower than its baseline by more than ``tolerance``."""
+    reference = {(entry["name"], entry["scale"]): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        previous = reference.get((entry["name"], entry["scale"]))
+        if previous is None:
+            continue
+        limit = previous["median_us"] * (1 + tolerance)
+        if entry["median_us"] > limit:
+            regressions.append(
+                f"{entry['name']} [{entry['scale']}]: {entry['median_us']}us "
+                f"vs baseline {previous['median_us']}us"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=sorted(SCALES), default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="compare against results previously written with --output")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, e.g. 0.25 = 25%%")
+    parser.add_argument("--slots-repeat", type=int, default=20, help="repeats of each free-slot search")
+    args = parser.parse_args(argv)
+
+    results: List[Dict] = []
+    for scale_name in args.scales:
+        results.extend(run_scale(scale_name, args.repeat))
+    results.extend(run_open_slots(args.slots_repeat))
+
+    for entry in results:
+        print(
+            f"{entry['scale']:>7} {entry['name']:<26} median {entry['median_us']:>10.1f}us "
+            f"p95 {entry['p95_us']:>10.1f}us {entry['ops_per_second']:>10.1f} ops/s"
+        )
+
+    if args.output:
+        report = {
+            "meta": {
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+    failed = False
+    for message in over_budget(results):
+        print(f"OVER BUDGET {message}", file=sys.stderr)
+        failed = True
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(results, json.load(handle)["results"], args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
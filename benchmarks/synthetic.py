@@ -0,0 +1,139 @@
+"""Synthetic catalogs and expert marketplaces of configurable size."""
+from __future__ import annotations
+
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Dict, Iterator, List
+
+from app import data, services
+from app.availability import WEEKDAYS
+from app.bookings import BookingIndex
+
+# Monday, so generated bookings line up with weekday availability.
+EPOCH = datetime(2024, 1, 1)
+
+
+@dataclass
+class Scale:
+    concepts: int
+    modules_per_concept: int
+    experts: int
+    windows_per_expert: int
+    bookings: int
+    focus_areas_per_expert: int = 3
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(concepts=20, modules_per_concept=5, experts=100, windows_per_expert=4, bookings=1_000),
+    "medium": Scale(concepts=200, modules_per_concept=10, experts=2_000, windows_per_expert=6, bookings=50_000),
+    "large": Scale(concepts=2_000, modules_per_concept=10, experts=20_000, windows_per_expert=8, bookings=500_000),
+}
+
+
+@dataclass
+class Marketplace:
+    """Seed data shaped like :mod:`app.data` plus historical bookings."""
+
+    CONCEPTS: Dict[str, Dict] = field(default_factory=dict)
+    MODULES: List[Dict] = field(default_factory=list)
+    EXPERTS: Dict[str, Dict] = field(default_factory=dict)
+    bookings: List[Dict] = field(default_factory=list)
+
+
+def generate(scale: Scale, seed: int = 0) -> Marketplace:
+    rng = random.Random(seed)
+    market = Marketplace()
+
+    for number in range(scale.concepts):
+        concept_id = f"concept-{number}"
+        market.CONCEPTS[concept_id] = {
+            "id": concept_id,
+            "title": f"Concept {number}",
+            "summary": f"Synthetic summary for concept {number}.",
+            "why_it_matters": f"Synthetic rationale for concept {number}.",
+        }
+        for module_number in range(scale.modules_per_concept):
+            market.MODULES.append(
+                {
+                    "id": f"{concept_id}-module-{module_number}",
+                    "concept_id": concept_id,
+                    "title": f"Module {module_number} of concept {number}",
+                    "objectives": [f"Objective {index}" for index in range(3)],
+                    "content_summary": "Synthetic walkthrough.",
+                    "resources": [
+                        {
+                            "type": "article",
+                            "title": f"Reading {module_number}",
+                            "url": f"https://example.com/{concept_id}/{module_number}",
+                        }
+                    ],
+                }
+            )
+
+    concept_ids = list(market.CONCEPTS)
+    for number in range(scale.experts):
+        expert_id = f"expert-{number}"
+        windows = []
+        for weekday in rng.sample(WEEKDAYS, min(scale.windows_per_expert, len(WEEKDAYS))):
+            start_hour = rng.randrange(7, 15)
+            windows.append(
+                {
+                    "weekday": weekday,
+                    "start": time(start_hour, 0),
+                    "end": time(start_hour + rng.randrange(2, 6), 0),
+                }
+            )
+        market.EXPERTS[expert_id] = {
+            "id": expert_id,
+            "name": f"Expert {number}",
+            "credentials": "Synthetic credentials",
+            "focus_areas": rng.sample(concept_ids, min(scale.focus_areas_per_expert, len(concept_ids))),
+            "rate_per_hour": float(rng.randrange(100, 800, 10)),
+            "group_discount": round(rng.uniform(0.7, 1.0), 2),
+            "availability": windows,
+        }
+
+    # Historical bookings fill each expert's windows week by week, earliest first.
+    expert_ids = list(market.EXPERTS)
+    for number in range(scale.bookings):
+        expert = market.EXPERTS[expert_ids[number % len(expert_ids)]]
+        window = expert["availability"][(number // len(expert_ids)) % len(expert["availability"])]
+        week = number // (len(expert_ids) * len(expert["availability"]))
+        start = (
+            EPOCH
+            + timedelta(weeks=week, days=WEEKDAYS.index(window["weekday"]))
+            + timedelta(hours=window["start"].hour)
+        )
+        market.bookings.append(
+            {
+                "booking_id": f"booking-{number}",
+                "expert_id": expert["id"],
+                "concept_id": expert["focus_areas"][0],
+                "start": start,
+                "end": start + timedelta(hours=1),
+                "group_size": 1,
+                "price": expert["rate_per_hour"],
+            }
+        )
+    return market
+
+
+@contextmanager
+def installed(market: Marketplace) -> Iterator[Marketplace]:
+    """Serve ``market`` through the service layer, restoring the seed data after."""
+    originals = data.CONCEPTS, data.MODULES, data.EXPERTS
+    data.CONCEPTS, data.MODULES, data.EXPERTS = market.CONCEPTS, market.MODULES, market.EXPERTS
+    store = BookingIndex()
+    store.extend(market.bookings)
+    previous = services.use_booking_store(store)
+    services.reload_catalog()
+    services.reload_experts()
+    try:
+        yield market
+    finally:
+        data.CONCEPTS, data.MODULES, data.EXPERTS = originals
+        services.use_booking_store(previous)
+        services.reload_catalog()
+        services.reload_experts()
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import json
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import data
+from app.api import RESPONSE_CACHE, _export_chunks, app
+from app.cache import ResponseCache
+from app.services import (
+    BOOKINGS,
+    BOOKINGS_ARCHIVE,
+    compact_bookings,
+    export_bookings,
+    reload_catalog,
+    reload_experts,
+)
+
+client = TestClient(app)
+
+
+def setup_function() -> None:
+    BOOKINGS.clear()
+    RESPONSE_CACHE.invalidate()
+
+
+def test_concepts_served_with_etag_and_not_modified() -> None:
+    first = client.get("/concepts")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.json()["concepts"]
+
+    assert client.get("/concepts").content == first.content
+    cached = client.get("/concepts", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+
+def test_etag_varies_by_concept_filter() -> None:
+    supply = client.get("/experts", params={"concept_id": "supply-demand"})
+    monetary = client.get("/experts", params={"concept_id": "monetary-policy"})
+    assert supply.headers["etag"] != monetary.headers["etag"]
+
+    stale = client.get(
+        "/experts",
+        params={"concept_id": "monetary-policy"},
+        headers={"If-None-Match": supply.headers["etag"]},
+    )
+    assert stale.status_code == 200
+
+
+def test_concept_filter_variants_share_one_cache_entry() -> None:
+    plain = client.get("/experts", params={"concept_id": "supply-demand"})
+    entries = len(RESPONSE_CACHE)
+    shouted = client.get("/experts", params={"concept_id": "  Supply-Demand "})
+    assert shouted.content == plain.content
+    assert shouted.headers["etag"] == plain.headers["etag"]
+    assert len(RESPONSE_CACHE) == entries
+
+
+def test_response_cache_keeps_most_recently_used_entries() -> None:
+    cache = ResponseCache(max_entries=2)
+    renders = []
+
+    def render(key: str) -> bytes:
+        renders.append(key)
+        return key.encode()
+
+    for key in ("a", "b", "a", "c"):
+        cache.get_or_render("route", key, lambda key=key: render(key))
+    assert len(cache) == 2
+    assert renders == ["a", "b", "c"]
+    # "b" was least recently used, so it is the one rendered again.
+    cache.get_or_render("route", "a", lambda: render("a"))
+    cache.get_or_render("route", "b", lambda: render("b"))
+    assert renders == ["a", "b", "c", "b"]
+
+
+def test_missing_concept_still_returns_404() -> None:
+    assert client.get("/concepts/unknown").status_code == 404
+    assert client.get("/experts", params={"concept_id": "unknown"}).status_code == 404
+
+
+def test_catalog_reload_invalidates_cached_body(monkeypatch: pytest.MonkeyPatch) -> None:
+    before = client.get("/concepts/supply-demand")
+    concepts = dict(data.CONCEPTS)
+    concepts["supply-demand"] = {**concepts["supply-demand"], "title": "Supply, Demand, Prices"}
+    monkeypatch.setattr(data, "CONCEPTS", concepts)
+    reload_catalog()
+    try:
+        after = client.get(
+            "/concepts/supply-demand", headers={"If-None-Match": before.headers["etag"]}
+        )
+        assert after.status_code == 200
+        assert json.loads(after.content)["concepts"][0]["title"] == "Supply, Demand, Prices"
+    finally:
+        monkeypatch.undo()
+        reload_catalog()
+
+
+def test_expert_reload_invalidates_cached_body(monkeypatch: pytest.MonkeyPatch) -> None:
+    before = client.get("/experts")
+    experts = {key: value for key, value in data.EXPERTS.items() if key != "dr-saito"}
+    monkeypatch.setattr(data, "EXPERTS", experts)
+    reload_experts()
+    try:
+        after = client.get("/experts", headers={"If-None-Match": before.headers["etag"]})
+        assert after.status_code == 200
+        assert {expert["id"] for expert in after.json()["experts"]} == set(experts)
+    finally:
+        monkeypatch.undo()
+        reload_experts()
+
+
+def test_batch_booking_endpoint_reports_per_item_results() -> None:
+    booking = {
+        "expert_id": "prof-chan",
+        "concept_id": "supply-demand",
+        "start_time": "2024-05-08T15:30:00",
+        "duration_minutes": 60,
+        "client_name": "Corporate Learner",
+    }
+    response = client.post(
+        "/bookings/batch",
+        json={"bookings": [booking, {**booking, "expert_id": "nobody"}]},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["booked"] == 1
+    assert body["results"][0]["confirmation"]["expert"]["id"] == "prof-chan"
+    assert body["results"][1]["error"] == "unknown_expert"
+
+    assert client.post("/bookings/batch", json={"bookings": []}).status_code == 422
+
+
+def test_cancel_and_reschedule_bookings() -> None:
+    booking = {
+        "expert_id": "prof-chan",
+        "concept_id": "supply-demand",
+        "start_time": "2024-05-08T15:00:00",
+        "duration_minutes": 60,
+        "client_name": "Flexible Learner",
+    }
+    first = client.post("/bookings", json=booking).json()["confirmation"]["booking_id"]
+    second = client.post("/bookings", json={**booking, "start_time": "2024-05-08T16:30:00"}).json()
+
+    moved = client.patch(f"/bookings/{first}", json={"start_time": "2024-05-10T09:00:00", "duration_minutes": 90})
+    assert moved.status_code == 200
+    confirmation = moved.json()["confirmation"]
+    assert confirmation["booking_id"] == first
+    assert (confirmation["end_time"], confirmation["price"]) == ("2024-05-10T10:30:00", 750.0)
+    # The freed slot can be booked again.
+    assert client.post("/bookings", json=booking).status_code == 200
+
+    clash = client.patch(f"/bookings/{first}", json={"start_time": "2024-05-08T15:30:00"})
+    assert clash.status_code == 409
+    outside = client.patch(f"/bookings/{first}", json={"start_time": "2024-05-10T19:00:00"})
+    assert outside.status_code == 400
+
+    second_id = second["confirmation"]["booking_id"]
+    assert client.delete(f"/bookings/{second_id}").status_code == 204
+    assert client.delete(f"/bookings/{second_id}").status_code == 404
+    assert client.patch(f"/bookings/{second_id}", json={"start_time": "2024-05-08T16:30:00"}).status_code == 404
+    assert len(BOOKINGS) == 2
+
+
+def test_recurring_series_endpoint() -> None:
+    series = {
+        "expert_id": "prof-chan",
+        "concept_id": "supply-demand",
+        "start_time": "2024-05-08T15:00:00",
+        "duration_minutes": 60,
+        "client_name": "Semester Learner",
+        "weeks": 15,
+    }
+    response = client.post("/bookings/recurring", json=series)
+    assert response.status_code == 200
+    body = response.json()["series"]
+    assert (body["sessions"], body["skipped_weeks"], body["total_price"]) == (15, [], 7500.0)
+
+    clash = client.post("/bookings/recurring", json={**series, "start_time": "2024-05-29T15:30:00", "weeks": 2})
+    assert clash.status_code == 409
+    assert clash.json()["detail"]["conflicting_weeks"] == [0, 1]
+    assert client.post("/bookings/recurring", json={**series, "weeks": 0}).status_code == 422
+    moved = client.patch(f"/bookings/{body['booking_id']}", json={"start_time": "2024-05-08T16:00:00"})
+    assert moved.status_code == 400
+    assert client.delete(f"/bookings/{body['booking_id']}").status_code == 204
+    assert client.post("/bookings/recurring", json=series).status_code == 200
+
+
+def test_bookings_export_streams_ndjson_and_csv() -> None:
+    BOOKINGS_ARCHIVE.clear()
+    booking = {
+        "expert_id": "prof-chan",
+        "concept_id": "supply-demand",
+        "start_time": "2024-05-08T15:00:00",
+        "duration_minutes": 60,
+        "client_name": "Audited Learner",
+        "group_size": 2,
+    }
+    single = client.post("/bookings", json=booking).json()["confirmation"]
+    series = client.post(
+        "/bookings/recurring", json={**booking, "start_time": "2024-05-01T15:00:00", "weeks": 3, "skip_weeks": [1]}
+    ).json()["series"]
+
+    response = client.get("/bookings/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["booking_id"], row["start"], row["week"]) for row in rows] == [
+        (series["booking_id"], "2024-05-01T15:00:00", 0),
+        (single["booking_id"], "2024-05-08T15:00:00", None),
+        (series["booking_id"], "2024-05-15T15:00:00", 2),
+    ]
+    assert rows[1] == {
+        "booking_id": single["booking_id"],
+        "expert_id": "prof-chan",
+        "concept_id": "supply-demand",
+        "start": "2024-05-08T15:00:00",
+        "end": "2024-05-08T16:00:00",
+        "group_size": 2,
+        "price": single["price"],
+        "week": None,
+    }
+
+    csv_export = client.get(
+        "/bookings/export", params={"format": "csv", "start": "2024-05-08T00:00:00", "expert_id": "prof-chan"}
+    )
+    assert csv_export.headers["content-type"] == "text/csv; charset=utf-8"
+    lines = csv_export.text.splitlines()
+    assert lines[0] == "booking_id,expert_id,concept_id,start,end,group_size,price,week"
+    assert [line.split(",")[3] for line in lines[1:]] == ["2024-05-08T15:00:00", "2024-05-15T15:00:00"]
+    assert lines[1].endswith(",")  # single sessions have no week
+
+    # Compacted sessions are only exported on request; the series is still live.
+    assert compact_bookings(datetime(2024, 5, 10)) == 1
+    assert len(client.get("/bookings/export").text.splitlines()) == 2
+    archived = client.get("/bookings/export", params={"archived": "true", "concept_id": "supply-demand"})
+    assert len(archived.text.splitlines()) == 3
+
+    assert client.get("/bookings/export", params={"concept_id": "unknown"}).text == ""
+    assert client.get("/bookings/export", params={"format": "xml"}).status_code == 422
+    invalid = {"start": "2024-05-08T00:00:00", "end": "2024-05-07T00:00:00"}
+    assert client.get("/bookings/export", params=invalid).status_code == 400
+    # Offset-aware bounds are compared in UTC with the naive stored times.
+    aware = client.get("/bookings/export", params={"start": "2024-05-15T16:30:00+02:00"})
+    assert aware.status_code == 200
+    assert [json.loads(line)["week"] for line in aware.text.splitlines()] == [2]
+    mixed = {"start": "2024-05-08T00:00:00", "end": "2024-05-08T01:00:00+02:00"}
+    assert client.get("/bookings/export", params=mixed).status_code == 400
+
+
+def test_bookings_export_memory_does_not_grow_with_rows() -> None:
+    def book(experts: range) -> None:
+        start = datetime(2024, 5, 6, 9)
+        for expert in experts:
+            for slot in range(100):
+                begins = start + timedelta(hours=slot)
+                BOOKINGS.append(
+                    {
+                        "booking_id": f"{expert}-{slot}",
+                        "expert_id": f"expert-{expert}",
+                        "concept_id": "supply-demand",
+                        "start": begins,
+                        "end": begins + timedelta(hours=1),
+                        "group_size": 1,
+                        "price": 100.0,
+                    }
+                )
+
+    def export() -> tuple:
+        tracemalloc.start()
+        try:
+            exported = sum(len(chunk) for chunk in _export_chunks(export_bookings(), as_csv=False))
+            return exported, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    book(range(100))
+    small, small_peak = export()
+    book(range(100, 400))
+    large, large_peak = export()
+    # Four times the rows (about 8 MB of output) need no more memory: only
+    # one chunk and one expert's bookings are held at a time.
+    assert large > 4 * small * 0.99
+    assert large_peak < small_peak * 1.2
+    assert large_peak < large / 4
+
+
+def test_expert_availability_endpoint_lists_open_slots() -> None:
+    params = {
+        "concept_id": "gdp-measurement",
+        "start": "2024-05-06T00:00:00",
+        "end": "2024-05-13T00:00:00",
+        "duration_minutes": 60,
+    }
+    response = client.get("/experts/availability", params=params)
+    assert response.status_code == 200
+    (rivera,) = response.json()["experts"]
+    assert rivera["expert_id"] == "dr-rivera"
+    assert rivera["slots"] == [
+        {"start": "2024-05-07T13:00:00", "end": "2024-05-07T16:00:00"},
+        {"start": "2024-05-09T09:00:00", "end": "2024-05-09T11:30:00"},
+    ]
+
+    backwards = {**params, "end": "2024-05-01T00:00:00"}
+    assert client.get("/experts/availability", params=backwards).status_code == 400
+    unknown = {**params, "concept_id": "unknown"}
+    assert client.get("/experts/availability", params=unknown).status_code == 404
+    # One bound with an offset and one without are compared in UTC.
+    mixed = {**params, "start": "2024-05-06T00:00:00Z"}
+    assert client.get("/experts/availability", params=mixed).json() == response.json()
+
+
+def test_concepts_paginate_with_cursor() -> None:
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/concepts", params=params).json()
+        assert len(page["concepts"]) <= 3
+        seen.extend(concept["id"] for concept in page["concepts"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(data.CONCEPTS)
+
+    assert client.get("/concepts", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/concepts", params={"limit": 0}).status_code == 422
+
+
+def test_field_projection_trims_payload() -> None:
+    titles = client.get("/concepts", params={"fields": "title"}).json()["concepts"]
+    assert titles == [{"id": key, "title": value["title"]} for key, value in data.CONCEPTS.items()]
+
+    experts = client.get(
+        "/experts", params={"concept_id": "monetary-policy", "fields": "name,rate_per_hour", "limit": 1}
+    ).json()
+    assert experts["experts"] == [{"id": "prof-chan", "name": "Prof. Aaron Chan", "rate_per_hour": 500.0}]
+    rest = client.get(
+        "/experts",
+        params={"concept_id": "monetary-policy", "fields": "availability", "cursor": experts["next_cursor"]},
+    ).json()
+    assert [expert["id"] for expert in rest["experts"]] == ["dr-saito"]
+    assert rest["experts"][0]["availability"][0]["start"].count(":") == 2
+    assert rest["next_cursor"] is None
+
+    assert client.get("/experts", params={"fields": "salary"}).status_code == 400
+
+
+def test_metrics_endpoint_exposes_route_histograms() -> None:
+    client.get("/concepts/supply-demand")
+    client.get("/concepts/unknown")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/concepts/{concept_id}",le="+Inf"}' in body
+    assert 'http_responses_total{method="GET",route="/concepts/{concept_id}",status="404"}' in body
+    assert "# TYPE booking_stage_seconds summary" in body
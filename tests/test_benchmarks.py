@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+
+from app import services
+from benchmarks.load import DEFAULT_MIX, drive, percentile
+from benchmarks.run import compare, over_budget
+from benchmarks.synthetic import Scale, generate, installed
+
+
+def test_synthetic_marketplace_is_served_and_restored() -> None:
+    scale = Scale(concepts=5, modules_per_concept=2, experts=10, windows_per_expert=3, bookings=40)
+    market = generate(scale, seed=1)
+    assert len(market.MODULES) == 10
+    assert len(market.bookings) == 40
+
+    with installed(market):
+        assert len(services.list_concepts()) == 5
+        assert len(services.list_experts()) == 10
+        assert len(services.BOOKINGS) == 40
+        for record in market.bookings:
+            expert = services.EXPERT_DIRECTORY.get(record["expert_id"])
+            assert services._is_within_availability(expert, record["start"], record["end"])
+
+    assert services.get_concept("supply-demand") is not None
+    assert services.EXPERT_DIRECTORY.get("expert-0") is None
+
+
+def test_compare_flags_only_slowdowns_beyond_tolerance() -> None:
+    baseline = [
+        {"name": "list_concepts", "scale": "small", "median_us": 10.0},
+        {"name": "get_concept", "scale": "small", "median_us": 10.0},
+    ]
+    results = [
+        {"name": "list_concepts", "scale": "small", "median_us": 12.0},
+        {"name": "get_concept", "scale": "small", "median_us": 14.0},
+        {"name": "list_experts", "scale": "small", "median_us": 99.0},
+    ]
+    (regression,) = compare(results, baseline, tolerance=0.25)
+    assert regression.startswith("get_concept [small]")
+
+
+def test_over_budget_flags_only_budgeted_results() -> None:
+    results = [
+        {"name": "find_open_slots", "scale": "0k", "median_us": 90_000.0, "budget_us": 100_000.0},
+        {"name": "find_open_slots", "scale": "50k", "median_us": 210_000.0, "budget_us": 200_000.0},
+        {"name": "list_concepts", "scale": "small", "median_us": 1e9},
+    ]
+    (message,) = over_budget(results)
+    assert message.startswith("find_open_slots [50k]")
+
+
+def test_load_driver_reports_percentiles_per_route() -> None:
+    from app.api import app
+
+    scale = Scale(concepts=5, modules_per_concept=2, experts=10, windows_per_expert=3, bookings=20)
+    with installed(generate(scale)) as market:
+        report = asyncio.run(drive(app, market, DEFAULT_MIX, concurrency=8, total=300))
+
+    assert sum(stats["requests"] for stats in report["routes"].values()) == 300
+    for stats in report["routes"].values():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+    contended = report["routes"]["POST /bookings [contended]"]["statuses"]
+    assert contended.get("200", 0) <= 4
+
+
+def test_percentile_uses_nearest_rank() -> None:
+    samples = [float(value) for value in range(1, 101)]
+    assert percentile(samples, 0.5) == 50.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
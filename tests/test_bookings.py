@@ -0,0 +1,518 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Iterator
+
+import pytest
+
+from app import bookings, services, sqlite_store
+from app.bookings import BookingIndex, BookingRepository, BookingStoreUnavailable, ExpertSchedule
+from app.journal import JournaledBookingStore
+from app.schemas import BookingRequest
+from app.shared_store import SharedBookingStore
+from app.sqlite_store import SQLiteBookingRepository
+
+HOUR = timedelta(hours=1)
+WEEK = timedelta(weeks=1)
+BASE = datetime(2024, 5, 8, 15, 0)
+
+
+def _record(expert_id: str, start: datetime, hours: int = 1, booking_id: str | None = None) -> dict:
+    return {
+        "booking_id": booking_id,
+        "expert_id": expert_id,
+        "concept_id": "supply-demand",
+        "start": start,
+        "end": start + hours * HOUR,
+        "group_size": 1,
+        "price": 100.0,
+    }
+
+
+@pytest.fixture(params=["memory", "journal", "sqlite", "shared"])
+def store(request: pytest.FixtureRequest, tmp_path: Path) -> Iterator[BookingRepository]:
+    if request.param == "memory":
+        yield BookingIndex()
+        return
+    if request.param == "journal":
+        journaled = JournaledBookingStore(str(tmp_path / "journal"), durable=False)
+        yield journaled
+        journaled.close()
+        return
+    if request.param == "shared":
+        shared = SharedBookingStore(str(tmp_path / "shared"))
+        yield shared
+        shared.close()
+        return
+    repository = SQLiteBookingRepository(str(tmp_path / "bookings.db"), pool_size=2)
+    yield repository
+    repository.close()
+
+
+def test_reserve_rejects_overlaps(store: BookingRepository) -> None:
+    assert store.reserve(_record("prof-chan", BASE, hours=3))
+    assert not store.reserve(_record("prof-chan", BASE + 2 * HOUR))
+    assert store.reserve(_record("prof-chan", BASE + 3 * HOUR))
+    assert store.reserve(_record("dr-saito", BASE))
+    assert len(store) == 3
+    assert store.has_conflict("prof-chan", BASE + 2 * HOUR + timedelta(minutes=59), BASE + 4 * HOUR)
+    assert not store.has_conflict("prof-chan", BASE - HOUR, BASE)
+
+
+def test_overlapping_returns_range_in_start_order(store: BookingRepository) -> None:
+    for offset in (5, 0, 2, 8):
+        store.append(_record("prof-chan", BASE + offset * HOUR, booking_id=f"b{offset}"))
+    found = store.overlapping("prof-chan", BASE + HOUR + timedelta(minutes=30), BASE + 6 * HOUR)
+    assert [record["booking_id"] for record in found] == ["b2", "b5"]
+    assert [record["booking_id"] for record in store.for_expert("prof-chan")] == ["b0", "b2", "b5", "b8"]
+
+
+def test_reserve_many_atomic_rolls_back(store: BookingRepository) -> None:
+    batch = [_record("prof-chan", BASE), _record("prof-chan", BASE + timedelta(minutes=30))]
+    assert store.reserve_many(batch, atomic=True) == [True, False]
+    assert len(store) == 0
+    assert store.reserve_many(batch) == [True, False]
+    assert len(store) == 1
+
+
+def test_remove_and_replace_by_booking_id(store: BookingRepository) -> None:
+    assert store.reserve(_record("prof-chan", BASE, booking_id="a"))
+    assert store.reserve(_record("prof-chan", BASE + 2 * HOUR, booking_id="b"))
+
+    # A reschedule may overlap its own old slot but not another booking.
+    assert store.replace({**_record("prof-chan", BASE + HOUR / 2, booking_id="a"), "price": 80.0})
+    assert not store.replace(_record("prof-chan", BASE + 3 * HOUR / 2, booking_id="a"))
+    assert store.get("a")["start"] == BASE + HOUR / 2
+    assert store.get("a")["price"] == 80.0
+    assert store.has_conflict("prof-chan", BASE + HOUR, BASE + HOUR + HOUR / 4)
+    assert not store.has_conflict("prof-chan", BASE, BASE + HOUR / 2)
+
+    assert store.remove("b")["start"] == BASE + 2 * HOUR
+    assert store.remove("b") is None
+    assert store.get("b") is None
+    assert [record["booking_id"] for record in store.for_expert("prof-chan")] == ["a"]
+    assert store.reserve(_record("prof-chan", BASE + 2 * HOUR, booking_id="c"))
+    with pytest.raises(KeyError):
+        store.replace(_record("prof-chan", BASE + 5 * HOUR, booking_id="b"))
+
+
+def test_archive_finished_moves_past_sessions(store: BookingRepository) -> None:
+    store.append(_record("prof-chan", BASE - 30 * HOUR, hours=24, booking_id="long"))
+    for offset in (-3, -1, 0, 2):
+        store.append(_record("prof-chan", BASE + offset * HOUR, booking_id=f"b{offset}"))
+    store.append(_record("dr-saito", BASE - 2 * HOUR, booking_id="saito"))
+
+    archived: list = []
+    assert store.archive_finished(BASE + HOUR / 2, archived.extend) == 4
+    assert sorted(record["booking_id"] for record in archived) == ["b-1", "b-3", "long", "saito"]
+    assert [record["booking_id"] for record in store] == ["b0", "b2"]
+    assert store.get("b-1") is None
+    # Conflict checks still see the session in progress.
+    assert store.has_conflict("prof-chan", BASE + HOUR / 2, BASE + HOUR)
+    assert store.archive_finished(BASE + HOUR / 2, archived.extend) == 0
+
+
+def test_archive_shrinks_conflict_scan_window() -> None:
+    index = BookingIndex()
+    index.append(_record("prof-chan", BASE - 100 * HOUR, hours=72, booking_id="retreat"))
+    index.extend(_record("prof-chan", BASE + offset * HOUR, booking_id=f"b{offset}") for offset in range(48))
+    schedule = index._schedules["prof-chan"]
+    assert schedule._max_span == 72 * HOUR
+
+    index.archive_finished(BASE, lambda records: None)
+    assert schedule._max_span == HOUR
+    assert len(index) == 48 and len(index._by_id) == 48
+
+
+def _series(expert_id: str, start: datetime, weeks: int, booking_id: str, skipped: list | None = None) -> dict:
+    return {**_record(expert_id, start, booking_id=booking_id), "occurrences": weeks, "skipped": skipped or []}
+
+
+def test_weekly_series_is_one_booking_seen_by_every_check(store: BookingRepository) -> None:
+    assert store.reserve(_record("prof-chan", BASE + 2 * WEEK, booking_id="single"))
+    assert store.reserve_series(_series("prof-chan", BASE, 10, "clash")) == (False, [2])
+    assert len(store) == 1
+
+    stored, conflicts = store.reserve_series(_series("prof-chan", BASE, 10, "term", skipped=[5]), skip_conflicts=True)
+    assert (stored, conflicts) == (True, [2])
+    assert len(store) == 2
+    assert store.get("term")["skipped"] == [2, 5]
+
+    # Each remaining week blocks its slot; skipped weeks stay free.
+    assert not store.reserve(_record("prof-chan", BASE + 9 * WEEK + HOUR / 2))
+    assert store.has_conflict("prof-chan", BASE + WEEK, BASE + WEEK + HOUR)
+    assert not store.has_conflict("prof-chan", BASE + 10 * WEEK, BASE + 10 * WEEK + HOUR)
+    assert store.reserve(_record("prof-chan", BASE + 5 * WEEK, booking_id="holiday-cover"))
+    found = store.overlapping("prof-chan", BASE + WEEK, BASE + 5 * WEEK + HOUR)
+    assert [(record["booking_id"], record.get("week")) for record in found] == [
+        ("term", 1),
+        ("single", None),
+        ("term", 3),
+        ("term", 4),
+        ("holiday-cover", None),
+    ]
+    # A second series is checked against both the first and single bookings.
+    assert store.reserve_series(_series("prof-chan", BASE - 3 * WEEK, 6, "other"), skip_conflicts=True) == (
+        True,
+        [3, 4, 5],
+    )
+
+    archived: list = []
+    assert store.archive_finished(BASE + 4 * WEEK, archived.extend) == 2
+    assert sorted(record["booking_id"] for record in archived) == ["other", "single"]
+    assert store.remove("term")["occurrences"] == 10
+    assert not store.has_conflict("prof-chan", BASE + 9 * WEEK, BASE + 9 * WEEK + HOUR)
+
+
+def test_export_filters_through_the_index(store: BookingRepository) -> None:
+    store.extend(
+        [
+            _record("prof-chan", BASE + HOUR, booking_id="later"),
+            _record("prof-chan", BASE, booking_id="first"),
+            {**_record("dr-saito", BASE, booking_id="macro"), "concept_id": "monetary-policy"},
+        ]
+    )
+    assert store.reserve_series(_series("prof-chan", BASE - WEEK, 3, "weekly", skipped=[1]))
+
+    def exported(**filters: object) -> list:
+        return [(record["booking_id"], record.get("week")) for record in store.export(**filters)]
+
+    assert exported() == [
+        ("macro", None),
+        ("weekly", 0),
+        ("first", None),
+        ("later", None),
+        ("weekly", 2),
+    ]
+    assert exported(expert_id="prof-chan", start=BASE + HOUR / 2, end=BASE + 2 * WEEK) == [
+        ("first", None),
+        ("later", None),
+        ("weekly", 2),
+    ]
+    assert exported(start=BASE + HOUR) == [("later", None), ("weekly", 2)]
+    assert exported(end=BASE) == [("weekly", 0)]
+    assert exported(concept_id="monetary-policy") == [("macro", None)]
+    assert exported(expert_id="nobody") == []
+
+
+def test_export_walks_the_schedule_page_by_page(store: BookingRepository, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(bookings, "EXPORT_PAGE", 2)
+    monkeypatch.setattr(sqlite_store, "EXPORT_PAGE", 2)
+    store.extend(_record("prof-chan", BASE + hour * HOUR, booking_id=f"s{hour}") for hour in range(0, 14, 2))
+    assert store.reserve_series(_series("prof-chan", BASE + 3 * HOUR, 2, "weekly"))
+
+    def exported(**filters: object) -> list:
+        return [record["booking_id"] for record in store.export(**filters)]
+
+    assert exported(start=BASE + 5 * HOUR) == ["s6", "s8", "s10", "s12", "weekly"]
+    assert exported(end=BASE + 5 * HOUR) == ["s0", "s2", "weekly", "s4"]
+    assert exported(start=BASE + HOUR, end=BASE + 9 * HOUR) == ["s2", "weekly", "s4", "s6", "s8"]
+
+    # Locks and connections are released between pages, so bookings made meanwhile after
+    # the current position still show up.
+    rows = store.export(expert_id="prof-chan", end=BASE + WEEK)
+    assert [next(rows)["booking_id"] for _ in range(3)] == ["s0", "s2", "weekly"]
+    store.append(_record("prof-chan", BASE + 20 * HOUR, booking_id="late"))
+    assert [record["booking_id"] for record in rows] == ["s4", "s6", "s8", "s10", "s12", "late"]
+
+
+def test_sqlite_export_returns_its_connection_between_pages(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(sqlite_store, "EXPORT_PAGE", 2)
+    store = SQLiteBookingRepository(str(tmp_path / "bookings.db"), pool_size=1, timeout=0.1)
+    try:
+        store.extend(_record("prof-chan", BASE + hour * HOUR, booking_id=f"s{hour}") for hour in range(5))
+        rows = store.export()
+        assert next(rows)["booking_id"] == "s0"
+        # A download in progress leaves the only connection free for bookings.
+        assert store.reserve(_record("dr-saito", BASE, booking_id="other"))
+        assert [record["booking_id"] for record in rows] == ["s1", "s2", "s3", "s4"]
+
+        with store._connection():
+            with pytest.raises(BookingStoreUnavailable):
+                store.get("s0")
+    finally:
+        store.close()
+
+
+def test_sqlite_bookings_survive_restart(tmp_path: Path) -> None:
+    path = str(tmp_path / "bookings.db")
+    first = SQLiteBookingRepository(path)
+    assert first.reserve(_record("prof-chan", BASE, booking_id="kept"))
+    first.close()
+
+    reopened = SQLiteBookingRepository(path)
+    try:
+        assert [record["booking_id"] for record in reopened] == ["kept"]
+        assert reopened.for_expert("prof-chan")[0]["start"] == BASE
+        assert not reopened.reserve(_record("prof-chan", BASE + timedelta(minutes=15)))
+    finally:
+        reopened.close()
+
+
+def test_create_booking_uses_configured_store(tmp_path: Path) -> None:
+    repository = SQLiteBookingRepository(str(tmp_path / "bookings.db"))
+    previous = services.use_booking_store(repository)
+    try:
+        request = BookingRequest(
+            expert_id="prof-chan",
+            concept_id="supply-demand",
+            start_time=datetime.fromisoformat("2024-05-08T15:30:00"),
+            duration_minutes=60,
+            client_name="Durable Learner",
+        )
+        confirmation = services.create_booking(request)
+        assert confirmation is not None
+        assert services.create_booking(request) is None
+        assert [record["booking_id"] for record in repository] == [confirmation.booking_id]
+    finally:
+        services.use_booking_store(previous)
+        repository.close()
+
+
+def test_journal_recovers_bookings_after_restart(tmp_path: Path) -> None:
+    store = JournaledBookingStore(str(tmp_path), durable=False)
+    assert store.reserve(_record("prof-chan", BASE, booking_id="first"))
+    assert store.reserve(_record("dr-saito", BASE, booking_id="second"))
+    store.close()
+
+    recovered = JournaledBookingStore(str(tmp_path), durable=False)
+    assert sorted(record["booking_id"] for record in recovered) == ["first", "second"]
+    assert recovered.for_expert("prof-chan")[0]["start"] == BASE
+    assert not recovered.reserve(_record("prof-chan", BASE + timedelta(minutes=30)))
+    recovered.clear()
+    recovered.close()
+    assert len(JournaledBookingStore(str(tmp_path), durable=False)) == 0
+
+
+def test_journal_replays_cancellations_and_reschedules(tmp_path: Path) -> None:
+    store = JournaledBookingStore(str(tmp_path), durable=False)
+    for offset in range(4):
+        assert store.reserve(_record("prof-chan", BASE + offset * HOUR, booking_id=f"b{offset}"))
+    store.remove("b1")
+    assert store.replace(_record("prof-chan", BASE + 5 * HOUR, booking_id="b2"))
+    store.archive_finished(BASE + HOUR, lambda records: None)
+    store.close()
+
+    recovered = JournaledBookingStore(str(tmp_path), durable=False)
+    assert [(record["booking_id"], record["start"]) for record in recovered] == [
+        ("b3", BASE + 3 * HOUR),
+        ("b2", BASE + 5 * HOUR),
+    ]
+    assert recovered.get("b0") is None and recovered.get("b2")["start"] == BASE + 5 * HOUR
+    recovered.close()
+
+
+def test_journal_and_snapshots_keep_series_compact(tmp_path: Path) -> None:
+    store = JournaledBookingStore(str(tmp_path), snapshot_every=3, durable=False)
+    assert store.reserve_series(_series("prof-chan", BASE, 52, "year", skipped=[7]))[0]
+    for offset in range(3):
+        assert store.reserve(_record("dr-saito", BASE + offset * HOUR, booking_id=f"s{offset}"))
+    store.close()
+    assert (tmp_path / "snapshot.json").exists()
+
+    recovered = JournaledBookingStore(str(tmp_path), durable=False)
+    assert len(recovered) == 4
+    assert recovered.get("year")["skipped"] == [7]
+    assert recovered.has_conflict("prof-chan", BASE + 51 * WEEK, BASE + 51 * WEEK + HOUR)
+    assert not recovered.has_conflict("prof-chan", BASE + 7 * WEEK, BASE + 7 * WEEK + HOUR)
+    recovered.close()
+
+
+def test_journal_drops_torn_last_record(tmp_path: Path) -> None:
+    store = JournaledBookingStore(str(tmp_path), durable=False)
+    assert store.reserve(_record("prof-chan", BASE, booking_id="kept"))
+    assert store.reserve(_record("prof-chan", BASE + HOUR, booking_id="torn"))
+    store.close()
+
+    (segment,) = tmp_path.glob("journal-*.log")
+    data = segment.read_bytes()
+    segment.write_bytes(data[:-7])
+
+    recovered = JournaledBookingStore(str(tmp_path), durable=False)
+    assert [record["booking_id"] for record in recovered] == ["kept"]
+    assert recovered.reserve(_record("prof-chan", BASE + HOUR, booking_id="retried"))
+    recovered.close()
+    again = JournaledBookingStore(str(tmp_path), durable=False)
+    assert [record["booking_id"] for record in again] == ["kept", "retried"]
+
+
+def test_journal_snapshots_bound_replay(tmp_path: Path) -> None:
+    store = JournaledBookingStore(str(tmp_path), snapshot_every=10, durable=False)
+    for offset in range(25):
+        assert store.reserve(_record("prof-chan", BASE + offset * HOUR, booking_id=f"b{offset}"))
+    store.close()
+
+    assert (tmp_path / "snapshot.json").exists()
+    recovered = JournaledBookingStore(str(tmp_path), snapshot_every=10, durable=False)
+    assert recovered.journal.since_snapshot < 10
+    assert len(recovered) == 25
+    assert len(list(tmp_path.glob("journal-*.log"))) <= 2
+
+
+def test_journal_write_failure_rolls_back_and_stops(tmp_path: Path) -> None:
+    store = JournaledBookingStore(str(tmp_path), durable=False)
+    assert store.reserve(_record("prof-chan", BASE, booking_id="a"))
+
+    class BrokenFile:
+        def write(self, data: bytes) -> None:
+            raise OSError("disk full")
+
+    healthy, store.journal._file = store.journal._file, BrokenFile()
+    with pytest.raises(BookingStoreUnavailable):
+        store.reserve(_record("prof-chan", BASE + HOUR, booking_id="b"))
+    assert store.get("b") is None
+    assert not store.has_conflict("prof-chan", BASE + HOUR, BASE + 2 * HOUR)
+    # The journal stays stopped, and each refused change is undone.
+    with pytest.raises(BookingStoreUnavailable):
+        store.replace(_record("prof-chan", BASE + 3 * HOUR, booking_id="a"))
+    with pytest.raises(BookingStoreUnavailable):
+        store.remove("a")
+    with pytest.raises(BookingStoreUnavailable):
+        store.clear()
+    assert [record["start"] for record in store] == [BASE]
+
+    healthy.close()
+    recovered = JournaledBookingStore(str(tmp_path), durable=False)
+    assert [record["booking_id"] for record in recovered] == ["a"]
+
+
+def test_journal_group_commit_under_concurrency(tmp_path: Path) -> None:
+    store = JournaledBookingStore(str(tmp_path), group_size=16, group_delay=0.001, snapshot_every=50)
+
+    def book(offset: int) -> bool:
+        return store.reserve(_record(f"expert-{offset % 4}", BASE + (offset // 4) * HOUR))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(book, range(200)))
+    store.close()
+    assert len(JournaledBookingStore(str(tmp_path))) == 200
+
+
+def _book_in_worker(directory: str, expert_id: str, slots: int, delay: float) -> int:
+    """Reserve ``slots`` hourly sessions from a separate process; returns successes."""
+    if delay:
+        overlaps = ExpertSchedule.overlaps
+
+        def slow_overlaps(schedule: ExpertSchedule, start: datetime, end: datetime) -> bool:
+            sleep(delay)  # stands in for real work inside the critical section
+            return overlaps(schedule, start, end)
+
+        ExpertSchedule.overlaps = slow_overlaps  # type: ignore[method-assign]
+    store = SharedBookingStore(directory)
+    booked = sum(store.reserve(_record(expert_id, BASE + slot * HOUR)) for slot in range(slots))
+    store.close()
+    return booked
+
+
+def _run_workers(directory: str, expert_ids: list, slots: int, delay: float = 0.0) -> list:
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(len(expert_ids), mp_context=context) as pool:
+        futures = [pool.submit(_book_in_worker, directory, expert_id, slots, delay) for expert_id in expert_ids]
+        return [future.result() for future in futures]
+
+
+def test_shared_store_never_double_books_across_processes(tmp_path: Path) -> None:
+    directory = str(tmp_path / "shared")
+    results = _run_workers(directory, ["prof-chan"] * 4, slots=25)
+
+    assert sum(results) == 25
+    records = SharedBookingStore(directory).for_expert("prof-chan")
+    assert len(records) == 25
+    for earlier, later in zip(records, records[1:]):
+        assert earlier["end"] <= later["start"]
+
+
+def test_shared_store_throughput_scales_with_workers(tmp_path: Path) -> None:
+    slots, delay = 30, 0.004
+
+    started = perf_counter()
+    _run_workers(str(tmp_path / "one"), ["expert-0"], slots=4 * slots, delay=delay)
+    single = perf_counter() - started
+
+    started = perf_counter()
+    results = _run_workers(str(tmp_path / "four"), [f"expert-{i}" for i in range(4)], slots=slots, delay=delay)
+    parallel = perf_counter() - started
+
+    assert results == [slots] * 4
+    # Four workers on different experts never share a file lock, so the same
+    # total work finishes in well under the single-worker time.
+    assert parallel < single * 0.6
+
+
+def test_shared_stores_see_each_others_changes(tmp_path: Path) -> None:
+    first = SharedBookingStore(str(tmp_path))
+    second = SharedBookingStore(str(tmp_path))
+
+    assert first.reserve(_record("prof-chan", BASE))
+    assert not second.reserve(_record("prof-chan", BASE + HOUR / 2))
+    assert len(second) == 1
+
+    second.clear()
+    assert first.for_expert("prof-chan") == []
+    assert first.reserve(_record("prof-chan", BASE + HOUR / 2))
+    assert [record["start"] for record in second] == [BASE + HOUR / 2]
+
+
+def test_shared_stores_see_each_others_cancellations(tmp_path: Path) -> None:
+    first = SharedBookingStore(str(tmp_path))
+    second = SharedBookingStore(str(tmp_path))
+
+    assert first.reserve(_record("prof-chan", BASE, booking_id="a"))
+    # The second store has never loaded prof-chan, yet finds the booking by id.
+    assert second.replace(_record("prof-chan", BASE + HOUR, booking_id="a"))
+    assert first.get("a")["start"] == BASE + HOUR
+    assert first.reserve(_record("prof-chan", BASE, booking_id="b"))
+    assert second.remove("a") is not None
+    assert first.get("a") is None
+    assert [record["booking_id"] for record in first.for_expert("prof-chan")] == ["b"]
+
+
+def test_shared_store_finds_bookings_by_id_through_one_file(tmp_path: Path, monkeypatch) -> None:
+    first = SharedBookingStore(str(tmp_path))
+    for number in range(50):
+        assert first.reserve(_record(f"expert-{number}", BASE, booking_id=str(number)))
+    second = SharedBookingStore(str(tmp_path))
+    opened = []
+    original = SharedBookingStore._open
+
+    def tracking_open(self, expert_id, create):
+        opened.append(expert_id)
+        return original(self, expert_id, create)
+
+    monkeypatch.setattr(SharedBookingStore, "_open", tracking_open)
+
+    assert second.get("missing") is None
+    assert second.get("7")["expert_id"] == "expert-7"
+    assert opened == ["expert-7"]
+
+    # A directory written before the index existed gets one on first open.
+    os.remove(tmp_path / "booking-ids.idx")
+    assert SharedBookingStore(str(tmp_path)).get("31")["expert_id"] == "expert-31"
+
+
+def test_shared_store_holds_descriptors_only_while_locked(tmp_path: Path) -> None:
+    store = SharedBookingStore(str(tmp_path))
+    open_before = len(os.listdir("/proc/self/fd"))
+
+    # Reads for unknown experts create nothing.
+    for number in range(2_000):
+        assert not store.has_conflict(f"stranger-{number}", BASE, BASE + HOUR)
+        assert list(store.export(expert_id=f"stranger-{number}")) == []
+    assert os.listdir(tmp_path) == ["booking-ids.idx"]
+    assert store.get("missing") is None
+
+    # More experts than the usual 1024 descriptor limit stay bookable.
+    for number in range(1_500):
+        assert store.reserve(_record(f"expert-{number}", BASE, booking_id=str(number)))
+    assert store.has_conflict("expert-1499", BASE, BASE + HOUR)
+    other = SharedBookingStore(str(tmp_path))
+    assert other.get("42")["expert_id"] == "expert-42"
+    other.close()
+    store.clear()
+    assert len(store) == 0
+    assert len(os.listdir("/proc/self/fd")) == open_before
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import calendar_feed, data
+from app.api import app
+from app.bookings import BookingIndex, BookingRepository
+from app.calendar_feed import CalendarFeeds, _line
+from app.schemas import trusted_expert
+from app.services import BOOKINGS, EXPERT_DIRECTORY
+from app.sqlite_store import SQLiteBookingRepository
+
+HOUR = timedelta(hours=1)
+BASE = datetime(2024, 5, 8, 15)
+
+
+def setup_function() -> None:
+    BOOKINGS.clear()
+
+
+def _record(expert_id: str, start: datetime, booking_id: str) -> Dict:
+    return {
+        "booking_id": booking_id,
+        "expert_id": expert_id,
+        "concept_id": "supply-demand",
+        "start": start,
+        "end": start + HOUR,
+        "group_size": 2,
+        "price": 450.0,
+    }
+
+
+class _CountingIndex(BookingIndex):
+    def __init__(self) -> None:
+        super().__init__()
+        self.reads: List[str] = []
+
+    def for_expert(self, expert_id: str) -> List[Dict]:
+        self.reads.append(expert_id)
+        return super().for_expert(expert_id)
+
+
+def test_calendar_endpoint_supports_conditional_get() -> None:
+    client = TestClient(app)
+    booking = {
+        "expert_id": "prof-chan",
+        "concept_id": "supply-demand",
+        "start_time": "2024-05-08T15:00:00",
+        "duration_minutes": 60,
+        "client_name": "Subscribed Learner",
+    }
+    first = client.get("/experts/prof-chan/calendar.ics")
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "text/calendar; charset=utf-8"
+    assert first.text.startswith("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+    assert first.text.count("RRULE:FREQ=WEEKLY\r\n") == 2  # availability windows
+    etag = first.headers["etag"]
+    assert client.get("/experts/prof-chan/calendar.ics", headers={"If-None-Match": etag}).status_code == 304
+
+    confirmation = client.post("/bookings", json=booking).json()["confirmation"]
+    booked = client.get("/experts/prof-chan/calendar.ics", headers={"If-None-Match": etag})
+    assert booked.status_code == 200
+    assert f"UID:{confirmation['booking_id']}@economics-learning\r\n" in booked.text
+    assert "DTSTART:20240508T150000Z\r\nDTEND:20240508T160000Z\r\n" in booked.text
+    assert "SUMMARY:Supply and Demand session\r\n" in booked.text
+
+    client.delete(f"/bookings/{confirmation['booking_id']}")
+    cancelled = client.get("/experts/prof-chan/calendar.ics")
+    assert cancelled.headers["etag"] == etag
+    assert client.get("/experts/nobody/calendar.ics").status_code == 404
+
+
+def test_changes_rebuild_only_the_affected_feed(monkeypatch: pytest.MonkeyPatch) -> None:
+    bookings = _CountingIndex()
+    feeds = CalendarFeeds(bookings, EXPERT_DIRECTORY, lambda concept_id: None)
+    rendered: List[str] = []
+    render = calendar_feed.render_booking
+
+    def counting_render(record: Dict, title: object) -> str:
+        rendered.append(record["booking_id"])
+        return render(record, title)
+
+    monkeypatch.setattr(calendar_feed, "render_booking", counting_render)
+    bookings.extend(_record("prof-chan", BASE + day * 24 * HOUR, f"chan-{day}") for day in range(5))
+    bookings.append(_record("dr-saito", BASE, "saito-0"))
+
+    chan = feeds.get("prof-chan")
+    saito = feeds.get("dr-saito")
+    assert len(rendered) == 6
+    assert feeds.get("prof-chan") is chan
+    assert bookings.reads == ["prof-chan", "dr-saito"]
+
+    # A new booking re-renders just that event, and only its expert's feed.
+    bookings.append(_record("prof-chan", BASE + 10 * 24 * HOUR, "chan-10"))
+    assert feeds.get("dr-saito") is saito
+    updated = feeds.get("prof-chan")
+    assert updated.etag != chan.etag
+    assert rendered[6:] == ["chan-10"]
+    assert bookings.reads == ["prof-chan", "dr-saito", "prof-chan"]
+
+    bookings.replace(_record("prof-chan", BASE + HOUR, "chan-0"))
+    assert b"DTSTART:20240508T160000Z" in feeds.get("prof-chan").body
+    assert rendered[7:] == ["chan-0"]
+    bookings.remove("chan-10")
+    assert b"chan-10" not in feeds.get("prof-chan").body
+    assert len(rendered) == 8
+
+
+def test_feeds_are_rechecked_after_max_age() -> None:
+    now = [0.0]
+    bookings = _CountingIndex()
+    feeds = CalendarFeeds(bookings, EXPERT_DIRECTORY, lambda concept_id: None, max_age=60, clock=lambda: now[0])
+    first = feeds.get("prof-chan")
+    now[0] = 59
+    assert feeds.get("prof-chan") is first
+    now[0] = 61
+    # Re-read from the store (another worker may have booked), same ETag.
+    assert feeds.get("prof-chan").etag == first.etag
+    assert bookings.reads == ["prof-chan", "prof-chan"]
+
+
+def test_series_render_as_one_recurring_event() -> None:
+    bookings = BookingIndex()
+    feeds = CalendarFeeds(bookings, EXPERT_DIRECTORY, lambda concept_id: "Supply, Demand; and Prices")
+    assert bookings.reserve_series({**_record("prof-chan", BASE, "term"), "occurrences": 4, "skipped": [2]})
+    body = feeds.get("prof-chan").body.decode()
+    assert "RRULE:FREQ=WEEKLY;COUNT=4\r\nEXDATE:20240522T150000Z\r\n" in body
+    assert "SUMMARY:Supply\\, Demand\\; and Prices session\r\n" in body
+    assert "DESCRIPTION:Group size: 2\\nPrice: 450.00\r\n" in body
+
+
+def test_long_lines_are_folded_at_75_octets() -> None:
+    folded = _line("SUMMARY", "é" * 60)
+    lines = folded[:-2].split("\r\n")
+    assert len(lines) == 2
+    assert all(len(line.encode()) <= 75 for line in lines)
+    assert lines[1].startswith(" ")
+    assert "".join(line[1:] if number else line for number, line in enumerate(lines)) == "SUMMARY:" + "é" * 60
+
+
+def test_availability_runs_past_midnight_and_skips_unknown_days() -> None:
+    windows = [
+        {"weekday": "friday", "start": time(22), "end": time(2)},
+        {"weekday": "monday", "start": time(9), "end": time(9)},
+        {"weekday": "tues", "start": time(9), "end": time(10)},
+    ]
+    expert = trusted_expert({**data.EXPERTS["prof-chan"], "availability": windows})
+    body = calendar_feed.render_availability(expert)
+    assert "DTSTART:20240105T220000\r\nDTEND:20240106T020000\r\n" in body
+    assert body.count("BEGIN:VEVENT") == 1
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_stores_report_changes_per_expert(kind: str, tmp_path: Path) -> None:
+    store: BookingRepository = (
+        BookingIndex() if kind == "memory" else SQLiteBookingRepository(str(tmp_path / "bookings.db"), pool_size=1)
+    )
+    changes: List[object] = []
+    store.subscribe(changes.append)
+    assert store.reserve(_record("prof-chan", BASE, "a"))
+    assert not store.reserve(_record("prof-chan", BASE, "b"))
+    store.reserve_many([_record("dr-saito", BASE, "c")])
+    store.remove("a")
+    store.archive_finished(BASE + 2 * HOUR, lambda records: None)
+    store.clear()
+    assert changes == ["prof-chan", "dr-saito", "prof-chan", "dr-saito", None]
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import IDEMPOTENCY, app
+from app.idempotency import IdempotencyCache, IdempotencyKeyReused
+from app.services import BOOKINGS
+
+BOOKING = {
+    "expert_id": "prof-chan",
+    "concept_id": "supply-demand",
+    "start_time": "2024-05-08T15:00:00",
+    "duration_minutes": 60,
+    "client_name": "Retrying Learner",
+}
+
+
+def setup_function() -> None:
+    BOOKINGS.clear()
+    IDEMPOTENCY.clear()
+
+
+def test_retry_with_same_key_replays_the_booking() -> None:
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "retry-1"}
+    first = client.post("/bookings", json=BOOKING, headers=headers)
+    assert first.status_code == 200
+    assert "idempotent-replayed" not in first.headers
+
+    retry = client.post("/bookings", json=BOOKING, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert len(BOOKINGS) == 1
+
+    # Without a key the same body is a new attempt, which now conflicts.
+    assert client.post("/bookings", json=BOOKING).status_code == 400
+    reused = client.post("/bookings", json={**BOOKING, "duration_minutes": 30}, headers=headers)
+    assert reused.status_code == 422
+
+
+def test_failures_are_not_stored() -> None:
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "retry-2"}
+    BOOKINGS.append(
+        {"expert_id": "prof-chan", "start": datetime(2024, 5, 8, 15), "end": datetime(2024, 5, 8, 16)}
+    )
+    assert client.post("/bookings", json=BOOKING, headers=headers).status_code == 400
+    BOOKINGS.clear()
+    assert client.post("/bookings", json=BOOKING, headers=headers).status_code == 200
+
+
+def test_concurrent_requests_with_one_key_book_once() -> None:
+    client = TestClient(app)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(
+            pool.map(
+                lambda _: client.post("/bookings", json=BOOKING, headers={"Idempotency-Key": "storm"}),
+                range(8),
+            )
+        )
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.json()["confirmation"]["booking_id"] for response in responses}) == 1
+    assert len(BOOKINGS) == 1
+
+
+def test_in_flight_callers_wait_for_the_first() -> None:
+    cache = IdempotencyCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute() -> str:
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "confirmation"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(cache.run, "key", "body", compute)
+        started.wait()
+        followers = [pool.submit(cache.run, "key", "body", compute) for _ in range(3)]
+        with pytest.raises(IdempotencyKeyReused):
+            cache.run("key", "other body", compute)
+        release.set()
+        assert leader.result() == ("confirmation", False)
+        assert [follower.result() for follower in followers] == [("confirmation", True)] * 3
+    assert len(calls) == 1
+
+
+def test_in_flight_failure_reaches_waiters_without_being_stored() -> None:
+    cache = IdempotencyCache()
+    started, release = threading.Event(), threading.Event()
+
+    def fail() -> str:
+        started.set()
+        release.wait()
+        raise RuntimeError("store unavailable")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(cache.run, "key", "body", fail)
+        started.wait()
+        follower = pool.submit(cache.run, "key", "body", fail)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+    assert len(cache) == 0
+    assert cache.run("key", "body", lambda: "booked") == ("booked", False)
+
+
+def test_entries_expire_and_stay_bounded() -> None:
+    now = [0.0]
+    cache = IdempotencyCache(max_entries=3, ttl=60, clock=lambda: now[0])
+    for number in range(5):
+        now[0] += 1
+        cache.run(f"key-{number}", "body", lambda number=number: number)
+    assert len(cache) == 3
+    assert cache.run("key-0", "body", lambda: "again") == ("again", False)  # evicted
+    assert cache.run("key-4", "body", lambda: "again") == (4, True)
+
+    now[0] += 60
+    assert cache.run("key-4", "body", lambda: "expired") == ("expired", False)
+    assert len(cache) == 1
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, time, timedelta
+from time import perf_counter
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.api import app
+from app.availability import WEEKDAYS
+from app.bookings import BookingIndex
+from app.catalog_store import FixtureCatalogSource
+from app.experts import ExpertDirectory
+from app.matching import ExpertMatcher
+from app.pricing import PricingEngine
+from app.services import BOOKINGS
+
+# 2024-05-06 is a Monday.
+WEEK_START = datetime(2024, 5, 6)
+WEEK_END = WEEK_START + timedelta(weeks=1)
+
+
+def setup_function() -> None:
+    BOOKINGS.clear()
+
+
+def _directory(experts: int, concepts: int, seed: int) -> ExpertDirectory:
+    rng = random.Random(seed)
+    records = {}
+    for number in range(experts):
+        windows = []
+        for weekday in rng.sample(WEEKDAYS, rng.randrange(1, 5)):
+            start_hour = rng.randrange(7, 15)
+            windows.append({"weekday": weekday, "start": time(start_hour), "end": time(start_hour + rng.randrange(1, 6))})
+        records[f"expert-{number}"] = {
+            "id": f"expert-{number}",
+            "name": f"Expert {number}",
+            "credentials": "Synthetic",
+            "focus_areas": rng.sample([f"concept-{c}" for c in range(concepts)], rng.randrange(1, 4)),
+            "rate_per_hour": float(rng.randrange(100, 800, 10)),
+            "group_discount": round(rng.uniform(0.7, 1.0), 2),
+            "availability": windows,
+        }
+    source = FixtureCatalogSource(SimpleNamespace(CONCEPTS={}, MODULES={}, EXPERTS=records))
+    return ExpertDirectory(source)
+
+
+def _book_randomly(directory: ExpertDirectory, bookings: BookingIndex, seed: int) -> None:
+    rng = random.Random(seed)
+    for expert in directory.experts():
+        for window in expert.availability:
+            if rng.random() < 0.5:
+                day = WEEK_START + timedelta(days=WEEKDAYS.index(window.weekday))
+                start = datetime.combine(day.date(), window.start)
+                bookings.append({"expert_id": expert.id, "start": start, "end": start + timedelta(hours=1)})
+
+
+def test_match_endpoint_ranks_fixture_experts() -> None:
+    client = TestClient(app)
+    params = {
+        "concepts": "monetary-policy,supply-demand",
+        "start": WEEK_START.isoformat(),
+        "end": WEEK_END.isoformat(),
+        "group_size": 3,
+    }
+    matches = client.get("/experts/match", params=params).json()["matches"]
+    assert [(match["expert"]["id"], match["coverage"], match["price"]) for match in matches] == [
+        ("prof-chan", 1.0, 450.0),
+        ("dr-saito", 0.5, 576.0),
+    ]
+    assert matches[0]["open_minutes"] == 390
+
+    booking = {
+        "expert_id": "prof-chan",
+        "concept_id": "supply-demand",
+        "start_time": "2024-05-08T15:00:00",
+        "duration_minutes": 120,
+        "client_name": "Busy Learner",
+    }
+    assert client.post("/bookings", json=booking).status_code == 200
+    (chan,) = client.get("/experts/match", params={**params, "k": 1}).json()["matches"]
+    assert chan["open_minutes"] == 270
+
+    assert client.get("/experts/match", params={**params, "concepts": "unknown"}).status_code == 404
+    assert client.get("/experts/match", params={**params, "end": params["start"]}).status_code == 400
+    mixed = {**params, "start": params["start"] + "Z", "k": 1}
+    assert client.get("/experts/match", params=mixed).json()["matches"] == [chan]
+    assert client.get("/experts/match", params={**params, "k": 0}).status_code == 422
+
+
+def test_match_prices_follow_the_pricing_rules() -> None:
+    directory = _directory(experts=3, concepts=3, seed=3)
+    pricing = PricingEngine.from_dict(
+        {
+            "default": {"group_tiers": [{"min_size": 2, "multiplier": 0.9}, {"min_size": 5, "multiplier": 0.6}]},
+            "experts": {"expert-1": {"rate_per_hour": 50.0}},
+        }
+    )
+    matcher = ExpertMatcher(directory, pricing)
+    concepts = ["concept-0", "concept-1", "concept-2"]
+
+    for group_size in (1, 3, 6):
+        matches = matcher.match(concepts, WEEK_START, WEEK_END, BookingIndex().overlapping, group_size, k=3)
+        assert {match.expert.id: match.price for match in matches} == {
+            expert.id: pricing.quote(expert, 60, group_size) for expert in directory.experts()
+        }
+    assert {match.expert.id: match.price for match in matches}["expert-1"] == 30.0
+
+
+def test_threshold_top_k_matches_exhaustive_ranking() -> None:
+    directory = _directory(experts=600, concepts=8, seed=5)
+    bookings = BookingIndex()
+    _book_randomly(directory, bookings, seed=6)
+    matcher = ExpertMatcher(directory)
+
+    everyone = matcher.match(["concept-1", "concept-2"], WEEK_START, WEEK_END, bookings.overlapping, k=10_000)
+    for k in (1, 5, 40):
+        for group_size in (1, 4):
+            top = matcher.match(
+                ["concept-1", "concept-2"], WEEK_START, WEEK_END, bookings.overlapping, group_size, k=k
+            )
+            exhaustive = matcher.match(
+                ["concept-1", "concept-2"], WEEK_START, WEEK_END, bookings.overlapping, group_size, k=10_000
+            )
+            assert top == exhaustive[:k]
+    assert [match.score for match in everyone] == sorted((match.score for match in everyone), reverse=True)
+    assert {match.coverage for match in everyone} == {0.5, 1.0}
+
+    # The directory changing is picked up without rebuilding the matcher.
+    directory.remove(everyone[0].expert.id)
+    assert matcher.match(["concept-1", "concept-2"], WEEK_START, WEEK_END, bookings.overlapping, k=1)[0] == everyone[1]
+
+
+def test_match_reads_bookings_for_few_candidates_at_scale() -> None:
+    directory = _directory(experts=20_000, concepts=4, seed=9)
+    bookings = BookingIndex()
+    _book_randomly(directory, bookings, seed=10)
+    matcher = ExpertMatcher(directory)
+    reads = []
+
+    def busy(expert_id: str, start: datetime, end: datetime) -> list:
+        reads.append(expert_id)
+        return bookings.overlapping(expert_id, start, end)
+
+    timings = []
+    for _ in range(5):
+        reads.clear()
+        started = perf_counter()
+        matches = matcher.match(["concept-0", "concept-3"], WEEK_START, WEEK_END, busy, k=10)
+        timings.append(perf_counter() - started)
+    assert len(matches) == 10
+    # ~8000 experts cover the concepts, but only candidates whose bound could
+    # still make the top 10 have their bookings read.
+    assert len(reads) < 200
+    assert sorted(timings)[2] < 0.25
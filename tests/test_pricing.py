@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import data
+from app.api import app
+from app.pricing import InvalidPricingRules, PricingEngine
+from app.schemas import Expert, trusted_expert
+from app.services import BOOKINGS
+
+EXPERTS = [trusted_expert(record) for record in data.EXPERTS.values()]
+# 2024-05-06 is a Monday.
+MONDAY = datetime(2024, 5, 6)
+
+
+def setup_function() -> None:
+    BOOKINGS.clear()
+
+
+def _flat_price(expert: Expert, duration_minutes: int, group_size: int) -> float:
+    base = expert.rate_per_hour * (duration_minutes / 60)
+    if group_size > 1:
+        return round(base * expert.group_discount, 2)
+    return round(base, 2)
+
+
+def test_default_rules_reproduce_flat_pricing() -> None:
+    engine = PricingEngine()
+    rng = random.Random(3)
+    for _ in range(2_000):
+        expert = rng.choice(EXPERTS)
+        duration = rng.randrange(1, 600)
+        group_size = rng.randrange(1, 12)
+        start = MONDAY + timedelta(minutes=rng.randrange(10_080))
+        assert engine.quote(expert, duration, group_size, start) == _flat_price(expert, duration, group_size)
+
+
+def test_tiers_peaks_and_overrides() -> None:
+    engine = PricingEngine.from_dict(
+        {
+            "default": {
+                "group_tiers": [{"min_size": 5, "multiplier": 0.7}, {"min_size": 2, "multiplier": 0.9}],
+                "peak_windows": [
+                    {"weekdays": ["monday"], "start": "17:00", "end": "19:00", "multiplier": 1.5},
+                    {"weekdays": ["sunday"], "start": "23:00", "end": "01:00", "multiplier": 2.0},
+                ],
+            },
+            "experts": {"prof-chan": {"rate_per_hour": 100.0}},
+        }
+    )
+    chan = next(expert for expert in EXPERTS if expert.id == "prof-chan")
+
+    assert engine.quote(chan, 60, 1, MONDAY.replace(hour=9)) == 100.0
+    assert engine.quote(chan, 60, 3, MONDAY.replace(hour=9)) == 90.0
+    assert engine.quote(chan, 60, 8, MONDAY.replace(hour=9)) == 70.0
+    assert engine.quote(chan, 60, 1, MONDAY.replace(hour=17)) == 150.0
+    # Half peak, half off-peak.
+    assert engine.quote(chan, 60, 1, MONDAY.replace(hour=18, minute=30)) == 125.0
+    # The Sunday window wraps past midnight into Monday, across the week boundary.
+    assert engine.quote(chan, 120, 1, MONDAY - timedelta(hours=1)) == 400.0
+    # Experts without an override keep their own rate but share the default rules.
+    other = next(expert for expert in EXPERTS if expert.id != "prof-chan")
+    assert engine.quote(other, 60, 3, MONDAY.replace(hour=9)) == round(other.rate_per_hour * 0.9, 2)
+
+
+@pytest.mark.parametrize(
+    "window",
+    [
+        {"weekdays": ["mon"], "start": "17:00", "end": "19:00", "multiplier": 1.5},
+        {"weekdays": ["monday"], "start": "5pm", "end": "19:00", "multiplier": 1.5},
+        {"weekdays": ["monday"], "start": "17:00", "multiplier": 1.5},
+    ],
+)
+def test_malformed_rules_fail_when_loaded(window: dict, tmp_path: Path) -> None:
+    config = {"experts": {"prof-chan": {"peak_windows": [window]}}}
+    with pytest.raises(InvalidPricingRules):
+        PricingEngine.from_dict(config)
+    path = tmp_path / "pricing.json"
+    path.write_text(json.dumps(config))
+    with pytest.raises(InvalidPricingRules):
+        PricingEngine.from_file(str(path))
+    path.write_text("{not json")
+    with pytest.raises(InvalidPricingRules):
+        PricingEngine.from_file(str(path))
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"default": []},
+        {"experts": ["prof-chan"]},
+        {"experts": {"prof-chan": [{"rate_per_hour": 40}]}},
+        {"experts": {"prof-chan": None}},
+    ],
+)
+def test_sections_that_are_not_objects_are_rejected(config: dict) -> None:
+    with pytest.raises(InvalidPricingRules):
+        PricingEngine.from_dict(config)
+
+
+def test_quote_many_matches_scalar_quotes() -> None:
+    engine = PricingEngine.from_dict(
+        {"default": {"peak_windows": [{"weekdays": ["friday"], "start": "12:00", "end": "14:30", "multiplier": 1.2}]}}
+    )
+    rng = random.Random(11)
+    experts = [rng.choice(EXPERTS) for _ in range(500)]
+    durations = [rng.randrange(15, 240) for _ in experts]
+    sizes = [rng.randrange(1, 6) for _ in experts]
+    starts = [MONDAY + timedelta(minutes=rng.randrange(10_080)) for _ in experts]
+
+    assert engine.quote_many(experts, durations, sizes, starts) == [
+        engine.quote(*args) for args in zip(experts, durations, sizes, starts)
+    ]
+
+
+def test_quotes_endpoint_prices_batches_like_bookings() -> None:
+    client = TestClient(app)
+    start = "2024-05-08T15:00:00"
+    response = client.post(
+        "/quotes",
+        json={
+            "quotes": [
+                {"expert_id": "prof-chan", "duration_minutes": 60, "start_time": start},
+                {"expert_id": "prof-chan", "duration_minutes": 90, "group_size": 4},
+                {"expert_id": "nobody", "duration_minutes": 60},
+                {"expert_id": "prof-chan", "duration_minutes": 0},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    quotes = response.json()["quotes"]
+    chan = next(expert for expert in EXPERTS if expert.id == "prof-chan")
+    assert [quote["price"] for quote in quotes[:2]] == [_flat_price(chan, 60, 1), _flat_price(chan, 90, 4)]
+    assert [quote["error"] for quote in quotes] == [None, None, "unknown_expert", "invalid_session"]
+
+    booking = client.post(
+        "/bookings",
+        json={
+            "expert_id": "prof-chan",
+            "concept_id": "supply-demand",
+            "start_time": start,
+            "duration_minutes": 60,
+            "client_name": "Quote Shopper",
+        },
+    )
+    assert booking.json()["confirmation"]["price"] == quotes[0]["price"]
+    assert client.post("/quotes", json={"quotes": []}).status_code == 422
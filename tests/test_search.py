@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import statistics
+from time import perf_counter
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import data
+from app.api import app
+from app.search import SearchDocument, SearchIndex
+from app.services import SEARCH_INDEX, reload_catalog, search_catalog
+
+
+def test_ranks_concepts_and_modules_by_bm25() -> None:
+    hits = search_catalog("externalities")
+    assert {hit.id for hit in hits} == {"market-failure-lab", "market-failures"}
+    assert all(hit.score > 0 for hit in hits)
+
+    # Resource titles are indexed with their module.
+    assert search_catalog("fomc")[0].id == "monetary-policy-tools"
+    assert search_catalog("the and of") == []
+
+
+def test_prefix_matching_for_typeahead() -> None:
+    assert search_catalog("mon")[:1] == []
+    completions = search_catalog("mon", prefix=True)
+    assert completions[0].concept_id == "monetary-policy"
+    assert {hit.id for hit in search_catalog("gdp dash", prefix=True)[:1]} == {"gdp-accounting"}
+
+
+def test_update_reindexes_only_changed_documents() -> None:
+    index = SearchIndex()
+    documents = [
+        SearchDocument("concept", "a", "a", "Price elasticity", "How demand responds to price"),
+        SearchDocument("concept", "b", "b", "Opportunity cost", "The value of the next best choice"),
+    ]
+    assert index.update(documents) == (2, 0, 0)
+    assert index.update(documents) == (0, 0, 0)
+
+    renamed = [documents[0]._replace(title="Income elasticity"), documents[1]]
+    assert index.update(renamed) == (0, 1, 0)
+    assert [hit.id for hit in index.search("income")] == ["a"]
+    assert index.search("pri", prefix=True)[0].id == "a"  # still in the body
+
+    assert index.update(renamed[:1]) == (0, 0, 1)
+    assert index.search("opportunity") == []
+    assert index.search("opp", prefix=True) == []
+
+
+def test_catalog_reload_updates_search(monkeypatch: pytest.MonkeyPatch) -> None:
+    concepts = dict(data.CONCEPTS)
+    concepts["gdp-measurement"] = {**concepts["gdp-measurement"], "title": "Nowcasting Output"}
+    monkeypatch.setattr(data, "CONCEPTS", concepts)
+    reload_catalog()
+    try:
+        assert search_catalog("nowcasting")[0].id == "gdp-measurement"
+    finally:
+        monkeypatch.undo()
+        reload_catalog()
+    assert search_catalog("nowcasting") == []
+    assert len(SEARCH_INDEX) == len(data.CONCEPTS) + len(data.MODULES)
+
+
+def test_search_endpoint() -> None:
+    client = TestClient(app)
+    response = client.get("/search", params={"q": "central ba", "prefix": "true", "limit": 3})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0] == {
+        "type": "module",
+        "id": "monetary-policy-tools",
+        "concept_id": "monetary-policy",
+        "title": "Central Bank Playbooks",
+        "score": results[0]["score"],
+    }
+    assert len(results) <= 3
+    assert client.get("/search", params={"q": ""}).status_code == 422
+
+
+def test_typeahead_stays_fast_on_large_catalogs() -> None:
+    index = SearchIndex()
+    index.update(
+        SearchDocument(
+            "module",
+            f"concept-{concept}-module-{module}",
+            f"concept-{concept}",
+            f"Module {module} of concept {concept}",
+            f"Objective {module} reading {concept} walkthrough of topic{concept % 97}",
+        )
+        for concept in range(3_000)
+        for module in range(10)
+    )
+    for query in ("m", "concept 12", "module 7 of concept 19", "topic4", "walk"):
+        index.search(query, prefix=True)  # warm the per-term impact lists
+        samples = []
+        for _ in range(15):
+            started = perf_counter()
+            hits = index.search(query, prefix=True)
+            samples.append(perf_counter() - started)
+        assert hits
+        assert statistics.median(samples) < 0.01, query
@@ -1,13 +1,59 @@
 from __future__ import annotations
 
-from datetime import datetime
+import gc
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import List
 
-from app.schemas import BookingRequest
-from app.services import BOOKINGS, create_booking, get_concept, list_concepts, list_experts
+import pytest
+
+from app import data, services
+from app.archive import BookingArchive, CompactionTask
+from app.availability import WeeklyAvailability
+from app.bookings import BookingIndex, ExpertSchedule
+from app.catalog import Catalog
+from app.catalog_store import JsonlCatalogSource, write_catalog
+from app.experts import ExpertDirectory
+from app.metrics import BOOKING_OUTCOMES, BOOKING_STAGE_SECONDS
+from app.schemas import (
+    BookingRequest,
+    Concept,
+    Expert,
+    LearningModule,
+    RecurringBookingRequest,
+    to_dict,
+    trusted_concept,
+    trusted_expert,
+    trusted_module,
+)
+from app.services import (
+    BOOKINGS,
+    BOOKINGS_ARCHIVE,
+    CATALOG,
+    REJECT_BATCH_ABORTED,
+    REJECT_CONFLICT,
+    REJECT_OUTSIDE_AVAILABILITY,
+    _is_within_availability,
+    _slot_overlaps,
+    compact_bookings,
+    concepts_page,
+    create_booking,
+    create_bookings,
+    create_series,
+    find_open_slots,
+    get_concept,
+    list_concepts,
+    list_experts,
+    reload_catalog,
+)
 
 
 def setup_function() -> None:
     BOOKINGS.clear()
+    BOOKINGS_ARCHIVE.clear()
 
 
 def test_list_concepts_includes_modules() -> None:
@@ -82,3 +128,567 @@ def test_booking_outside_availability() -> None:
         client_name="Learner Late",
     )
     assert create_booking(request) is None
+
+
+def _conflict_check_seconds(index: BookingIndex, expert_id: str, probes: List[datetime]) -> float:
+    hour = timedelta(hours=1)
+    best = float("inf")
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(7):
+            started = perf_counter()
+            for probe in probes:
+                index.has_conflict(expert_id, probe, probe + hour)
+            best = min(best, perf_counter() - started)
+    finally:
+        gc.enable()
+    return best
+
+
+def test_conflict_check_latency_flat_as_bookings_grow() -> None:
+    index = BookingIndex()
+    base = datetime(2024, 1, 1)
+    hour = timedelta(hours=1)
+    experts = [f"expert-{number}" for number in range(100)]
+
+    def grow_to(total: int) -> None:
+        index.extend(
+            {
+                "expert_id": experts[position % len(experts)],
+                "start": base + position * hour,
+                "end": base + (position + 1) * hour,
+            }
+            for position in range(len(index), total)
+        )
+
+    probes = [base + position * hour for position in range(0, 1_000, 5)]
+    grow_to(1_000)
+    small = _conflict_check_seconds(index, experts[0], probes)
+    grow_to(1_000_000)
+    large = _conflict_check_seconds(index, experts[0], probes)
+
+    assert index.has_conflict(experts[0], base, base + hour)
+    assert not index.has_conflict(experts[0], base + hour, base + 2 * hour)
+    # A linear scan would be ~1000x slower; allow generous timer noise.
+    assert large < small * 5
+
+
+def test_booking_index_matches_linear_overlap_scan() -> None:
+    rng = random.Random(7)
+    base = datetime(2024, 1, 1)
+    index = BookingIndex()
+    records = []
+    for _ in range(300):
+        start = base + timedelta(minutes=rng.randrange(0, 10_000))
+        record = {
+            "expert_id": rng.choice(["a", "b"]),
+            "start": start,
+            "end": start + timedelta(minutes=rng.randrange(1, 240)),
+        }
+        records.append(record)
+        index.append(record)
+
+    for _ in range(500):
+        expert_id = rng.choice(["a", "b", "c"])
+        start = base + timedelta(minutes=rng.randrange(-300, 10_300))
+        end = start + timedelta(minutes=rng.randrange(1, 240))
+        expected = any(
+            record["expert_id"] == expert_id
+            and _slot_overlaps(record["start"], record["end"], start, end)
+            for record in records
+        )
+        assert index.has_conflict(expert_id, start, end) is expected
+
+
+def test_catalog_serves_shared_read_only_concepts() -> None:
+    first = get_concept("supply-demand")
+    assert first is get_concept("supply-demand")
+    assert list_concepts()[0] is CATALOG.get(list_concepts()[0].id)
+    with pytest.raises((TypeError, AttributeError)):
+        first.title = "Changed"  # type: ignore[misc]
+
+
+def test_reload_catalog_picks_up_source_changes(monkeypatch: pytest.MonkeyPatch) -> None:
+    concepts = dict(data.CONCEPTS)
+    concepts["game-theory"] = {
+        "id": "game-theory",
+        "title": "Game Theory",
+        "summary": "Strategic interaction between rational decision makers.",
+        "why_it_matters": "Negotiations and pricing wars follow strategic logic.",
+    }
+    monkeypatch.setattr(data, "CONCEPTS", concepts)
+    assert get_concept("game-theory") is None
+
+    version = CATALOG.version
+    reload_catalog()
+    try:
+        assert CATALOG.version == version + 1
+        concept = get_concept("game-theory")
+        assert concept is not None and concept.modules == []
+    finally:
+        monkeypatch.undo()
+        reload_catalog()
+    assert get_concept("game-theory") is None
+
+
+def test_expert_directory_index_tracks_add_update_remove() -> None:
+    directory = ExpertDirectory()
+    newcomer = {
+        **data.EXPERTS["dr-saito"],
+        "id": "dr-okafor",
+        "name": "Dr. Ada Okafor",
+        "focus_areas": ["Supply-Demand"],
+    }
+    directory.add(newcomer)
+    assert "dr-okafor" in {expert.id for expert in directory.for_concept(" supply-demand ")}
+
+    directory.update({**newcomer, "focus_areas": ["gdp-measurement"]})
+    assert "dr-okafor" not in {expert.id for expert in directory.for_concept("supply-demand")}
+    assert "dr-okafor" in {expert.id for expert in directory.for_concept("gdp-measurement")}
+
+    assert directory.remove("dr-okafor")
+    assert not directory.remove("dr-okafor")
+    assert "dr-okafor" not in {expert.id for expert in directory.for_concept("gdp-measurement")}
+    assert directory.for_concept("unknown") == []
+
+
+def test_list_experts_returns_prebuilt_models() -> None:
+    first = list_experts("monetary-policy")
+    second = list_experts("MONETARY-POLICY")
+    assert [expert.id for expert in first] == ["prof-chan", "dr-saito"]
+    assert all(a is b for a, b in zip(first, second))
+
+
+def test_compiled_availability_matches_single_window_rules() -> None:
+    availability = WeeklyAvailability.compile(data.EXPERTS["prof-chan"]["availability"])
+    wednesday = datetime(2024, 5, 8, 15, 0)
+    assert availability.covers(wednesday, wednesday + timedelta(hours=3))
+    assert not availability.covers(wednesday, wednesday + timedelta(hours=3, seconds=1))
+    assert not availability.covers(wednesday - timedelta(seconds=30), wednesday + timedelta(hours=1))
+    assert not availability.covers(datetime(2024, 5, 7, 15, 0), datetime(2024, 5, 7, 16, 0))
+
+
+def test_compiled_availability_spans_midnight_and_adjacent_windows() -> None:
+    availability = WeeklyAvailability.compile(
+        [
+            {"weekday": "Sunday", "start": time(22, 0), "end": time(1, 0)},
+            {"weekday": "monday", "start": time(1, 0), "end": time(2, 0)},
+            {"weekday": "tuesday", "start": time(9, 0), "end": time(10, 0)},
+            {"weekday": "tuesday", "start": time(10, 30), "end": time(11, 0)},
+        ]
+    )
+    sunday_night = datetime(2024, 5, 12, 23, 0)
+    assert availability.covers(sunday_night, sunday_night + timedelta(hours=3))
+    assert not availability.covers(sunday_night, sunday_night + timedelta(hours=3, minutes=1))
+    tuesday = datetime(2024, 5, 14, 9, 30)
+    assert not availability.covers(tuesday, tuesday + timedelta(hours=1))
+    assert availability.ranges() == [(0, 120), (1980, 2040), (2070, 2100), (9960, 10080)]
+    # Tiling merges Sunday night into Monday morning and clips both ends.
+    week = 10080
+    assert availability.tile(60, 2 * week + 2000) == [
+        (60, 120),
+        (1980, 2040),
+        (2070, 2100),
+        (9960, week + 120),
+        (week + 1980, week + 2040),
+        (week + 2070, week + 2100),
+        (week + 9960, 2 * week + 120),
+        (2 * week + 1980, 2 * week + 2000),
+    ]
+    assert availability.tile(3000, 9000) == []
+
+
+def test_concurrent_bookings_for_same_slot_succeed_once() -> None:
+    request = BookingRequest(
+        expert_id="prof-chan",
+        concept_id="supply-demand",
+        start_time=datetime.fromisoformat("2024-05-08T15:30:00"),
+        duration_minutes=60,
+        client_name="Racing Learner",
+    )
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda _: create_booking(request), range(64)))
+    assert sum(result is not None for result in results) == 1
+    assert len(BOOKINGS) == 1
+
+
+def test_reserve_stress_has_no_double_bookings() -> None:
+    index = BookingIndex()
+    base = datetime(2024, 1, 1)
+    experts = [f"expert-{number}" for number in range(8)]
+
+    def worker(seed: int) -> int:
+        rng = random.Random(seed)
+        booked = 0
+        for _ in range(500):
+            start = base + timedelta(minutes=15 * rng.randrange(0, 400))
+            record = {
+                "expert_id": rng.choice(experts),
+                "start": start,
+                "end": start + timedelta(minutes=15 * rng.randrange(1, 5)),
+            }
+            booked += index.reserve(record)
+        return booked
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        booked = sum(pool.map(worker, range(32)))
+
+    assert booked == len(index)
+    for expert_id in experts:
+        schedule = index.for_expert(expert_id)
+        for earlier, later in zip(schedule, schedule[1:]):
+            assert earlier["end"] <= later["start"]
+
+
+def test_reserve_throughput_scales_with_distinct_experts(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Simulate a slow critical section (e.g. durable storage) so lock
+    # contention, not the GIL, dominates the measurement.
+    original = ExpertSchedule.overlaps
+
+    def slow_overlaps(self: ExpertSchedule, start: datetime, end: datetime) -> bool:
+        sleep(0.002)
+        return original(self, start, end)
+
+    monkeypatch.setattr(ExpertSchedule, "overlaps", slow_overlaps)
+    base = datetime(2024, 1, 1)
+
+    def run(experts: List[str]) -> float:
+        index = BookingIndex(stripes=1024)
+
+        def worker(offset: int) -> None:
+            for slot in range(10):
+                start = base + timedelta(hours=offset * 10 + slot)
+                index.reserve(
+                    {
+                        "expert_id": experts[offset % len(experts)],
+                        "start": start,
+                        "end": start + timedelta(hours=1),
+                    }
+                )
+
+        started = perf_counter()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(worker, range(8)))
+        assert len(index) == 80
+        return perf_counter() - started
+
+    distinct = [f"expert-{number}" for number in range(8)]
+    single = run(["expert-0"])
+    spread = run(distinct)
+    assert spread < single / 2
+
+
+def _chan_request(start: str, client_name: str = "Batch Learner") -> BookingRequest:
+    return BookingRequest(
+        expert_id="prof-chan",
+        concept_id="supply-demand",
+        start_time=datetime.fromisoformat(start),
+        duration_minutes=60,
+        client_name=client_name,
+    )
+
+
+def test_batch_booking_checks_conflicts_within_batch() -> None:
+    results = create_bookings(
+        [
+            _chan_request("2024-05-08T15:00:00"),
+            _chan_request("2024-05-08T15:30:00"),
+            _chan_request("2024-05-08T16:00:00"),
+            _chan_request("2024-05-07T16:00:00"),
+        ]
+    )
+    assert [result.error for result in results] == [
+        None,
+        REJECT_CONFLICT,
+        None,
+        REJECT_OUTSIDE_AVAILABILITY,
+    ]
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert len(BOOKINGS) == 2
+
+
+def test_atomic_batch_books_nothing_when_any_item_fails() -> None:
+    assert create_booking(_chan_request("2024-05-10T09:00:00")) is not None
+    results = create_bookings(
+        [_chan_request("2024-05-08T15:00:00"), _chan_request("2024-05-10T09:30:00")],
+        atomic=True,
+    )
+    assert [result.error for result in results] == [REJECT_BATCH_ABORTED, REJECT_CONFLICT]
+    assert len(BOOKINGS) == 1
+
+    results = create_bookings(
+        [_chan_request("2024-05-08T15:00:00"), _chan_request("2024-05-10T10:00:00")],
+        atomic=True,
+    )
+    assert all(result.confirmation is not None for result in results)
+    assert len(BOOKINGS) == 3
+
+
+def test_open_slots_exclude_bookings_and_respect_duration() -> None:
+    assert create_booking(_chan_request("2024-05-08T16:00:00")) is not None
+    start = datetime(2024, 5, 6)
+    results = dict(
+        (expert.id, slots)
+        for expert, slots in find_open_slots("supply-demand", start, start + timedelta(days=7), 60)
+    )
+    assert results["prof-chan"] == [
+        (datetime(2024, 5, 8, 15, 0), datetime(2024, 5, 8, 16, 0)),
+        (datetime(2024, 5, 8, 17, 0), datetime(2024, 5, 8, 18, 0)),
+        (datetime(2024, 5, 10, 8, 30), datetime(2024, 5, 10, 12, 0)),
+    ]
+    longer = find_open_slots("supply-demand", start, start + timedelta(days=7), 90)
+    assert dict((expert.id, slots) for expert, slots in longer)["prof-chan"] == [
+        (datetime(2024, 5, 10, 8, 30), datetime(2024, 5, 10, 12, 0)),
+    ]
+
+
+def test_open_slots_are_bookable() -> None:
+    start = datetime(2024, 5, 8, 16, 15)
+    for expert, slots in find_open_slots("monetary-policy", start, start + timedelta(days=21), 45):
+        assert slots
+        for slot_start, slot_end in slots:
+            assert start <= slot_start and slot_end - slot_start >= timedelta(minutes=45)
+            assert _is_within_availability(expert, slot_start, slot_end)
+            request = BookingRequest(
+                expert_id=expert.id,
+                concept_id="monetary-policy",
+                start_time=slot_end - timedelta(minutes=45),
+                duration_minutes=45,
+                client_name="Slot Finder",
+            )
+            assert create_booking(request) is not None
+
+
+def test_file_backed_catalog_materializes_lazily_with_bounded_cache(tmp_path: Path) -> None:
+    write_catalog(str(tmp_path), data.CONCEPTS, data.MODULES, data.EXPERTS)
+    source = JsonlCatalogSource(str(tmp_path))
+    catalog = Catalog(source, cache_size=2)
+
+    assert catalog.concept_ids() == tuple(data.CONCEPTS)
+    supply = catalog.get("supply-demand")
+    assert supply is not None
+    assert [module.id for module in supply.modules] == [
+        module["id"] for module in data.MODULES if module["concept_id"] == "supply-demand"
+    ]
+    assert catalog.get("supply-demand") is supply
+    assert catalog.get("unknown") is None
+
+    assert len(catalog.concepts()) == len(data.CONCEPTS)
+    assert len(catalog._concepts) == 2
+
+    directory = ExpertDirectory(source)
+    assert [expert.id for expert in directory.for_concept("monetary-policy")] == ["prof-chan", "dr-saito"]
+    assert directory.availability("prof-chan").covers(
+        datetime(2024, 5, 8, 15, 30), datetime(2024, 5, 8, 16, 30)
+    )
+    source.close()
+
+
+def test_concept_projection_reads_records_without_building_models(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    write_catalog(str(tmp_path), data.CONCEPTS, data.MODULES, data.EXPERTS)
+    catalog = Catalog(JsonlCatalogSource(str(tmp_path)), cache_size=8)
+    monkeypatch.setattr("app.services.CATALOG", catalog)
+
+    first = concepts_page(limit=2, fields=("id", "title"))
+    second = concepts_page(cursor=first.next_cursor, fields=("id", "title"))
+    assert [row["title"] for row in first.items + second.items] == [
+        concept["title"] for concept in data.CONCEPTS.values()
+    ]
+    assert second.next_cursor is None
+    assert len(catalog._concepts) == 0
+
+    with_modules = concepts_page(limit=1, fields=("id", "modules"))
+    assert with_modules.items[0]["modules"][0]["concept_id"] == first.items[0]["id"]
+
+
+def test_create_booking_records_stage_timings_and_rejection_reasons() -> None:
+    booked, conflicts = BOOKING_OUTCOMES.value("booked"), BOOKING_OUTCOMES.value(REJECT_CONFLICT)
+    outside = BOOKING_OUTCOMES.value(REJECT_OUTSIDE_AVAILABILITY)
+    timed = BOOKING_STAGE_SECONDS.count("conflict_check")
+
+    assert create_booking(_chan_request("2024-05-08T15:00:00")) is not None
+    assert create_booking(_chan_request("2024-05-08T15:30:00")) is None
+    assert create_booking(_chan_request("2024-05-08T03:00:00")) is None
+
+    assert BOOKING_OUTCOMES.value("booked") == booked + 1
+    assert BOOKING_OUTCOMES.value(REJECT_CONFLICT) == conflicts + 1
+    assert BOOKING_OUTCOMES.value(REJECT_OUTSIDE_AVAILABILITY) == outside + 1
+    # The rejected-for-availability booking never reached the conflict check.
+    assert BOOKING_STAGE_SECONDS.count("conflict_check") == timed + 2
+
+
+def test_trusted_construction_matches_validated_models() -> None:
+    for concept_id, record in data.CONCEPTS.items():
+        modules = [module for module in data.MODULES if module["concept_id"] == concept_id]
+        validated = Concept(**record, modules=[LearningModule(**module) for module in modules])
+        fast = trusted_concept(record, [trusted_module(module) for module in modules])
+        assert to_dict(fast) == to_dict(validated)
+    for record in data.EXPERTS.values():
+        shouted = {**record, "availability": [{**w, "weekday": w["weekday"].upper()} for w in record["availability"]]}
+        assert to_dict(trusted_expert(shouted)) == to_dict(Expert(**record))
+
+    # Client input still goes through full validation.
+    with pytest.raises(ValueError):
+        BookingRequest(
+            expert_id="prof-chan",
+            concept_id="supply-demand",
+            start_time="not a time",
+            duration_minutes=60,
+            client_name="Learner",
+        )
+
+
+def test_compaction_archives_finished_sessions(tmp_path: Path) -> None:
+    request = BookingRequest(
+        expert_id="prof-chan",
+        concept_id="supply-demand",
+        start_time=datetime.fromisoformat("2024-05-08T15:00:00"),
+        duration_minutes=60,
+        client_name="Past Learner",
+    )
+    past = create_booking(request)
+    upcoming = create_booking(BookingRequest(**{**to_dict(request), "start_time": datetime(2024, 5, 15, 15)}))
+    assert past is not None and upcoming is not None
+
+    assert compact_bookings(datetime(2024, 5, 10)) == 1
+    assert [record["booking_id"] for record in BOOKINGS] == [upcoming.booking_id]
+    assert [record["booking_id"] for record in BOOKINGS_ARCHIVE] == [past.booking_id]
+
+    archive = BookingArchive(str(tmp_path / "archive.jsonl"))
+    archive.extend(list(BOOKINGS_ARCHIVE))
+    archive.extend(list(BOOKINGS_ARCHIVE))
+    assert len(archive) == 2
+    assert next(iter(archive))["end"] == datetime(2024, 5, 8, 16)
+
+
+def test_aware_booking_times_are_stored_as_naive_utc() -> None:
+    request = BookingRequest(
+        expert_id="prof-chan",
+        concept_id="supply-demand",
+        start_time=datetime(2024, 5, 8, 17, tzinfo=timezone(timedelta(hours=2))),
+        duration_minutes=60,
+        client_name="Travelling Learner",
+    )
+    booking = create_booking(request)
+    assert booking is not None
+    assert booking.start_time == datetime(2024, 5, 8, 15)
+    assert [record["start"] for record in BOOKINGS] == [datetime(2024, 5, 8, 15)]
+
+    assert compact_bookings() == 1
+    assert compact_bookings(datetime(2024, 5, 10, tzinfo=timezone.utc)) == 0
+
+
+def test_compaction_continues_past_a_failing_expert() -> None:
+    bookings = BookingIndex()
+    bookings.append({"expert_id": "a", "start": datetime(2024, 5, 8, 15), "end": datetime(2024, 5, 8, 16)})
+    bookings.append({"expert_id": "b", "start": datetime(2024, 5, 8, 15), "end": datetime(2024, 5, 8, 16)})
+    archived: List[str] = []
+
+    def archive(records: List[dict]) -> None:
+        if records[0]["expert_id"] == "a":
+            raise OSError("archive unavailable")
+        archived.extend(record["expert_id"] for record in records)
+
+    assert bookings.archive_finished(datetime(2024, 5, 10), archive) == 1
+    assert archived == ["b"]
+    assert [record["expert_id"] for record in bookings] == ["a"]
+
+
+def test_background_compaction_needs_an_archive_file(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("BOOKINGS_COMPACT_INTERVAL", "60")
+    monkeypatch.setattr(services, "BOOKINGS_ARCHIVE", BookingArchive())
+    assert services._compaction_interval() == 0
+    monkeypatch.setattr(services, "BOOKINGS_ARCHIVE", BookingArchive(str(tmp_path / "archive.jsonl")))
+    assert services._compaction_interval() == 60
+
+
+def test_compaction_task_runs_in_background() -> None:
+    calls: List[datetime] = []
+    task = CompactionTask(lambda now: calls.append(now) or 0, interval=0.01)
+    task.start()
+    deadline = perf_counter() + 2
+    while len(calls) < 2 and perf_counter() < deadline:
+        sleep(0.01)
+    task.stop()
+    assert len(calls) >= 2
+
+
+def _weekly(weeks: int, **overrides: object) -> RecurringBookingRequest:
+    fields = {
+        "expert_id": "prof-chan",
+        "concept_id": "supply-demand",
+        "start_time": datetime(2024, 5, 8, 15),
+        "duration_minutes": 60,
+        "client_name": "Term Learner",
+        "weeks": weeks,
+        **overrides,
+    }
+    return RecurringBookingRequest(**fields)
+
+
+def test_series_books_every_week_as_one_booking() -> None:
+    blocker = create_booking(
+        BookingRequest(
+            expert_id="prof-chan",
+            concept_id="supply-demand",
+            start_time=datetime(2024, 5, 22, 15, 30),
+            duration_minutes=60,
+            client_name="Early Bird",
+        )
+    )
+    assert blocker is not None
+    assert create_series(_weekly(12))[1:] == (REJECT_CONFLICT, [2])
+
+    series, reason, conflicts = create_series(_weekly(12, skip_conflicts=True, skip_weeks=[4, 40]))
+    assert reason is None and conflicts == [2]
+    assert (series.sessions, series.skipped_weeks) == (10, [2, 4])
+    assert series.total_price == 10 * series.price_per_session == 5000.0
+    assert len(BOOKINGS) == 2
+
+    # Open slots on a series week exclude the session; skipped weeks stay open.
+    (_, busy_week), = [
+        (expert, slots)
+        for expert, slots in find_open_slots("supply-demand", datetime(2024, 5, 15), datetime(2024, 5, 16), 60)
+        if expert.id == "prof-chan"
+    ]
+    assert busy_week == [(datetime(2024, 5, 15, 16), datetime(2024, 5, 15, 18))]
+    (_, free_week), = [
+        (expert, slots)
+        for expert, slots in find_open_slots("supply-demand", datetime(2024, 6, 5), datetime(2024, 6, 6), 60)
+        if expert.id == "prof-chan"
+    ]
+    assert free_week == [(datetime(2024, 6, 5, 15), datetime(2024, 6, 5, 18))]
+
+    assert create_series(_weekly(3, start_time=datetime(2024, 5, 8, 19)))[1] == REJECT_OUTSIDE_AVAILABILITY
+    assert create_series(_weekly(2, skip_weeks=[0, 1]))[1] == "invalid_session"
+
+
+def test_year_long_series_books_in_about_one_booking_time() -> None:
+    def timed(action) -> float:
+        samples = []
+        for _ in range(15):
+            BOOKINGS.clear()
+            started = perf_counter()
+            action()
+            samples.append(perf_counter() - started)
+        return sorted(samples)[len(samples) // 2]
+
+    def one_booking() -> None:
+        assert create_booking(
+            BookingRequest(
+                expert_id="prof-chan",
+                concept_id="supply-demand",
+                start_time=datetime(2024, 5, 8, 15),
+                duration_minutes=60,
+                client_name="Single",
+            )
+        )
+
+    request = _weekly(52)
+    single = timed(one_booking)
+    series = timed(lambda: create_series(request)[0])
+    # Booking the series as 52 separate requests costs ~40x one booking.
+    assert series < single * 5